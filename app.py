@@ -2,8 +2,17 @@ import streamlit as st
 st.set_page_config(page_title="Tippelaget", page_icon="⚽", layout="wide", initial_sidebar_state="collapsed")
 import pandas as pd
 
-from tippelaget.core.data import get_prepared_bets, create_monthly_innskudd_df, get_todays_events
+from tippelaget.core.config import get_plot_max_points, get_seasons
+from tippelaget.core.data import (
+    ALL_SEASONS,
+    check_last_workflow_runtime,
+    get_prepared_bets,
+    get_todays_events,
+    season_innskudd_df,
+)
 from tippelaget.ui.plotting import configure_theme
+from tippelaget.ui.loader import load_concurrently
+from tippelaget.ui.profiling import RerunProfiler
 from tippelaget.views.metrics import (
     render_total_payout,
     render_average_odds,
@@ -18,7 +27,9 @@ from tippelaget.views.assistants import render_prophet, render_king
 
 
 def main() -> None:
-    st.title("📊 Tippelaget Season 2 ⚽ ")
+    # Opt-in per-stage timings (see tippelaget/ui/profiling.py); no-op unless enabled
+    profiler = RerunProfiler.from_request()
+    title = st.empty()
 
     # Lightweight mobile CSS: scrollable tabs and tighter paddings on small screens
     st.markdown(
@@ -36,56 +47,80 @@ def main() -> None:
         unsafe_allow_html=True,
     )
 
+    # Newest season first; only the selected season's bets are loaded
+    season_names = [name for name, _ in sorted(get_seasons().items(), key=lambda kv: kv[1], reverse=True)]
+    season_labels = {name: name for name in season_names}
+    season_labels[ALL_SEASONS] = "All time"
+    season = st.selectbox(
+        "Season",
+        season_names + [ALL_SEASONS],
+        format_func=season_labels.get,
+        key="season",
+        label_visibility="collapsed",
+    )
+    title.title(f"📊 Tippelaget {season_labels[season]} ⚽ ")
+
     configure_theme()
-    df = get_prepared_bets()
+    # The fetches below are independent Cognite round trips, so they run concurrently
+    with profiler.stage("load_data"):
+        loaded = load_concurrently(
+            {
+                "get_prepared_bets": lambda: get_prepared_bets(season=season),
+                "create_monthly_innskudd_df": lambda: season_innskudd_df(season),
+                "get_todays_events": get_todays_events,
+                "check_last_workflow_runtime": lambda: check_last_workflow_runtime(
+                    wf_external_id="wf_tippelaget_workflow", version="1"
+                ),
+            },
+            profiler,
+        )
+    df = loaded["get_prepared_bets"]
+    profiler.record_frame("prepared bets", df)
+    # Long (all-time) series are downsampled so drawing the image markers stays bounded
+    max_points = get_plot_max_points()
 
     tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8 = st.tabs([
         "Total Payout", "Average Odds", "Cumulative Payout",
         "Win Rate", "Cumulative vs Baseline", "Team Total", "Luckiness / Ball knowledge?", "Tippekassa vs Baseline",
     ])
 
-    with tab1:
+    with tab1, profiler.stage("render_total_payout"):
         render_total_payout(df)
 
-    with tab2:
+    with tab2, profiler.stage("render_average_odds"):
         render_average_odds(df)
 
-    with tab3:
-        render_cumulative_payout(df)
+    with tab3, profiler.stage("render_cumulative_payout"):
+        render_cumulative_payout(df, max_points)
 
-    with tab4:
+    with tab4, profiler.stage("render_win_rate"):
         render_win_rate(df)
 
-    with tab5:
-        render_cumulative_vs_baseline(df)
+    with tab5, profiler.stage("render_cumulative_vs_baseline"):
+        render_cumulative_vs_baseline(df, max_points)
 
-    with tab6:
-        render_team_total(df)
+    with tab6, profiler.stage("render_team_total"):
+        render_team_total(df, max_points)
 
-    with tab7:
+    with tab7, profiler.stage("render_luckiness"):
         render_luckiness(df)
 
-    with tab8:
-        innskudd_df = create_monthly_innskudd_df()
-        render_tippekassa_vs_baseline(df, innskudd_df)
+    with tab8, profiler.stage("render_tippekassa_vs_baseline"):
+        render_tippekassa_vs_baseline(df, loaded["create_monthly_innskudd_df"], max_points)
 
     tab9, tab10 = st.tabs(["The Prophet", "King Carl Gustaf's wisdom 🇸🇪"])
-    with tab9:
+    with tab9, profiler.stage("render_prophet"):
         render_prophet(df)
-    with tab10:
-        # Keep existing behavior for the King tab which relies on today's events
-        df_events = get_todays_events()
-        render_king(df, df_events)
+    with tab10, profiler.stage("render_king"):
+        render_king(df, loaded["get_todays_events"])
 
     # Display and update the last workflow run time in a single text box
-    from tippelaget.core.data import check_last_workflow_runtime
     import datetime
 
     # Use a Streamlit placeholder for the last run text
     last_run_placeholder = st.empty()
 
-    def update_last_run_text():
-        last_run = check_last_workflow_runtime(wf_external_id="wf_tippelaget_workflow", version="1")
+    def update_last_run_text(last_run: int | None):
         if last_run:
             try:
                 # Convert to UTC+2
@@ -97,7 +132,7 @@ def main() -> None:
         else:
             last_run_placeholder.markdown("**Last data model update:** No previous runs found.")
 
-    update_last_run_text()
+    update_last_run_text(loaded["check_last_workflow_runtime"])
 
     # Buttons: Populate data model, and directly under it Show today's events
     col_populate, _filler = st.columns([0.25, 0.75])
@@ -117,8 +152,12 @@ def main() -> None:
                     status = check_workflow_status(res.id)
                     st.info(f"Workflow status: {status}")
                 st.success("Workflow completed!")
+                # The run may have written today's events; refetch the window instead of waiting for its schedule
+                from tippelaget.core.data import fetch_event_window, get_event_store
+
+                get_event_store().refresh(fetch_event_window)
                 # Update last run time in the same text box
-                update_last_run_text()
+                update_last_run_text(check_last_workflow_runtime(wf_external_id="wf_tippelaget_workflow", version="1"))
         if st.button("Show today's events", key="open_events_dialog"):
             st.session_state["show_events"] = True
             st.rerun()
@@ -144,5 +183,7 @@ def main() -> None:
         # Immediately reset flag so dialog doesn't reopen on rerun
         st.session_state["show_events"] = False
 
+    profiler.finish()
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,187 @@
+"""Benchmark of the assistant pipelines against a local OpenAI-compatible mock.
+
+    python -m benchmarks.assistants --ttft-ms 600 --tps 50 --completion-tokens 200
+    python -m benchmarks.assistants --bets 50000 --events 40 --repeat 10 --out assistants.json
+
+Runs the Prophet and King pipelines of both the API (`assistants_logic.run_prophet` /
+`run_king`) and the Streamlit views (`tippelaget.views.assistants`) on a synthetic season from
+`benchmarks.synthetic`, with `benchmarks.mock_openai` standing in for OpenAI (`--ttft-ms`,
+`--tps`, `--completion-tokens`). Reported per pipeline (medians over `--repeat`): snippet
+preparation (`prepare_data_snippet`, `prepare_events_snippet`), prompt build, the model call,
+end-to-end latency, prompt size in characters and the prompt/completion token counts the mock
+returns in `usage` (estimated at 4 characters per token).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import statistics
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+import pandas as pd
+
+from .mock_openai import MockOpenAI
+from .run import _api_module
+from .synthetic import generate_event_rows, generate_raw_bets_df
+
+PROPHET_QUESTION = "Which player has the best ball knowledge?"
+KING_QUESTION = "What should I bet on today?"
+KING_PLAYER = "Mads"
+
+
+def _median(runs: list[dict[str, float]]) -> dict[str, float]:
+    return {key: round(statistics.median(run[key] for run in runs), 3) for key in runs[0]}
+
+
+def _api_runs(df: pd.DataFrame, events: pd.DataFrame, mock: MockOpenAI, repeat: int) -> dict[str, dict[str, float]]:
+    assistants_logic = _api_module("assistants_logic")
+    instrumentation = _api_module("instrumentation")
+    settings_module = _api_module("settings")
+    # Only the OpenAI fields are read, so the Cognite settings need not exist.
+    settings = settings_module.Settings.model_construct(openai_api_key="mock", openai_base_url=mock.base_url)
+
+    calls: dict[str, Callable[[], str]] = {
+        "api.prophet": lambda: assistants_logic.run_prophet(df, PROPHET_QUESTION, settings),
+        "api.king": lambda: assistants_logic.run_king(df, events, KING_QUESTION, KING_PLAYER, settings),
+    }
+    results = {}
+    for name, call in calls.items():
+        runs = []
+        for _ in range(repeat):
+            # The pipeline's own spans give the stage timings, as in Server-Timing.
+            spans: list[tuple[str, float]] = []
+            token = instrumentation._spans.set(spans)
+            try:
+                t0 = time.perf_counter()
+                call()
+                total = time.perf_counter() - t0
+            finally:
+                instrumentation._spans.reset(token)
+            stages = dict.fromkeys(("prepare_data_snippet", "prepare_events_snippet", "prompt_build"), 0.0)
+            llm = 0.0
+            for span_name, elapsed in spans:
+                if span_name.startswith("openai_"):
+                    llm += elapsed
+                elif span_name in stages:
+                    stages[span_name] += elapsed
+            runs.append(_run_row(stages, llm, total, mock))
+        results[name] = _median(runs)
+    return results
+
+
+def _streamlit_runs(
+    df: pd.DataFrame, events: pd.DataFrame, mock: MockOpenAI, repeat: int
+) -> dict[str, dict[str, float]]:
+    import openai
+    import streamlit.logger
+
+    # Bare-mode Streamlit warns on every st.* call outside `streamlit run`.
+    streamlit.logger.set_log_level(logging.ERROR)
+    from tippelaget.core.config import OPENAI_KING_MODEL, OPENAI_PROPhet_MODEL
+    from tippelaget.views import assistants
+
+    openai.api_key = "mock"
+    openai.base_url = mock.base_url + "/"
+
+    def prophet(stages: dict[str, float]) -> tuple[str, str, str]:
+        data_json = _timed(stages, "prepare_data_snippet", lambda: assistants._prepare_data_snippet(df))
+        prompt = _timed(stages, "prompt_build", lambda: assistants._prophet_prompt(PROPHET_QUESTION, data_json))
+        return prompt, "prophet", OPENAI_PROPhet_MODEL
+
+    def king(stages: dict[str, float]) -> tuple[str, str, str]:
+        sub = df[df["player"] == KING_PLAYER]
+        data_json = _timed(stages, "prepare_data_snippet", lambda: assistants._prepare_data_snippet(sub))
+        events_json = _timed(stages, "prepare_events_snippet", lambda: assistants._prepare_events_snippet(events, sub))
+        prompt = _timed(
+            stages, "prompt_build", lambda: assistants._king_prompt(KING_QUESTION, KING_PLAYER, data_json, events_json)
+        )
+        return prompt, "king", OPENAI_KING_MODEL
+
+    results = {}
+    for name, build in {"streamlit.prophet": prophet, "streamlit.king": king}.items():
+        runs = []
+        for _ in range(repeat):
+            stages = dict.fromkeys(("prepare_data_snippet", "prepare_events_snippet", "prompt_build"), 0.0)
+            t0 = time.perf_counter()
+            prompt, assistant, model = build(stages)
+            t1 = time.perf_counter()
+            assistants._complete(assistant, model, prompt)
+            t2 = time.perf_counter()
+            runs.append(_run_row(stages, t2 - t1, t2 - t0, mock))
+        results[name] = _median(runs)
+    return results
+
+
+def _timed(stages: dict[str, float], name: str, fn: Callable[[], Any]) -> Any:
+    t0 = time.perf_counter()
+    value = fn()
+    stages[name] += time.perf_counter() - t0
+    return value
+
+
+def _run_row(stages: dict[str, float], llm: float, total: float, mock: MockOpenAI) -> dict[str, float]:
+    usage = mock.requests[-1]
+    return {
+        **{f"{stage}_ms": seconds * 1000 for stage, seconds in stages.items()},
+        "llm_ms": llm * 1000,
+        "end_to_end_ms": total * 1000,
+        "prompt_chars": usage["prompt_chars"],
+        "prompt_tokens": usage["prompt_tokens"],
+        "completion_tokens": usage["completion_tokens"],
+    }
+
+
+def run_benchmarks(
+    n_players: int, n_gameweeks: int, n_bets: int, n_events: int, mock: MockOpenAI, repeat: int, seed: int = 0
+) -> dict[str, dict[str, float]]:
+    cognite_data = _api_module("cognite_data")
+    df = cognite_data.prepare_bets_df(generate_raw_bets_df(n_players, n_gameweeks, n_bets, seed=seed))
+    events = pd.DataFrame(generate_event_rows(n_events, seed=seed))
+    return {**_api_runs(df, events, mock, repeat), **_streamlit_runs(df, events, mock, repeat)}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--players", type=int, default=3)
+    parser.add_argument("--gameweeks", type=int, default=38)
+    parser.add_argument("--bets", type=int, default=1_000)
+    parser.add_argument("--events", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--ttft-ms", type=float, default=500.0)
+    parser.add_argument("--tps", type=float, default=60.0, help="tokens per second after the first (0: instant)")
+    parser.add_argument("--completion-tokens", type=int, default=150)
+    parser.add_argument("--out", type=Path, help="write the JSON report here")
+    args = parser.parse_args()
+
+    mock = MockOpenAI(args.ttft_ms, args.tps, args.completion_tokens).start()
+    try:
+        results = run_benchmarks(
+            args.players, args.gameweeks, args.bets, args.events, mock, args.repeat, seed=args.seed
+        )
+    finally:
+        mock.stop()
+
+    report = {
+        "scale": {"players": args.players, "gameweeks": args.gameweeks, "bets": args.bets, "events": args.events},
+        "mock": {"ttft_ms": args.ttft_ms, "tps": args.tps, "completion_tokens": args.completion_tokens},
+        "repeat": args.repeat,
+        "results": results,
+    }
+    for name, row in results.items():
+        print(
+            f"{name:<18} data {row['prepare_data_snippet_ms']:8.2f} ms  events {row['prepare_events_snippet_ms']:7.2f} ms"
+            f"  prompt {row['prompt_build_ms']:7.2f} ms  llm {row['llm_ms']:8.1f} ms  total {row['end_to_end_ms']:8.1f} ms"
+            f"  {row['prompt_tokens']:6.0f} prompt / {row['completion_tokens']:.0f} completion tokens"
+        )
+    if args.out:
+        args.out.write_text(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,301 @@
+"""Load test for the FastAPI service against local stand-ins for Cognite and OpenAI.
+
+    python -m benchmarks.load --concurrency 1,8,32 --duration 20
+    python -m benchmarks.load --workers 4 --cognite-latency-ms 150 --openai-ttft-ms 800 --openai-tps 50
+    python -m benchmarks.load --mix dashboard=1 --env SWR_BETS_FRESH_S=0 --out load.json
+
+Starts `uvicorn main:app` (with `--workers`) on a replay recording (`--recording`, or a synthetic
+one of `--bets` bets) and `benchmarks.mock_openai`, waits for `/api/ready`, then runs closed-loop
+clients at each concurrency level for `--duration` seconds. Each client repeatedly picks an
+endpoint from the weighted `--mix` of `/api/dashboard`, `/api/events/today`,
+`/api/workflow/last-run` and the two assistants. Reported per level: throughput, p50/p95/p99
+latency and error rate per endpoint and overall, and the peak RSS of every server process
+(from /proc, so Linux only). `--env KEY=VALUE` passes settings through to the API, so a caching
+change can be measured with and without it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Any
+
+from .mock_openai import MockOpenAI
+from .synthetic import synthetic_recording
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+API_DIR = REPO_ROOT / "tippelaget-web" / "api"
+
+ENDPOINTS = {
+    "dashboard": ("GET", "/api/dashboard", None),
+    "events": ("GET", "/api/events/today", None),
+    "last_run": ("GET", "/api/workflow/last-run", None),
+    "prophet": ("POST", "/api/assistants/prophet", {"question": "Who is the best player?"}),
+    "king": ("POST", "/api/assistants/king", {"question": "What should I bet on today?", "player": "Mads"}),
+}
+DEFAULT_MIX = "dashboard=6,events=2,last_run=2,prophet=1,king=1"
+
+
+def parse_mix(mix: str) -> dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint {name!r}; expected one of {', '.join(ENDPOINTS)}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def percentile(values: list[float], q: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 2)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def process_tree(pid: int) -> list[int]:
+    """`pid` and its descendants (uvicorn workers are children of the supervisor)."""
+    pids, i = [pid], 0
+    while i < len(pids):
+        for task in Path(f"/proc/{pids[i]}/task").glob("*"):
+            try:
+                pids += [int(p) for p in (task / "children").read_text().split()]
+            except OSError:
+                pass
+        i += 1
+    return pids
+
+
+def rss_bytes(pid: int) -> int | None:
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+    return None
+
+
+class RssSampler:
+    """Peak RSS per process of the server's process tree, sampled every `interval` seconds."""
+
+    def __init__(self, root_pid: int, interval: float = 0.25) -> None:
+        self.root_pid = root_pid
+        self.interval = interval
+        self.peak: dict[int, int] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            for pid in process_tree(self.root_pid):
+                rss = rss_bytes(pid)
+                if rss is not None:
+                    self.peak[pid] = max(self.peak.get(pid, 0), rss)
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> "RssSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def request(base: str, endpoint: str, timeout: float) -> tuple[float, int]:
+    method, path, body = ENDPOINTS[endpoint]
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(base + path, data=data, method=method)
+    req.add_header("Accept-Encoding", "gzip")
+    if data is not None:
+        req.add_header("Content-Type", "application/json")
+    t0 = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            resp.read()
+            status = resp.status
+    except urllib.error.HTTPError as e:
+        e.read()
+        status = e.code
+    except (urllib.error.URLError, OSError):
+        status = 0
+    return (time.perf_counter() - t0) * 1000, status
+
+
+def run_level(base: str, concurrency: int, duration: float, mix: dict[str, float], seed: int, timeout: float) -> dict[str, Any]:
+    """Closed-loop clients for `duration` seconds; one result row per endpoint plus "all"."""
+    names, weights = list(mix), list(mix.values())
+    results: list[tuple[str, float, int]] = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client(i: int) -> None:
+        rng = random.Random(seed + i)
+        local = []
+        while time.perf_counter() < deadline:
+            endpoint = rng.choices(names, weights)[0]
+            ms, status = request(base, endpoint, timeout)
+            local.append((endpoint, ms, status))
+        with lock:
+            results.extend(local)
+
+    t0 = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    def summarize(rows: list[tuple[str, float, int]]) -> dict[str, Any]:
+        latencies = [ms for _, ms, _ in rows]
+        errors = sum(1 for _, _, status in rows if not 200 <= status < 400)
+        return {
+            "requests": len(rows),
+            "rps": round(len(rows) / elapsed, 2),
+            "p50_ms": percentile(latencies, 0.50),
+            "p95_ms": percentile(latencies, 0.95),
+            "p99_ms": percentile(latencies, 0.99),
+            "error_rate": round(errors / len(rows), 4) if rows else 0.0,
+        }
+
+    by_endpoint = {name: summarize([r for r in results if r[0] == name]) for name in names}
+    return {"concurrency": concurrency, "seconds": round(elapsed, 2), "all": summarize(results), **by_endpoint}
+
+
+def start_api(port: int, env: dict[str, str], workers: int, timeout: float = 120.0) -> subprocess.Popen:
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=API_DIR,
+        env=env,
+    )
+    t0 = time.perf_counter()
+    while True:
+        if proc.poll() is not None:
+            raise RuntimeError("uvicorn exited before becoming ready")
+        if time.perf_counter() - t0 > timeout:
+            proc.terminate()
+            raise TimeoutError("API did not become ready")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/api/ready", timeout=2) as resp:
+                if resp.status == 200:
+                    return proc
+        except (urllib.error.URLError, OSError):
+            pass
+        time.sleep(0.1)
+
+
+def api_env(args: argparse.Namespace, recording: Path, openai_url: str, last_good_dir: str) -> dict[str, str]:
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join([str(REPO_ROOT), os.environ.get("PYTHONPATH", "")]),
+        # Replay mode needs the Cognite settings to exist, not to be real.
+        "COGNITE_PROJECT": "replay",
+        "COGNITE_BASE_URL": "http://replay.invalid",
+        "COGNITE_CLIENT_ID": "replay",
+        "COGNITE_CLIENT_SECRET": "replay",
+        "COGNITE_TOKEN_URL": "http://replay.invalid/token",
+        "COGNITE_REPLAY_PATH": str(recording),
+        "COGNITE_REPLAY_LATENCY_MS": str(args.cognite_latency_ms),
+        "COGNITE_REPLAY_JITTER_MS": str(args.cognite_jitter_ms),
+        "COGNITE_REPLAY_ERROR_RATE": str(args.cognite_error_rate),
+        "OPENAI_API_KEY": "mock",
+        "OPENAI_BASE_URL": openai_url,
+        "LAST_GOOD_DIR": last_good_dir,
+        "DASHBOARD_SNAPSHOT_PATH": "",
+    }
+    for item in args.env:
+        key, _, value = item.partition("=")
+        env[key] = value
+    return env
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", default="1,8,32", help="comma-separated concurrency levels")
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds per concurrency level")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"endpoint weights (default {DEFAULT_MIX})")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--recording", type=Path, help="Cognite replay recording (default: synthetic)")
+    parser.add_argument("--bets", type=int, default=2_500, help="bets in the synthetic recording")
+    parser.add_argument("--cognite-latency-ms", type=float, default=80.0)
+    parser.add_argument("--cognite-jitter-ms", type=float, default=20.0)
+    parser.add_argument("--cognite-error-rate", type=float, default=0.0)
+    parser.add_argument("--openai-ttft-ms", type=float, default=500.0)
+    parser.add_argument("--openai-tps", type=float, default=80.0)
+    parser.add_argument("--openai-completion-tokens", type=int, default=120)
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="extra API setting")
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, help="write the JSON report here")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    levels = [int(c) for c in args.concurrency.split(",")]
+    mock = MockOpenAI(args.openai_ttft_ms, args.openai_tps, args.openai_completion_tokens).start()
+    with tempfile.TemporaryDirectory(prefix="tippelaget-load-") as tmp:
+        recording = args.recording
+        if recording is None:
+            recording = Path(tmp) / "recording.json"
+            recording.write_text(json.dumps(synthetic_recording(n_bets=args.bets, seed=args.seed)), encoding="utf-8")
+        port = _free_port()
+        proc = start_api(port, api_env(args, recording, mock.base_url, str(Path(tmp) / "last-good")), args.workers)
+        base = f"http://127.0.0.1:{port}"
+        levels_out = []
+        try:
+            for concurrency in levels:
+                with RssSampler(proc.pid) as rss:
+                    level = run_level(base, concurrency, args.duration, mix, args.seed, args.timeout)
+                level["rss_mb"] = {str(pid): round(b / 1e6, 1) for pid, b in sorted(rss.peak.items())}
+                levels_out.append(level)
+                _print_level(level, list(mix))
+        finally:
+            proc.terminate()
+            proc.wait(timeout=30)
+            mock.stop()
+
+    report = {
+        "config": {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()},
+        "openai_requests": len(mock.requests),
+        "levels": levels_out,
+    }
+    if args.out:
+        args.out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Wrote {args.out}")
+    return 0
+
+
+def _print_level(level: dict[str, Any], endpoints: list[str]) -> None:
+    print(f"\nconcurrency {level['concurrency']} ({level['seconds']} s)")
+    print(f"  {'endpoint':<10} {'req':>7} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for name in ["all", *endpoints]:
+        r = level[name]
+        print(
+            f"  {name:<10} {r['requests']:>7} {r['rps']:>8} {r['p50_ms'] or '-':>9} {r['p95_ms'] or '-':>9} "
+            f"{r['p99_ms'] or '-':>9} {r['error_rate']:>7.1%}"
+        )
+    print("  peak RSS MB: " + ", ".join(f"pid {pid} {mb}" for pid, mb in level["rss_mb"].items()))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+"""Local OpenAI-compatible stand-in for `/v1/chat/completions`, with tunable latency.
+
+    python -m benchmarks.mock_openai --port 8090 --ttft-ms 400 --tps 60 --completion-tokens 150
+
+Point the API at it with `OPENAI_BASE_URL=http://127.0.0.1:8090/v1` (any `OPENAI_API_KEY`). Each
+request waits `ttft_ms` before the first token and then produces `completion_tokens` tokens at
+`tps` tokens per second; with `"stream": true` the tokens arrive as server-sent chunks at that
+pace. Token counts are estimated (4 characters per token) and reported in `usage`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+CHARS_PER_TOKEN = 4
+TOKEN_TEXT = "lorem "
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+class MockOpenAI:
+    """Serves chat completions on `127.0.0.1:port` (0 picks a free port) from a background thread."""
+
+    def __init__(self, ttft_ms: float = 0.0, tps: float = 0.0, completion_tokens: int = 100, port: int = 0) -> None:
+        self.ttft_ms = ttft_ms
+        self.tps = tps
+        self.completion_tokens = completion_tokens
+        self._lock = threading.Lock()
+        # One {"model", "stream", "prompt_chars", "prompt_tokens", "completion_tokens", "total_tokens"}
+        # per request served.
+        self.requests: list[dict[str, Any]] = []
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "MockOpenAI":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-openai", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _token_delay(self) -> float:
+        return 1 / self.tps if self.tps > 0 else 0.0
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def do_POST(self) -> None:
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._send_json(404, {"error": {"message": f"unknown path {self.path}"}})
+                    return
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                model = body.get("model", "mock")
+                prompt = "".join(str(m.get("content", "")) for m in body.get("messages", []))
+                usage = {
+                    "prompt_tokens": estimate_tokens(prompt),
+                    "completion_tokens": mock.completion_tokens,
+                    "total_tokens": estimate_tokens(prompt) + mock.completion_tokens,
+                }
+                stream = bool(body.get("stream"))
+                with mock._lock:
+                    mock.requests.append({"model": model, "stream": stream, "prompt_chars": len(prompt), **usage})
+                time.sleep(mock.ttft_ms / 1000)
+                if stream:
+                    self._stream(model, usage, body.get("stream_options") or {})
+                else:
+                    time.sleep(mock._token_delay() * mock.completion_tokens)
+                    self._send_json(200, _completion(model, TOKEN_TEXT * mock.completion_tokens, usage))
+
+            def _send_json(self, status: int, payload: dict[str, Any]) -> None:
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _stream(self, model: str, usage: dict[str, int], options: dict[str, Any]) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for i in range(mock.completion_tokens):
+                    if i:
+                        time.sleep(mock._token_delay())
+                    self._chunk(_stream_chunk(model, {"content": TOKEN_TEXT}, None))
+                self._chunk(_stream_chunk(model, {}, "stop"))
+                if options.get("include_usage"):
+                    self._chunk({**_stream_chunk(model, {}, None), "choices": [], "usage": usage})
+                self._write_chunk(b"data: [DONE]\n\n")
+                self._write_chunk(b"")
+
+            def _chunk(self, payload: dict[str, Any]) -> None:
+                self._write_chunk(f"data: {json.dumps(payload)}\n\n".encode())
+
+            def _write_chunk(self, data: bytes) -> None:
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+        return Handler
+
+
+def _completion(model: str, content: str, usage: dict[str, int]) -> dict[str, Any]:
+    return {
+        "id": "chatcmpl-mock",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [
+            {"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}
+        ],
+        "usage": usage,
+    }
+
+
+def _stream_chunk(model: str, delta: dict[str, Any], finish_reason: str | None) -> dict[str, Any]:
+    return {
+        "id": "chatcmpl-mock",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--ttft-ms", type=float, default=0.0)
+    parser.add_argument("--tps", type=float, default=0.0, help="tokens per second after the first (0: instant)")
+    parser.add_argument("--completion-tokens", type=int, default=100)
+    args = parser.parse_args()
+
+    mock = MockOpenAI(args.ttft_ms, args.tps, args.completion_tokens, args.port).start()
+    print(f"Mock OpenAI at {mock.base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        mock.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
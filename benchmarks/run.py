@@ -0,0 +1,232 @@
+"""Offline benchmark suite for the ingest and compute paths.
+
+    python -m benchmarks.run --scale small --out bench.json
+    python -m benchmarks.run --players 10 --gameweeks 120 --bets 200000 --skip-render
+    python -m benchmarks.run --scale medium --compare bench.json   # exit 1 on regressions
+
+Times ingest (`pd.json_normalize` vs the columnar `build_bets_frame`), both `prepare_bets_df`
+implementations, every `compute_*` in `tippelaget-web/api/chart_compute.py`, incremental
+cumulative updates, every `render_*` in `tippelaget/views/metrics.py` and JSON encoding of the
+dashboard payload, on a synthetic season from `benchmarks.synthetic`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import inspect
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+from .synthetic import BET_VIEW, SPACE, _node, generate_bet_rows, generate_raw_bets_df
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+API_DIR = REPO_ROOT / "tippelaget-web" / "api"
+
+SCALES = {
+    "small": (3, 38, 1_000),
+    "medium": (10, 114, 50_000),
+    "large": (50, 400, 1_000_000),
+}
+
+
+def _api_module(name: str):
+    if str(API_DIR) not in sys.path:
+        sys.path.insert(0, str(API_DIR))
+    return __import__(name)
+
+
+def time_call(fn: Callable[[], Any], repeat: int) -> dict[str, float]:
+    runs = []
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        fn()
+        runs.append((time.perf_counter() - t0) * 1000)
+    return {"median_ms": round(statistics.median(runs), 3), "min_ms": round(min(runs), 3), "runs": len(runs)}
+
+
+def _public_functions(module, prefix: str) -> dict[str, Callable]:
+    return {
+        name: fn
+        for name, fn in inspect.getmembers(module, inspect.isfunction)
+        if name.startswith(prefix) and fn.__module__ == module.__name__
+    }
+
+
+def _call_with_frames(fn: Callable, df: pd.DataFrame, innskudd: pd.DataFrame) -> Any:
+    # By name: other parameters (e.g. `max_points`) keep their defaults.
+    params = inspect.signature(fn).parameters
+    for name in ("innskudd_df", "innskudd"):
+        if name in params:
+            return fn(df, **{name: innskudd})
+    return fn(df)
+
+
+def run_benchmarks(
+    n_players: int,
+    n_gameweeks: int,
+    n_bets: int,
+    repeat: int = 3,
+    seed: int = 0,
+    skip_render: bool = False,
+) -> dict[str, dict[str, float]]:
+    import streamlit.logger
+
+    # Bare-mode Streamlit warns on every cached function and st.* call outside `streamlit run`.
+    streamlit.logger.set_log_level(logging.ERROR)
+    from tippelaget.core import data as core_data
+
+    chart_compute = _api_module("chart_compute")
+    cognite_data = _api_module("cognite_data")
+
+    results: dict[str, dict[str, float]] = {}
+
+    from cognite.client.data_classes.data_modeling import ViewId
+    from cognite.client.data_classes.data_modeling.instances import NodeList
+
+    rows = generate_bet_rows(n_players, n_gameweeks, n_bets, seed=seed)
+    view_id = ViewId(SPACE, *BET_VIEW)
+    nodes = [_node(f"bet_{i}", BET_VIEW, props) for i, props in enumerate(rows)]
+    chunks = [NodeList.load(nodes[i : i + 1000]) for i in range(0, len(nodes), 1000)]
+
+    def extract_and_normalize() -> pd.DataFrame:
+        return pd.json_normalize([node.properties.get(view_id) for chunk in chunks for node in chunk])
+
+    results["ingest.json_normalize"] = time_call(extract_and_normalize, repeat)
+    results["ingest.build_bets_frame.api"] = time_call(lambda: cognite_data.build_bets_frame(chunks, view_id), repeat)
+    results["ingest.build_bets_frame.streamlit"] = time_call(lambda: core_data.build_bets_frame(chunks, view_id), repeat)
+    del rows, nodes, chunks
+
+    raw = generate_raw_bets_df(n_players, n_gameweeks, n_bets, seed=seed)
+    results["prepare_bets_df.api"] = time_call(lambda: cognite_data.prepare_bets_df(raw.copy()), repeat)
+    results["prepare_bets_df.streamlit"] = time_call(lambda: core_data.prepare_bets_df(raw.copy()), repeat)
+    df = cognite_data.prepare_bets_df(raw.copy())
+    innskudd = cognite_data.create_monthly_innskudd_df()
+
+    for name, fn in _public_functions(chart_compute, "compute_").items():
+        results[f"chart_compute.{name}"] = time_call(lambda fn=fn: _call_with_frames(fn, df, innskudd), repeat)
+
+    # Incremental cumulative series: the last gameweek arriving on top of the rest, and a no-op sync.
+    cumulative = _api_module("cumulative")
+    engines = [cumulative.CumulativeEngine() for _ in range(repeat)]
+    for engine in engines:
+        engine.sync(df[df["gameweek_num"] < df["gameweek_num"].max()])
+    pending = iter(engines)
+    results["cumulative.sync_new_gameweek"] = time_call(lambda: next(pending).sync(df), repeat)
+    results["cumulative.sync_unchanged"] = time_call(lambda: engines[0].sync(df), repeat)
+    del engines, pending
+
+    payload = chart_compute.compute_all_dashboard(df, innskudd)
+    results["json.dumps dashboard"] = time_call(lambda: json.dumps(payload), repeat)
+
+    if not skip_render:
+        import matplotlib
+
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+
+        from tippelaget.ui.plotting import configure_theme
+        from tippelaget.views import metrics
+
+        configure_theme()
+        for name, fn in _public_functions(metrics, "render_").items():
+
+            def render(fn=fn) -> None:
+                _call_with_frames(fn, df, innskudd)
+                plt.close("all")
+
+            results[f"metrics.{name}"] = time_call(render, repeat)
+
+    return results
+
+
+def _git_rev() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True)
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def build_report(results: dict[str, dict[str, float]], scale: dict[str, int], repeat: int) -> dict[str, Any]:
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git_rev": _git_rev(),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "scale": scale,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any], threshold: float) -> list[str]:
+    """Benchmarks whose median got slower than `threshold` times the baseline median."""
+    if current["meta"]["scale"] != baseline["meta"]["scale"]:
+        print(f"warning: comparing different scales {current['meta']['scale']} vs {baseline['meta']['scale']}")
+    regressions = []
+    for name, res in current["results"].items():
+        old = baseline["results"].get(name)
+        if not old:
+            continue
+        ratio = res["median_ms"] / old["median_ms"] if old["median_ms"] else float("inf")
+        flag = " REGRESSION" if ratio > threshold else ""
+        print(f"{name:<55} {old['median_ms']:>10.2f} -> {res['median_ms']:>10.2f} ms  x{ratio:.2f}{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--players", type=int)
+    parser.add_argument("--gameweeks", type=int)
+    parser.add_argument("--bets", type=int)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--skip-render", action="store_true", help="skip the matplotlib/Streamlit render_* views")
+    parser.add_argument("--out", type=Path, help="write the JSON report here")
+    parser.add_argument("--compare", type=Path, help="baseline JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=1.2, help="slowdown ratio counted as a regression")
+    args = parser.parse_args()
+
+    players, gameweeks, bets = SCALES[args.scale]
+    scale = {
+        "players": args.players or players,
+        "gameweeks": args.gameweeks or gameweeks,
+        "bets": args.bets or bets,
+    }
+    results = run_benchmarks(
+        scale["players"], scale["gameweeks"], scale["bets"], repeat=args.repeat, seed=args.seed,
+        skip_render=args.skip_render,
+    )
+    report = build_report(results, scale, args.repeat)
+
+    if args.out:
+        args.out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if args.compare:
+        regressions = compare(report, json.loads(args.compare.read_text(encoding="utf-8")), args.threshold)
+        return 1 if regressions else 0
+    for name, res in results.items():
+        print(f"{name:<55} {res['median_ms']:>10.2f} ms (min {res['min_ms']:.2f})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
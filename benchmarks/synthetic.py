@@ -0,0 +1,221 @@
+"""Synthetic season generator producing rows shaped like the `Bet` view.
+
+Rows match what `fetch_bet_view` gets back from Cognite: direct relations as
+`{"space", "externalId"}` dicts, so `pd.json_normalize` yields `player.externalId`,
+`gameweek.externalId` (`GW_n`) and friends.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+SPACE = "tippelaget_space_name"
+BET_VIEW = ("Bet", "fcb537cee9eba5")
+EVENT_VIEW = ("Event", "1.0.3")
+WORKFLOW = ("wf_tippelaget_workflow", "1")
+BASE_PLAYERS = ["Elias", "Mads", "Tobias"]
+TEAMS = [
+    "Arsenal", "Aston Villa", "Bournemouth", "Brentford", "Brighton", "Chelsea", "Crystal Palace",
+    "Everton", "Fulham", "Liverpool", "Man City", "Man United", "Newcastle", "Nottingham Forest",
+    "Tottenham", "West Ham", "Wolves", "Leeds", "Burnley", "Sunderland",
+]
+
+
+def player_names(n_players: int) -> list[str]:
+    extra = [f"Player{i}" for i in range(len(BASE_PLAYERS) + 1, n_players + 1)]
+    return (BASE_PLAYERS + extra)[:n_players]
+
+
+def generate_bet_columns(
+    n_players: int = 3,
+    n_gameweeks: int = 38,
+    n_bets: int = 1000,
+    seed: int = 0,
+    season_start: str = "2025-03-15",
+) -> dict[str, np.ndarray]:
+    """Vectorized column arrays for `n_bets` bets spread over players and gameweeks."""
+    if not 1 <= n_players <= 50 or not 1 <= n_gameweeks <= 400 or not 1 <= n_bets <= 1_000_000:
+        raise ValueError("scale must be 1-50 players, 1-400 gameweeks and 1-1e6 bets")
+    rng = np.random.default_rng(seed)
+    players = np.array(player_names(n_players))
+
+    # Every player bets every gameweek at least once when there are enough bets to go round.
+    base = np.arange(min(n_bets, n_players * n_gameweeks))
+    rest = rng.integers(0, n_players * n_gameweeks, size=n_bets - base.size)
+    slot = np.concatenate([base, rest])
+    player_idx = slot % n_players
+    gw = slot // n_players + 1
+
+    odds = np.round(1.2 + rng.lognormal(mean=0.6, sigma=0.6, size=n_bets), 2)
+    bet_nok = rng.choice([20, 50, 100, 200], size=n_bets, p=[0.2, 0.4, 0.3, 0.1]).astype(float)
+    won = rng.random(n_bets) < 0.93 / odds
+    payout = np.where(won, np.round(bet_nok * odds, 2), 0.0)
+
+    start = np.datetime64(season_start, "D")
+    bet_date = start + (gw - 1) * 7 + rng.integers(0, 4, size=n_bets)
+    home = rng.integers(0, len(TEAMS), size=n_bets)
+    away = (home + rng.integers(1, len(TEAMS), size=n_bets)) % len(TEAMS)
+    outcome = rng.choice(np.array(["H", "D", "A", "1X", "X2"]), size=n_bets)
+    teams = np.array(TEAMS)
+    description = np.char.add(np.char.add(np.char.add(teams[home], " - "), teams[away]), np.char.add(": ", outcome))
+
+    return {
+        "player": players[player_idx],
+        "gameweek": np.char.add("GW_", gw.astype(str)),
+        "payout": payout,
+        "betNok": bet_nok,
+        "odds": odds,
+        "date": np.datetime_as_string(bet_date, unit="D"),
+        "description": description,
+    }
+
+
+def generate_bet_rows(
+    n_players: int = 3,
+    n_gameweeks: int = 38,
+    n_bets: int = 1000,
+    seed: int = 0,
+    season_start: str = "2025-03-15",
+) -> list[dict[str, Any]]:
+    """Bet view property dicts, i.e. what `row.properties.get(view_id)` returns per node."""
+    cols = generate_bet_columns(n_players, n_gameweeks, n_bets, seed, season_start)
+    return [
+        {
+            "player": {"space": SPACE, "externalId": str(p)},
+            "gameweek": {"space": SPACE, "externalId": str(g)},
+            "payout": float(payout),
+            "betNok": float(bet),
+            "odds": float(odds),
+            "date": str(date),
+            "description": str(desc),
+        }
+        for p, g, payout, bet, odds, date, desc in zip(
+            cols["player"], cols["gameweek"], cols["payout"], cols["betNok"], cols["odds"], cols["date"],
+            cols["description"],
+        )
+    ]
+
+
+def generate_raw_bets_df(
+    n_players: int = 3,
+    n_gameweeks: int = 38,
+    n_bets: int = 1000,
+    seed: int = 0,
+    season_start: str = "2025-03-15",
+) -> pd.DataFrame:
+    """Frame as returned by `fetch_bet_view` (flattened direct relations, unprepared)."""
+    cols = generate_bet_columns(n_players, n_gameweeks, n_bets, seed, season_start)
+    return pd.DataFrame(
+        {
+            "player.space": SPACE,
+            "player.externalId": cols["player"].astype(object),
+            "gameweek.space": SPACE,
+            "gameweek.externalId": cols["gameweek"].astype(object),
+            "payout": cols["payout"],
+            "betNok": cols["betNok"],
+            "odds": cols["odds"],
+            "date": cols["date"].astype(object),
+            "description": cols["description"].astype(object),
+        }
+    )
+
+
+def generate_event_rows(n_events: int = 20, seed: int = 0, event_date: date | None = None) -> list[dict[str, Any]]:
+    """Event view property dicts for one day: 1X2 odds plus a few extra markets the app does not use."""
+    rng = np.random.default_rng(seed)
+    day = (event_date or date.today()).isoformat()
+    rows = []
+    for i in range(n_events):
+        home, away = rng.choice(len(TEAMS), size=2, replace=False)
+        p = rng.dirichlet([4, 2.5, 3]) * 1.06
+        rows.append(
+            {
+                "eventName": f"{TEAMS[home]} - {TEAMS[away]}",
+                "eventDate": day,
+                "H": round(float(1 / p[0]), 2),
+                "D": round(float(1 / p[1]), 2),
+                "A": round(float(1 / p[2]), 2),
+                "over25": round(float(rng.uniform(1.5, 2.6)), 2),
+                "under25": round(float(rng.uniform(1.5, 2.6)), 2),
+                "btts": round(float(rng.uniform(1.6, 2.2)), 2),
+                "league": "Premier League",
+            }
+        )
+    return rows
+
+
+def _node(external_id: str, view: tuple[str, str], props: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "instanceType": "node",
+        "space": SPACE,
+        "externalId": external_id,
+        "version": 1,
+        "lastUpdatedTime": 0,
+        "createdTime": 0,
+        "properties": {SPACE: {f"{view[0]}/{view[1]}": props}},
+    }
+
+
+def synthetic_recording(
+    n_players: int = 3,
+    n_gameweeks: int = 38,
+    n_bets: int = 1000,
+    n_events: int = 20,
+    seed: int = 0,
+    event_days: int = 7,
+) -> dict[str, dict[str, Any]]:
+    """Recording for `tippelaget.core.replay.ReplayCogniteClient` built from synthetic data, with
+    `n_events` events on each of the `event_days` days from today."""
+    bets = [
+        _node(f"bet_{i}", BET_VIEW, props)
+        for i, props in enumerate(generate_bet_rows(n_players, n_gameweeks, n_bets, seed=seed))
+    ]
+    events = [
+        _node(f"event_{d}_{i}", EVENT_VIEW, props)
+        for d in range(event_days)
+        for i, props in enumerate(generate_event_rows(n_events, seed + d, date.today() + timedelta(days=d)))
+    ]
+    now = int(time.time() * 1000)
+    execution = {
+        "id": "00000000-0000-0000-0000-000000000001",
+        "workflowExternalId": WORKFLOW[0],
+        "version": WORKFLOW[1],
+        "status": "completed",
+        "createdTime": now,
+        "startTime": now,
+        "endTime": now,
+    }
+    return {
+        "instances.query": {"Bet": {"Bet": bets}, "Event": {"Event": events}},
+        "workflows.executions.list": {f"{WORKFLOW[0]}/{WORKFLOW[1]}": [execution]},
+        "workflows.executions.retrieve_detailed": {execution["id"]: execution},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Write a synthetic Cognite replay recording.")
+    parser.add_argument("out", type=Path)
+    parser.add_argument("--players", type=int, default=3)
+    parser.add_argument("--gameweeks", type=int, default=38)
+    parser.add_argument("--bets", type=int, default=1000)
+    parser.add_argument("--events", type=int, default=20, help="events per day")
+    parser.add_argument("--event-days", type=int, default=7)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    from tippelaget.core.replay import Recording
+
+    recording = synthetic_recording(args.players, args.gameweeks, args.bets, args.events, args.seed, args.event_days)
+    Recording(recording).save(args.out)
+    print(f"Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,26 +2,47 @@ from __future__ import annotations
 
 from typing import Any
 
+import numpy as np
 import pandas as pd
 
+from instrumentation import timed
 
-def _records(df: pd.DataFrame) -> list[dict[str, Any]]:
+
+# Prepared bets hold money and odds as float32; round on the way out so float32 noise
+# (1234.56 -> 1234.56005859375) stays out of the JSON.
+MONEY_DECIMALS = 2
+RATIO_DECIMALS = 4
+
+
+def _money(x: Any) -> float:
+    return round(float(x), MONEY_DECIMALS)
+
+
+def _ratio(x: Any) -> float:
+    return round(float(x), RATIO_DECIMALS)
+
+
+def _records(df: pd.DataFrame, money_columns: tuple[str, ...] = ()) -> list[dict[str, Any]]:
     if df.empty:
         return []
+    floats = df.select_dtypes("floating").columns
+    df = df.astype({c: "float64" for c in floats}).round(
+        {c: MONEY_DECIMALS if c in money_columns else RATIO_DECIMALS for c in floats}
+    )
     return df.replace({float("nan"): None}).to_dict(orient="records")
 
 
 def compute_total_payout(df: pd.DataFrame) -> list[dict[str, Any]]:
     if df.empty:
         return []
-    payouts = df.groupby("player")["payout"].sum().reset_index()
-    return _records(payouts)
+    payouts = df.groupby("player", observed=True)["payout"].sum().reset_index()
+    return _records(payouts, money_columns=("payout",))
 
 
 def compute_average_odds(df: pd.DataFrame) -> list[dict[str, Any]]:
     if df.empty:
         return []
-    odds = df.groupby("player")["odds"].mean().reset_index()
+    odds = df.groupby("player", observed=True)["odds"].mean().reset_index()
     return _records(odds)
 
 
@@ -30,11 +51,13 @@ def compute_cumulative_payout_series(df: pd.DataFrame) -> list[dict[str, Any]]:
         return []
     df_sorted = df.sort_values(["player", "gameweek_num", "date"]).copy()
     df_sorted["payout"] = df_sorted["payout"].fillna(0)
-    df_sorted["cumulative_payout"] = df_sorted.groupby("player")["payout"].cumsum()
+    df_sorted["cumulative_payout"] = (
+        df_sorted["payout"].astype("float64").groupby(df_sorted["player"], observed=True).cumsum()
+    )
     out = []
-    for player, group in df_sorted.groupby("player"):
+    for player, group in df_sorted.groupby("player", observed=True):
         pts = [
-            {"gameweek_num": int(r.gameweek_num), "cumulative_payout": float(r.cumulative_payout)}
+            {"gameweek_num": int(r.gameweek_num), "cumulative_payout": _money(r.cumulative_payout)}
             for r in group.itertuples()
         ]
         out.append(
@@ -51,7 +74,7 @@ def compute_win_rate(df: pd.DataFrame) -> list[dict[str, Any]]:
     if df.empty:
         return []
     weekly = (
-        df.groupby(["player", "gameweek"])
+        df.groupby(["player", "gameweek"], observed=True)
         .agg(
             total_payout=("payout", "sum"),
             total_bet=("betNok", "sum"),
@@ -59,7 +82,7 @@ def compute_win_rate(df: pd.DataFrame) -> list[dict[str, Any]]:
         .reset_index()
     )
     weekly["won_week"] = weekly["total_payout"] >= weekly["total_bet"]
-    winrate = weekly.groupby("player")["won_week"].mean().reset_index()
+    winrate = weekly.groupby("player", observed=True)["won_week"].mean().reset_index()
     winrate.rename(columns={"won_week": "win_rate"}, inplace=True)
     return _records(winrate)
 
@@ -67,19 +90,19 @@ def compute_win_rate(df: pd.DataFrame) -> list[dict[str, Any]]:
 def compute_cumulative_vs_baseline(df: pd.DataFrame) -> dict[str, Any]:
     if df.empty:
         return {"players": [], "baseline": []}
-    weekly = df.groupby(["player", "gameweek_num"], as_index=False).agg(
+    weekly = df.groupby(["player", "gameweek_num"], as_index=False, observed=True).agg(
         payout=("payout", "sum"),
         stake=("betNok", "sum"),
     )
-    weekly["cumulative_payout"] = weekly.groupby("player")["payout"].cumsum()
+    weekly["cumulative_payout"] = weekly["payout"].astype("float64").groupby(weekly["player"], observed=True).cumsum()
     n_players = weekly["player"].nunique()
-    baseline = (weekly.groupby("gameweek_num")["stake"].sum().cumsum() / n_players).reset_index(
+    baseline = (weekly.groupby("gameweek_num")["stake"].sum().astype("float64").cumsum() / n_players).reset_index(
         name="per_player_stake"
     )
     players = []
-    for player, group in weekly.groupby("player"):
+    for player, group in weekly.groupby("player", observed=True):
         pts = [
-            {"gameweek_num": int(r.gameweek_num), "cumulative_payout": float(r.cumulative_payout)}
+            {"gameweek_num": int(r.gameweek_num), "cumulative_payout": _money(r.cumulative_payout)}
             for r in group.itertuples()
         ]
         players.append(
@@ -90,7 +113,7 @@ def compute_cumulative_vs_baseline(df: pd.DataFrame) -> dict[str, Any]:
             }
         )
     base_pts = [
-        {"gameweek_num": int(r.gameweek_num), "per_player_stake": float(r.per_player_stake)}
+        {"gameweek_num": int(r.gameweek_num), "per_player_stake": _money(r.per_player_stake)}
         for r in baseline.itertuples()
     ]
     return {
@@ -107,13 +130,13 @@ def compute_team_total(df: pd.DataFrame) -> dict[str, Any]:
         payout=("payout", "sum"),
         stake=("betNok", "sum"),
     )
-    team_weekly["cumulative_payout"] = team_weekly["payout"].cumsum()
-    team_weekly["cumulative_stake"] = team_weekly["stake"].cumsum()
+    team_weekly["cumulative_payout"] = team_weekly["payout"].astype("float64").cumsum()
+    team_weekly["cumulative_stake"] = team_weekly["stake"].astype("float64").cumsum()
     series = [
         {
             "gameweek_num": int(r.gameweek_num),
-            "cumulative_payout": float(r.cumulative_payout),
-            "cumulative_stake": float(r.cumulative_stake),
+            "cumulative_payout": _money(r.cumulative_payout),
+            "cumulative_stake": _money(r.cumulative_stake),
         }
         for r in team_weekly.itertuples()
     ]
@@ -123,7 +146,7 @@ def compute_team_total(df: pd.DataFrame) -> dict[str, Any]:
     diff = payout_last - stake_last
     return {
         "series": series,
-        "diff": diff,
+        "diff": _money(diff),
         "last_gameweek": int(last["gameweek_num"]),
     }
 
@@ -133,7 +156,7 @@ def compute_luckiness(df: pd.DataFrame) -> dict[str, Any]:
         return {"bars": [], "luckiest": None, "unluckiest": None}
     d = df.copy()
     d["expected_payout"] = d["betNok"] / d["odds"]
-    luck = d.groupby("player", as_index=False).agg(
+    luck = d.groupby("player", as_index=False, observed=True).agg(
         total_payout=("payout", "sum"),
         total_expected=("expected_payout", "sum"),
     )
@@ -143,51 +166,151 @@ def compute_luckiness(df: pd.DataFrame) -> dict[str, Any]:
     luckiest = luck.iloc[0].to_dict() if len(luck) else None
     unluckiest = luck.iloc[-1].to_dict() if len(luck) else None
     if luckiest:
-        luckiest = {"player": str(luckiest["player"]), "luck_ratio": float(luckiest["luck_ratio"])}
+        luckiest = {"player": str(luckiest["player"]), "luck_ratio": _ratio(luckiest["luck_ratio"])}
     if unluckiest:
-        unluckiest = {"player": str(unluckiest["player"]), "luck_ratio": float(unluckiest["luck_ratio"])}
+        unluckiest = {"player": str(unluckiest["player"]), "luck_ratio": _ratio(unluckiest["luck_ratio"])}
     return {"bars": bars, "luckiest": luckiest, "unluckiest": unluckiest}
 
 
+def innskudd_per_gameweek(df: pd.DataFrame, innskudd_df: pd.DataFrame) -> pd.DataFrame:
+    """Deposits summed per gameweek: each deposit counts towards the highest gameweek that started
+    on or before its date (deposits before the first gameweek are dropped).
+
+    An as-of join on the gameweek start dates, so it scales with deposits + gameweeks. Per-player
+    deposits (a `player` column) only count for players that have bets in `df`.
+    """
+    gw_dates = df.groupby("gameweek_num", observed=True)["date"].min().reset_index().sort_values("date")
+    # Running max, so the as-of match is the highest gameweek started so far even if dates are not monotonic.
+    gw_dates["gameweek_num"] = gw_dates["gameweek_num"].cummax()
+    deposits = innskudd_df
+    if "player" in deposits.columns:
+        players = set(df["player"].astype(str))
+        deposits = deposits[deposits["player"].isna() | deposits["player"].isin(players)]
+    deposits = deposits[["date", "innskudd"]].sort_values("date")
+    mapped = pd.merge_asof(
+        deposits.astype({"date": "datetime64[ns]"}),
+        gw_dates.astype({"date": "datetime64[ns]"}),
+        on="date",
+        direction="backward",
+    )
+    mapped = mapped.dropna(subset=["gameweek_num"]).astype({"gameweek_num": gw_dates["gameweek_num"].dtype})
+    return mapped.groupby("gameweek_num", as_index=False)["innskudd"].sum()
+
+
 def compute_tippekassa_vs_baseline(df: pd.DataFrame, innskudd_df: pd.DataFrame) -> dict[str, Any]:
     if df.empty:
         return {"series": []}
-    gw_dates = df.groupby("gameweek_num")["date"].min().reset_index()
-    innskudd_df = innskudd_df.copy()
-
-    def map_gw(x) -> int | None:
-        m = gw_dates[gw_dates["date"] <= x]["gameweek_num"].max()
-        return int(m) if pd.notna(m) else None
-
-    innskudd_df["gameweek_num"] = innskudd_df["date"].apply(map_gw)
     weekly = df.groupby("gameweek_num", as_index=False).agg(
         total_payout=("payout", "sum"),
         total_stake=("betNok", "sum"),
     )
-    ins_sum = innskudd_df.groupby("gameweek_num")["innskudd"].sum().reset_index()
+    ins_sum = innskudd_per_gameweek(df, innskudd_df)
     weekly = weekly.merge(ins_sum, on="gameweek_num", how="left")
     weekly["innskudd"] = weekly["innskudd"].fillna(0)
-    weekly["cum_payout_plus_innskudd"] = (weekly["total_payout"] + weekly["innskudd"]).cumsum()
-    weekly["cum_stake_plus_innskudd"] = (weekly["total_stake"] + weekly["innskudd"]).cumsum()
+    weekly["cum_payout_plus_innskudd"] = (weekly["total_payout"].astype("float64") + weekly["innskudd"]).cumsum()
+    weekly["cum_stake_plus_innskudd"] = (weekly["total_stake"].astype("float64") + weekly["innskudd"]).cumsum()
     series = [
         {
             "gameweek_num": int(r.gameweek_num),
-            "cum_payout_plus_innskudd": float(r.cum_payout_plus_innskudd),
-            "cum_stake_plus_innskudd": float(r.cum_stake_plus_innskudd),
+            "cum_payout_plus_innskudd": _money(r.cum_payout_plus_innskudd),
+            "cum_stake_plus_innskudd": _money(r.cum_stake_plus_innskudd),
         }
         for r in weekly.itertuples()
     ]
     return {"series": series}
 
 
-def compute_all_dashboard(df: pd.DataFrame, innskudd_df: pd.DataFrame) -> dict[str, Any]:
+@timed()
+def compute_all_dashboard(df: pd.DataFrame, innskudd_df: pd.DataFrame, engine: Any = None) -> dict[str, Any]:
+    """All dashboard sections; with a `cumulative.CumulativeEngine` the cumulative series are
+    updated incrementally instead of recomputed from the full history."""
+    if engine is not None:
+        cumulative = engine.sync(df)
+    else:
+        cumulative = {
+            "cumulative_payout": compute_cumulative_payout_series(df),
+            "cumulative_vs_baseline": compute_cumulative_vs_baseline(df),
+            "team_total": compute_team_total(df),
+        }
     return {
         "total_payout": compute_total_payout(df),
         "average_odds": compute_average_odds(df),
-        "cumulative_payout": compute_cumulative_payout_series(df),
+        "cumulative_payout": cumulative["cumulative_payout"],
         "win_rate": compute_win_rate(df),
-        "cumulative_vs_baseline": compute_cumulative_vs_baseline(df),
-        "team_total": compute_team_total(df),
+        "cumulative_vs_baseline": cumulative["cumulative_vs_baseline"],
+        "team_total": cumulative["team_total"],
         "luckiness": compute_luckiness(df),
         "tippekassa_vs_baseline": compute_tippekassa_vs_baseline(df, innskudd_df),
     }
+
+
+def lttb_indices(y: Any, max_points: int | None) -> np.ndarray:
+    """Positions of at most `max_points` points of `y` that preserve the shape of the line
+    (match tippelaget.ui.plotting.lttb_indices): Largest-Triangle-Three-Buckets, always keeping
+    the first and last point and the minimum and maximum."""
+    y = np.asarray(y, dtype="float64")
+    n = len(y)
+    if max_points is None or n <= max(max_points, 4):
+        return np.arange(n)
+    extremes = {int(np.nanargmin(y)), int(np.nanargmax(y))} - {0, n - 1}
+    budget = max(max_points, 4) - len(extremes)
+    y = np.nan_to_num(y)
+    edges = np.linspace(1, n - 1, budget - 1).astype(int)
+    keep = [0]
+    for b in range(budget - 2):
+        lo, hi = edges[b], edges[b + 1]
+        nxt_lo, nxt_hi = edges[b + 1], edges[b + 2] if b + 2 < len(edges) else n
+        avg_x, avg_y = (nxt_lo + nxt_hi - 1) / 2, y[nxt_lo:nxt_hi].mean()
+        a = keep[-1]
+        xs = np.arange(lo, hi)
+        area = np.abs((a - avg_x) * (y[lo:hi] - y[a]) - (a - xs) * (avg_y - y[a]))
+        keep.append(lo + int(np.argmax(area)))
+    keep.append(n - 1)
+    return np.array(sorted(set(keep) | extremes))
+
+
+def downsample_points(points: list[dict[str, Any]], fields: tuple[str, ...], max_points: int | None) -> list[dict[str, Any]]:
+    """At most `max_points` of `points`, keeping the shape of each of `fields`."""
+    if max_points is None or len(points) <= max_points:
+        return points
+    per_line = max(max_points // len(fields), 4)
+    idx = set()
+    for f in fields:
+        idx.update(lttb_indices([p[f] for p in points], per_line).tolist())
+    return [points[i] for i in sorted(idx)]
+
+
+@timed()
+def downsample_dashboard(payload: dict[str, Any], max_points: int | None) -> dict[str, Any]:
+    """`payload` with every line series cut to at most `max_points` points (labels and bars unchanged)."""
+    if max_points is None:
+        return payload
+
+    def lines(players: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        return [
+            {**line, "points": downsample_points(line["points"], ("cumulative_payout",), max_points)}
+            for line in players
+        ]
+
+    vs = payload["cumulative_vs_baseline"]
+    team = payload["team_total"]
+    tippekassa = payload["tippekassa_vs_baseline"]
+    return {
+        **payload,
+        "cumulative_payout": lines(payload["cumulative_payout"]),
+        "cumulative_vs_baseline": {
+            **vs,
+            "players": lines(vs["players"]),
+            "baseline": downsample_points(vs["baseline"], ("per_player_stake",), max_points),
+        },
+        "team_total": {
+            **team,
+            "series": downsample_points(team["series"], ("cumulative_payout", "cumulative_stake"), max_points),
+        },
+        "tippekassa_vs_baseline": {
+            **tippekassa,
+            "series": downsample_points(
+                tippekassa["series"], ("cum_payout_plus_innskudd", "cum_stake_plus_innskudd"), max_points
+            ),
+        },
+    }
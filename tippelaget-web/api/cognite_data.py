@@ -1,7 +1,12 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta
+import logging
+import math
+from datetime import date
+from functools import lru_cache
+from typing import Any, Iterable, Iterator
 
+import numpy as np
 import pandas as pd
 from cognite.client import CogniteClient, ClientConfig
 from cognite.client.data_classes.data_modeling import ViewId
@@ -11,14 +16,16 @@ from cognite.client.data_classes.data_modeling.query import (
     Select,
     SourceSelector,
 )
-from cognite.client.data_classes.filters import And, Range, SpaceFilter
-from cognite.client.exceptions import CogniteAPIError
+from cognite.client.data_classes.filters import And, Equals, Exists, Filter, HasData, In, Not, Or, Range, SpaceFilter
 
+from instrumentation import PREPARED_BETS_BYTES, record_cache, timed
 from settings import Settings, get_settings
+from swr import get_swr
 
+logger = logging.getLogger(__name__)
 
-def build_client(settings: Settings | None = None) -> CogniteClient:
-    s = settings or get_settings()
+
+def _build_live_client(s: Settings) -> CogniteClient:
     cfg = {
         "client_name": "tippelaget_web_api",
         "project": s.cognite_project,
@@ -35,21 +42,169 @@ def build_client(settings: Settings | None = None) -> CogniteClient:
     return CogniteClient(config=ClientConfig.load(cfg))
 
 
-def fetch_bet_view(client: CogniteClient, settings: Settings) -> pd.DataFrame:
-    view_id = ViewId(settings.default_space, settings.default_view, settings.default_view_version)
-    rows = client.data_modeling.instances.list(sources=[view_id], limit=1000)
-    if not rows:
+def build_client(settings: Settings | None = None) -> CogniteClient:
+    s = settings or get_settings()
+    if s.cognite_replay_path:
+        from tippelaget.core.replay import client_from_replay_config
+
+        replay_config = {
+            "path": s.cognite_replay_path,
+            "mode": s.cognite_replay_mode,
+            "latency_ms": s.cognite_replay_latency_ms,
+            "jitter_ms": s.cognite_replay_jitter_ms,
+            "page_size": s.cognite_replay_page_size,
+            "error_rate": s.cognite_replay_error_rate,
+        }
+        return client_from_replay_config(replay_config, lambda: _build_live_client(s))
+    return _build_live_client(s)
+
+
+@lru_cache
+def get_client() -> CogniteClient:
+    """Process-wide client, so the OAuth token is fetched once per instance rather than per request."""
+    return build_client(get_settings())
+
+
+@timed("cognite_token", upstream="cognite")
+def ensure_token(client: CogniteClient) -> None:
+    """Fetch (or reuse) the OAuth token up front so its cost shows up as its own span."""
+    client.config.credentials.authorization_header()
+
+
+# Schema of the prepared bets frame (match tippelaget.core.data).
+BET_FLOAT_COLUMNS = ("payout", "betNok", "odds")
+BET_CATEGORY_COLUMNS = ("player", "description")
+BET_SORT_COLUMNS = ["gameweek_num", "date", "player"]
+
+# Properties the app reads from each view; queries select only these. Direct relations are
+# reduced to their external id.
+BET_PROPERTIES = ("player", "gameweek", "payout", "betNok", "odds", "date", "description")
+BET_RELATIONS = ("player", "gameweek")
+# A Premier League season; bounds the `GW_n` reference lists of a gameweek filter.
+MAX_GAMEWEEK = 38
+EVENT_PROPERTIES = ("eventName", "H", "A", "D")
+EVENT_PAGE_SIZE = 1000
+BET_PAGE_SIZE = 1000
+
+
+def _view_properties(node: Any, view_id: ViewId) -> dict:
+    if isinstance(node, dict):
+        # Raw API JSON item: properties -> space -> "view/version" -> {...}
+        view_key = f"{view_id.external_id}/{view_id.version}"
+        return node.get("properties", {}).get(view_id.space, {}).get(view_key) or {}
+    return node.properties.get(view_id) or {}
+
+
+def _relation_external_id(value: Any) -> Any:
+    if isinstance(value, dict):
+        return value.get("externalId")
+    return getattr(value, "external_id", value)
+
+
+def build_bets_frame(chunks: Iterable[Iterable[Any]], view_id: ViewId) -> pd.DataFrame:
+    """Bets frame built column by column from node chunks (SDK nodes or raw API JSON items).
+
+    Only `BET_PROPERTIES` are kept, direct relations become their external id and columns get
+    their final dtypes directly; chunks are consumed one page at a time.
+    """
+    columns: dict[str, list] = {p: [] for p in BET_PROPERTIES}
+    appends = [(p, columns[p].append) for p in BET_PROPERTIES]
+    for chunk in chunks:
+        for node in chunk:
+            props = _view_properties(node, view_id)
+            for prop, append in appends:
+                append(props.get(prop))
+    if not columns["player"]:
         return pd.DataFrame()
-    extracted = []
-    for row in rows:
-        props = row.properties.get(view_id)
-        extracted.append(props)
-    return pd.json_normalize(extracted)
+    data: dict[str, Any] = {}
+    for prop, values in columns.items():
+        if prop not in BET_RELATIONS and all(v is None for v in values):
+            continue  # property not in the view
+        if prop in BET_RELATIONS:
+            data[prop] = pd.Categorical([_relation_external_id(v) for v in values])
+        elif prop in BET_FLOAT_COLUMNS:
+            data[prop] = np.array(values, dtype=np.float32)
+        elif prop in BET_CATEGORY_COLUMNS:
+            data[prop] = pd.Categorical(values)
+        else:
+            data[prop] = values
+    return pd.DataFrame(data)
+
+
+def query_node_pages(client: CogniteClient, query: Query, name: str) -> Iterator[Any]:
+    """Pages of result set `name`, following its cursor until exhausted (mutates `query.cursors`)."""
+    while True:
+        page = client.data_modeling.instances.query(query=query)[name]
+        yield page
+        if not page or not page.cursor:
+            return
+        query.cursors = {name: page.cursor}
+
+
+def _gameweek_refs(space: str, first: int, last: int) -> list[dict[str, str]]:
+    return [{"space": space, "externalId": f"GW_{n}"} for n in range(first, min(last, MAX_GAMEWEEK) + 1)]
+
+
+def bet_filter(
+    view_id: ViewId,
+    player: str | None = None,
+    from_gw: int | None = None,
+    to_gw: int | None = None,
+    start_date: str | None = None,
+    end_date: str | None = None,
+    include_undated: bool = False,
+) -> Filter:
+    """CDF filter for a slice of the Bet view: one player, an inclusive gameweek range and/or a
+    `[start_date, end_date)` date range (plus bets without a date if `include_undated`).
+
+    Player and gameweek are direct relations, so the player is an equality on the reference and
+    the gameweek range a set of `GW_n` references (an open start excludes GW_1..from_gw-1 instead).
+    A relation has no order to `Range` over, so both sets are capped at `MAX_GAMEWEEK` references.
+    """
+    filters: list[Filter] = [HasData(views=[view_id])]
+    if start_date or end_date:
+        dated = Range(view_id.as_property_ref("date"), gte=start_date, lt=end_date)
+        filters.append(Or(dated, Not(Exists(view_id.as_property_ref("date")))) if include_undated else dated)
+    if player:
+        filters.append(Equals(view_id.as_property_ref("player"), {"space": view_id.space, "externalId": player}))
+    gameweek = view_id.as_property_ref("gameweek")
+    if to_gw is not None:
+        filters.append(In(gameweek, _gameweek_refs(view_id.space, max(from_gw or 1, 1), to_gw)))
+    elif from_gw is not None and from_gw > 1:
+        filters.append(Not(In(gameweek, _gameweek_refs(view_id.space, 1, from_gw - 1))))
+    return And(*filters) if len(filters) > 1 else filters[0]
+
+
+def bet_query(view_id: ViewId, properties: Iterable[str] = BET_PROPERTIES, filter: Filter | None = None) -> Query:
+    if filter is None:
+        filter = HasData(views=[view_id])
+    return Query(
+        with_={"Bet": NodeResultSetExpression(filter=filter, limit=BET_PAGE_SIZE)},
+        select={"Bet": Select([SourceSelector(view_id, list(properties))])},
+    )
 
 
-def fetch_event_view(client: CogniteClient, settings: Settings) -> pd.DataFrame:
-    yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
-    today = datetime.now().strftime("%Y-%m-%d")
+@timed(upstream="cognite")
+def fetch_bet_view(
+    client: CogniteClient,
+    settings: Settings,
+    player: str | None = None,
+    from_gw: int | None = None,
+    to_gw: int | None = None,
+    start_date: str | None = None,
+    end_date: str | None = None,
+    include_undated: bool = False,
+) -> pd.DataFrame:
+    view_id = ViewId(settings.default_space, settings.default_view, settings.default_view_version)
+    query = bet_query(
+        view_id, filter=bet_filter(view_id, player, from_gw, to_gw, start_date, end_date, include_undated)
+    )
+    return build_bets_frame(query_node_pages(client, query, "Bet"), view_id)
+
+
+@timed(upstream="cognite")
+def fetch_event_window(client: CogniteClient, settings: Settings, start: str, end: str) -> pd.DataFrame:
+    """Events with `start <= eventDate < end` (ISO dates), in one cursor-paged query."""
     event_vid = ViewId(
         space=settings.default_space,
         external_id=settings.event_view,
@@ -59,23 +214,42 @@ def fetch_event_view(client: CogniteClient, settings: Settings) -> pd.DataFrame:
         with_={
             "Event": NodeResultSetExpression(
                 filter=And(
-                    Range((event_vid.as_property_ref("eventDate")), gt=yesterday, lte=today),
+                    Range(event_vid.as_property_ref("eventDate"), gte=start, lt=end),
                     SpaceFilter(space=settings.default_space),
                 ),
+                limit=EVENT_PAGE_SIZE,
             ),
         },
         select={
-            "Event": Select([SourceSelector(event_vid, ["*"])]),
+            "Event": Select([SourceSelector(event_vid, [*EVENT_PROPERTIES, "eventDate"])]),
         },
     )
-    try:
-        res = client.data_modeling.instances.query(query=query)
-        return res.get_nodes("Event").to_pandas(expand_properties=True)
-    except CogniteAPIError:
-        return pd.DataFrame()
+    # Errors propagate: an empty frame would tell the King there are no events.
+    frames = [page.to_pandas(expand_properties=True) for page in query_node_pages(client, query, "Event") if page]
+    if not frames:
+        return pd.DataFrame(columns=[*EVENT_PROPERTIES, "eventDate"])
+    return pd.concat(frames, ignore_index=True)
 
 
+def parse_gameweek_numbers(gameweek: pd.Series) -> tuple[pd.Series, np.ndarray | pd.arrays.IntegerArray]:
+    """Parse "GW_X" ids into a categorical ordered by X, plus int16 X per row.
+
+    Only the distinct ids are parsed; rows pick their number up by category code. Rows without an
+    id (code -1) get <NA>, in a nullable Int16 array, instead of wrapping around to the last number.
+    """
+    cat = gameweek.astype("category")
+    nums = cat.cat.categories.str.extract(r"GW_(\d+)", expand=False).astype(int).to_numpy()
+    order = np.argsort(nums, kind="stable")
+    cat = cat.cat.reorder_categories(cat.cat.categories[order])
+    codes = cat.cat.codes.to_numpy()
+    values = nums[order].astype(np.int16)[codes]
+    missing = codes < 0
+    return cat, pd.arrays.IntegerArray(values, missing) if missing.any() else values
+
+
+@timed()
 def prepare_bets_df(df: pd.DataFrame) -> pd.DataFrame:
+    """Categorical player/gameweek/description, int16 gameweek_num, float32 money/odds, stable row order."""
     if df.empty:
         return df
     df = df.rename(
@@ -85,31 +259,237 @@ def prepare_bets_df(df: pd.DataFrame) -> pd.DataFrame:
         }
     )
     df = df.drop(columns=["player.space", "gameweek.space"], errors="ignore")
-    df["gameweek_num"] = df["gameweek"].str.extract(r"GW_(\d+)").astype(int)
+    df["gameweek"], df["gameweek_num"] = parse_gameweek_numbers(df["gameweek"])
+    if df["gameweek_num"].isna().any():
+        # Every series is keyed on the gameweek, so a bet without one has nowhere to go.
+        logger.warning("Dropping %d bets without a gameweek", int(df["gameweek_num"].isna().sum()))
+        df = df[df["gameweek_num"].notna()].astype({"gameweek_num": np.int16})
+    for col in BET_CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    for col in BET_FLOAT_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype(np.float32)
     df["won"] = df["payout"] > 0
     if "date" in df.columns:
-        df["date"] = pd.to_datetime(df["date"])
-    return df
+        df["date"] = pd.to_datetime(df["date"], format="ISO8601")
+    sort_cols = [c for c in BET_SORT_COLUMNS if c in df.columns]
+    return df.sort_values(sort_cols, kind="stable").reset_index(drop=True)
 
 
-def create_monthly_innskudd_df() -> pd.DataFrame:
-    dates = pd.date_range(start="2025-03-15", end=pd.Timestamp.today(), freq="MS") + pd.DateOffset(days=14)
-    return pd.DataFrame({"date": dates, "innskudd": 600})
+def frame_memory_report(df: pd.DataFrame) -> dict[str, int]:
+    """Deep memory usage in bytes per column, plus "total"."""
+    usage = df.memory_usage(deep=True, index=True)
+    report = {str(k): int(v) for k, v in usage.items()}
+    report["total"] = int(usage.sum())
+    return report
 
 
-def get_prepared_bets(client: CogniteClient, settings: Settings) -> pd.DataFrame:
-    return prepare_bets_df(fetch_bet_view(client, settings))
+# Deposit rules: `amount` NOK on `day` of every month, optionally only within [`start`, `end`)
+# and for one `player` (match tippelaget.core.config).
+DEFAULT_INNSKUDD_SCHEDULE = ({"amount": 600, "day": 15},)
 
 
-def get_todays_events_prepared(client: CogniteClient, settings: Settings) -> pd.DataFrame:
-    df = fetch_event_view(client, settings)
-    if df.empty:
+def create_monthly_innskudd_df(
+    start: str = "2025-03-15",
+    end: str | None = None,
+    schedule: Iterable[dict[str, Any]] | None = None,
+) -> pd.DataFrame:
+    """Deposits from `schedule` (default 600 NOK on the 15th) for the months after `start` until `end`
+    (exclusive, default today). Has a `player` column when any rule is per player."""
+    today = pd.Timestamp.today()
+    frames = []
+    for rule in DEFAULT_INNSKUDD_SCHEDULE if schedule is None else schedule:
+        first = max(pd.Timestamp(start), pd.Timestamp(rule.get("start") or start))
+        last = today
+        for bound in (end, rule.get("end")):
+            if bound:
+                last = min(last, pd.Timestamp(bound) - pd.Timedelta(days=1))
+        dates = deposit_dates(pd.date_range(start=first, end=last, freq="MS"), int(rule.get("day", 15)))
+        frame = pd.DataFrame({"date": dates, "innskudd": rule["amount"]})
+        if rule.get("player"):
+            frame["player"] = rule["player"]
+        frames.append(frame)
+    if not frames:
+        return pd.DataFrame({"date": pd.Series(dtype="datetime64[ns]"), "innskudd": pd.Series(dtype=float)})
+    return pd.concat(frames, ignore_index=True).sort_values("date", kind="stable").reset_index(drop=True)
+
+
+def deposit_dates(months: pd.DatetimeIndex, day: int) -> pd.DatetimeIndex:
+    """`day` of each month in `months` (month starts), clamped to the month's last day (31 -> 30 Apr)."""
+    days = np.minimum(day, months.days_in_month) - 1
+    return months + pd.to_timedelta(days, unit="D")
+
+
+# Seasons are partitions of the Bet view by date, see `Settings.seasons`.
+ALL_SEASONS = "all"
+
+
+def season_bounds(seasons: dict[str, str], season: str | None = None) -> tuple[str, str | None]:
+    """`(start, end)` ISO dates of a season (default: the current one); `end` is exclusive, None if open."""
+    starts = sorted(seasons.items(), key=lambda kv: kv[1])
+    if season is None:
+        season = starts[-1][0]
+    names = [name for name, _ in starts]
+    if season not in names:
+        raise KeyError(f"Unknown season {season!r}")
+    i = names.index(season)
+    return starts[i][1], starts[i + 1][1] if i + 1 < len(starts) else None
+
+
+def season_innskudd_df(
+    seasons: dict[str, str],
+    season: str | None = None,
+    schedule: Iterable[dict[str, Any]] | None = None,
+    player: str | None = None,
+) -> pd.DataFrame:
+    """Deposits for one season, or since the first season for `ALL_SEASONS`. With `player` (a
+    player-sliced dashboard) only that player's own deposit rules count; team-wide deposits go to
+    the team's kassa, not to any one player."""
+    if player is not None:
+        rules = DEFAULT_INNSKUDD_SCHEDULE if schedule is None else schedule
+        schedule = [rule for rule in rules if rule.get("player") == player]
+    if season == ALL_SEASONS:
+        return create_monthly_innskudd_df(min(seasons.values()), schedule=schedule)
+    return create_monthly_innskudd_df(*season_bounds(seasons, season), schedule=schedule)
+
+
+@lru_cache
+def get_shared_cache(directory: str, ttl_s: float):
+    """Cross-worker frame cache (see shared_cache.py) for `settings.shared_cache_dir`, or None if unset."""
+    if not directory:
+        return None
+    from shared_cache import SharedFrameCache
+
+    return SharedFrameCache(directory, ttl_s)
+
+
+def get_prepared_bets(
+    client: CogniteClient,
+    settings: Settings,
+    player: str | None = None,
+    from_gw: int | None = None,
+    to_gw: int | None = None,
+    season: str | None = None,
+) -> pd.DataFrame:
+    """Prepared bets of one season (default: current) or `ALL_SEASONS`, optionally only one
+    player's and/or a gameweek range. All slicing is filtered in CDF.
+
+    Whole seasons are served stale-while-revalidate (see swr.py). Bets without a date belong to
+    the current season (the open one), so they are not lost to the date partitioning.
+    """
+    unsliced = player is None and from_gw is None and to_gw is None
+    shared = get_shared_cache(settings.shared_cache_dir, settings.shared_cache_ttl_s)
+    if season == ALL_SEASONS:
+        if unsliced and shared is not None:
+            return shared.get_or_fetch("bets-all", lambda: _all_seasons_bets(client, settings, player, from_gw, to_gw))
+        return _all_seasons_bets(client, settings, player, from_gw, to_gw)
+
+    start, end = season_bounds(settings.seasons, season)
+    undated = end is None
+    if not unsliced:
+        return prepare_bets_df(fetch_bet_view(client, settings, player, from_gw, to_gw, start, end, undated))
+
+    closed = end is not None and end <= date.today().isoformat()
+    name = _season_bets_name(start, end)
+
+    def fetch() -> pd.DataFrame:
+        if shared is not None:
+            # One worker per host fetches; every worker maps the same file.
+            return shared.get_or_fetch(
+                name,
+                lambda: prepare_bets_df(
+                    fetch_bet_view(client, settings, start_date=start, end_date=end, include_undated=undated)
+                ),
+                ttl_s=math.inf if closed else None,
+            )
+        df = prepare_bets_df(
+            fetch_bet_view(client, settings, start_date=start, end_date=end, include_undated=undated)
+        )
+        if season is None:
+            PREPARED_BETS_BYTES.set(frame_memory_report(df)["total"])
         return df
-    cols = ["eventName", "H", "A", "D"]
-    available = [c for c in cols if c in df.columns]
-    return df[available]
 
+    # Bets of seasons that have ended never change, so those are never refreshed.
+    fresh_s = math.inf if closed else settings.swr_bets_fresh_s
+    return get_swr(settings.last_good_dir).get(name, fetch, fresh_s)
+
+
+def _season_bets_name(start: str, end: str | None) -> str:
+    return f"bets-{start}-{end or 'open'}"
 
+
+def refresh_prepared_bets(client: CogniteClient, settings: Settings) -> pd.DataFrame:
+    """The current season's bets fetched now (e.g. after a workflow run), replacing the
+    stale-while-revalidate value and the shared-cache entry so the next reads see them."""
+    start, end = season_bounds(settings.seasons)
+    name = _season_bets_name(start, end)
+    shared = get_shared_cache(settings.shared_cache_dir, settings.shared_cache_ttl_s)
+
+    def fetch() -> pd.DataFrame:
+        return prepare_bets_df(
+            fetch_bet_view(client, settings, start_date=start, end_date=end, include_undated=end is None)
+        )
+
+    if shared is not None:
+        # The other workers map the new file on their next refresh; "all" is rebuilt from it.
+        shared.invalidate("bets-all")
+        return get_swr(settings.last_good_dir).refresh(name, lambda: shared.replace(name, fetch))
+    return get_swr(settings.last_good_dir).refresh(name, fetch)
+
+
+def _all_seasons_bets(
+    client: CogniteClient, settings: Settings, player: str | None, from_gw: int | None, to_gw: int | None
+) -> pd.DataFrame:
+    # Built from the per-season partitions, so seasons that have ended are never refetched.
+    names = sorted(settings.seasons, key=settings.seasons.get)
+    return concat_seasons([get_prepared_bets(client, settings, player, from_gw, to_gw, name) for name in names])
+
+
+def concat_seasons(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """Prepared bets of consecutive seasons (oldest first) as one frame.
+
+    When a season's gameweeks restart (GW_1 again), its gameweeks are renumbered to continue after
+    the previous season's last, so all-time series run season after season instead of mixing them.
+    Seasons that keep counting are left as they are.
+    """
+    renumbered = []
+    last = 0
+    for frame in frames:
+        if frame.empty:
+            continue
+        nums = frame["gameweek_num"].astype(int)
+        shift = last - int(nums.min()) + 1 if nums.min() <= last else 0
+        if shift:
+            frame = frame.assign(gameweek="GW_" + (nums + shift).astype(str))
+        renumbered.append(frame)
+        last = int(nums.max()) + shift
+    return prepare_bets_df(pd.concat(renumbered, ignore_index=True)) if renumbered else pd.DataFrame()
+
+
+def get_todays_events_prepared(client: CogniteClient, settings: Settings) -> pd.DataFrame:
+    """Today's events from the rolling event window (see event_store.py); raises only if the
+    window has never been fetched."""
+    from event_store import get_event_store
+
+    def fetch(start: str, end: str) -> pd.DataFrame:
+        return fetch_event_window(client, settings, start, end)
+
+    store = get_event_store(settings.last_good_dir, settings.event_window_days, settings.event_window_refresh_s)
+    store.start_schedule(fetch)
+    df = store.events_on(date.today(), fetch)
+    return df[[c for c in EVENT_PROPERTIES if c in df.columns]]
+
+
+def refresh_event_window(client: CogniteClient, settings: Settings) -> None:
+    """Refetch the event window now (e.g. after a workflow run wrote the day's events)."""
+    from event_store import get_event_store
+
+    store = get_event_store(settings.last_good_dir, settings.event_window_days, settings.event_window_refresh_s)
+    store.refresh(lambda start, end: fetch_event_window(client, settings, start, end))
+
+
+@timed(upstream="cognite")
 def execute_workflow(client: CogniteClient, settings: Settings):
     return client.workflows.executions.run(
         workflow_external_id=settings.workflow_external_id,
@@ -117,12 +497,14 @@ def execute_workflow(client: CogniteClient, settings: Settings):
     )
 
 
+@timed(upstream="cognite")
 def check_workflow_status(client: CogniteClient, execution_id: str | int) -> str:
     """Cognite may return execution id as int (legacy) or UUID string."""
     res = client.workflows.executions.retrieve_detailed(execution_id)
     return res.status
 
 
+@timed(upstream="cognite")
 def check_last_workflow_runtime(client: CogniteClient, settings: Settings) -> int | None:
     res = client.workflows.executions.list((settings.workflow_external_id, settings.workflow_version))
     if not res:
@@ -131,3 +513,10 @@ def check_last_workflow_runtime(client: CogniteClient, settings: Settings) -> in
     if not detailed or not detailed.created_time:
         return None
     return detailed.created_time
+
+
+def get_last_workflow_runtime(client: CogniteClient, settings: Settings) -> int | None:
+    """`check_last_workflow_runtime`, stale-while-revalidate."""
+    return get_swr(settings.last_good_dir).get(
+        "workflow-last-run", lambda: check_last_workflow_runtime(client, settings), settings.swr_last_run_fresh_s
+    )
@@ -0,0 +1,116 @@
+"""Precompressed response bodies.
+
+A JSON body is identified by a hash of its bytes, so the dashboard, today's events and the last
+workflow run only change version when their data does. `CompressedBodies` compresses each version
+once per encoding (brotli when the `brotli` package is installed, gzip otherwise) and serves the
+stored bytes to every later request that accepts that encoding, instead of recompressing per
+request the way a generic compression middleware would.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any
+
+from instrumentation import record_cache, span
+
+# Below this, headers outweigh the savings (same threshold as Starlette's GZipMiddleware).
+MIN_SIZE = 500
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 9
+
+
+def body_version(body: bytes) -> str:
+    return hashlib.blake2b(body, digest_size=8).hexdigest()
+
+
+@lru_cache
+def _brotli() -> Any:
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def negotiate(accept_encoding: str) -> str | None:
+    """Best encoding we can produce that `Accept-Encoding` allows: "br", "gzip" or None."""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip()] = q
+    for encoding in ("br", "gzip"):
+        if encoding == "br" and _brotli() is None:
+            continue
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return _brotli().compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+class CompressedBodies:
+    """Compressed variants of the last `size` body versions."""
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self._lock = threading.Lock()
+        self._bodies: OrderedDict[tuple[str, str], bytes] = OrderedDict()
+
+    def get(self, version: str, body: bytes, encoding: str) -> bytes:
+        key = (version, encoding)
+        with self._lock:
+            cached = self._bodies.get(key)
+            if cached is not None:
+                self._bodies.move_to_end(key)
+        record_cache(f"compressed_{encoding}", cached is not None)
+        if cached is not None:
+            return cached
+        # Concurrent first requests for a version may both compress; the result is identical.
+        with span(f"compress_{encoding}"):
+            compressed = compress(body, encoding)
+        with self._lock:
+            self._bodies[key] = compressed
+            while len(self._bodies) > self.size:
+                self._bodies.popitem(last=False)
+        return compressed
+
+
+_bodies: CompressedBodies | None = None
+_bodies_lock = threading.Lock()
+
+
+def get_compressed_bodies(size: int) -> CompressedBodies:
+    """Process-wide cache, created with the configured size on first use."""
+    global _bodies
+    with _bodies_lock:
+        if _bodies is None:
+            _bodies = CompressedBodies(size)
+        return _bodies
+
+
+def encode_body(
+    body: bytes, accept_encoding: str, size: int, version: str | None = None
+) -> tuple[bytes, dict[str, str]]:
+    """`body` in the best accepted encoding, plus the headers describing it."""
+    headers = {"Vary": "Accept-Encoding"}
+    encoding = negotiate(accept_encoding) if len(body) >= MIN_SIZE else None
+    if encoding is None:
+        return body, headers
+    version = version or body_version(body)
+    headers["Content-Encoding"] = encoding
+    return get_compressed_bodies(size).get(version, body, encoding), headers
@@ -0,0 +1,198 @@
+"""Append-only engine for the cumulative dashboard series.
+
+`compute_cumulative_payout_series`, `compute_cumulative_vs_baseline` and `compute_team_total`
+re-sort and re-`cumsum` the whole history on every call. `CumulativeEngine` keeps the running
+totals per player and for the team, with the output points already built. `sync()` fingerprints
+the prepared bets per gameweek and derives only from the first gameweek that changed: a new
+gameweek appends its points, a corrected historical row truncates the series at its gameweek and
+re-derives from there.
+"""
+
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from chart_compute import _money
+from instrumentation import timed
+
+FINGERPRINT_COLUMNS = ["player", "gameweek_num", "date", "payout", "betNok"]
+
+
+def gameweek_fingerprints(df: pd.DataFrame) -> dict[int, tuple[int, int]]:
+    """(row count, order-independent hash sum) of the rows of each gameweek."""
+    hashes = pd.util.hash_pandas_object(df[FINGERPRINT_COLUMNS], index=False)
+    grouped = pd.DataFrame({"gw": df["gameweek_num"].to_numpy(), "h": hashes.to_numpy()}).groupby("gw")["h"]
+    sums, counts = grouped.sum(), grouped.size()
+    return {int(gw): (int(counts[gw]), int(sums[gw])) for gw in sums.index}
+
+
+class _Series:
+    """Points of one line, ordered by gameweek; `values` are the unrounded running totals."""
+
+    def __init__(self, *fields: str) -> None:
+        self.fields = fields
+        self.gameweeks: list[int] = []
+        self.values: dict[str, list[float]] = {f: [] for f in fields}
+        self.points: list[dict[str, Any]] = []
+
+    def last(self, field: str) -> float:
+        values = self.values[field]
+        return values[-1] if values else 0.0
+
+    def truncate(self, gameweek: int) -> None:
+        """Drop every point at or after `gameweek`."""
+        i = bisect_left(self.gameweeks, gameweek)
+        del self.gameweeks[i:], self.points[i:]
+        for values in self.values.values():
+            del values[i:]
+
+    def extend(self, gameweeks: np.ndarray, **columns: np.ndarray) -> None:
+        gws = gameweeks.astype(int).tolist()
+        cols = {f: columns[f].astype(float).tolist() for f in self.fields}
+        self.gameweeks.extend(gws)
+        for f in self.fields:
+            self.values[f].extend(cols[f])
+        self.points.extend(
+            {"gameweek_num": gw, **{f: _money(cols[f][i]) for f in self.fields}} for i, gw in enumerate(gws)
+        )
+
+
+class CumulativeEngine:
+    """Running cumulative totals per player (per bet and per gameweek) and for the team."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._fingerprints: dict[int, tuple[int, int]] = {}
+        self._bets: dict[str, _Series] = {}
+        self._weeks: dict[str, _Series] = {}
+        self._team = _Series("cumulative_payout", "cumulative_stake")
+        # What the last sync did: mode "rebuild" | "append" | "rederive" | "unchanged", from which gameweek.
+        self.last_sync: dict[str, Any] = {}
+
+    @timed("cumulative_sync")
+    def sync(self, df: pd.DataFrame) -> dict[str, Any]:
+        """Bring the series up to date with the prepared bets `df` and return them."""
+        fingerprints = gameweek_fingerprints(df) if not df.empty else {}
+        with self._lock:
+            old = self._fingerprints
+            changed = {gw for gw in fingerprints.keys() | old.keys() if fingerprints.get(gw) != old.get(gw)}
+            if not changed:
+                self.last_sync = {"mode": "unchanged", "from_gameweek": None, "rows": 0}
+            else:
+                first = min(changed)
+                if not old:
+                    mode = "rebuild"
+                elif first > max(old):
+                    mode = "append"
+                else:
+                    mode = "rederive"
+                rows = self._replace_from(first, df)
+                self._fingerprints = fingerprints
+                self.last_sync = {"mode": mode, "from_gameweek": first, "rows": rows}
+            return self._snapshot()
+
+    def _replace_from(self, first: int, df: pd.DataFrame) -> int:
+        for series in (*self._bets.values(), *self._weeks.values(), self._team):
+            series.truncate(first)
+        tail = self._rows_from(df, first)
+        if not tail.empty:
+            self._append_bets(tail)
+            self._append_weeks(tail)
+            self._append_team(tail)
+        # Players without any remaining points (all their rows corrected away) disappear.
+        for store in (self._bets, self._weeks):
+            for player in [p for p, s in store.items() if not s.gameweeks]:
+                del store[player]
+        return len(tail)
+
+    @staticmethod
+    def _rows_from(df: pd.DataFrame, first: int) -> pd.DataFrame:
+        gws = df["gameweek_num"]
+        if gws.is_monotonic_increasing:
+            # Prepared bets are sorted by gameweek, so the tail is a slice.
+            return df.iloc[int(gws.searchsorted(first)):]
+        return df[gws >= first]
+
+    def _append_bets(self, tail: pd.DataFrame) -> None:
+        rows = tail.sort_values(["player", "gameweek_num", "date"], kind="stable")
+        payout = rows["payout"].astype("float64").fillna(0)
+        for player, idx in rows.groupby("player", observed=True).indices.items():
+            series = self._bets.setdefault(str(player), _Series("cumulative_payout"))
+            cum = series.last("cumulative_payout") + payout.iloc[idx].cumsum().to_numpy()
+            series.extend(rows["gameweek_num"].iloc[idx].to_numpy(), cumulative_payout=cum)
+
+    def _append_weeks(self, tail: pd.DataFrame) -> None:
+        weekly = tail.groupby(["player", "gameweek_num"], observed=True)["payout"].sum().astype("float64")
+        for player, group in weekly.groupby(level="player", observed=True):
+            series = self._weeks.setdefault(str(player), _Series("cumulative_payout"))
+            cum = series.last("cumulative_payout") + group.cumsum().to_numpy()
+            series.extend(group.index.get_level_values("gameweek_num").to_numpy(), cumulative_payout=cum)
+
+    def _append_team(self, tail: pd.DataFrame) -> None:
+        weekly = tail.groupby("gameweek_num").agg(payout=("payout", "sum"), stake=("betNok", "sum")).astype("float64")
+        self._team.extend(
+            weekly.index.to_numpy(),
+            cumulative_payout=self._team.last("cumulative_payout") + weekly["payout"].cumsum().to_numpy(),
+            cumulative_stake=self._team.last("cumulative_stake") + weekly["stake"].cumsum().to_numpy(),
+        )
+
+    def _snapshot(self) -> dict[str, Any]:
+        """The three dashboard sections, shaped like the matching `compute_*` functions."""
+        if not self._team.gameweeks:
+            return {
+                "cumulative_payout": [],
+                "cumulative_vs_baseline": {"players": [], "baseline": []},
+                "team_total": {"series": [], "diff": None},
+            }
+
+        def lines(store: dict[str, _Series]) -> list[dict[str, Any]]:
+            return [
+                {
+                    "player": player,
+                    "points": list(s.points),
+                    "last_label": f"{s.last('cumulative_payout'):.0f}",
+                }
+                for player, s in sorted(store.items())
+            ]
+
+        team = self._team
+        n_players = len(self._weeks)
+        baseline = [
+            {"gameweek_num": gw, "per_player_stake": _money(stake / n_players)}
+            for gw, stake in zip(team.gameweeks, team.values["cumulative_stake"])
+        ]
+        payout_last, stake_last = team.last("cumulative_payout"), team.last("cumulative_stake")
+        return {
+            "cumulative_payout": lines(self._bets),
+            "cumulative_vs_baseline": {
+                "players": lines(self._weeks),
+                "baseline": baseline,
+                "baseline_last_label": f"{stake_last / n_players:.0f}",
+            },
+            "team_total": {
+                "series": list(team.points),
+                "diff": _money(payout_last - stake_last),
+                "last_gameweek": team.gameweeks[-1],
+            },
+        }
+
+
+_engines: dict[str, CumulativeEngine] = {}
+_engines_lock = threading.Lock()
+
+
+def get_engine(key: str) -> CumulativeEngine:
+    """Process-wide engine per dashboard partition (e.g. per season)."""
+    with _engines_lock:
+        return _engines.setdefault(key, CumulativeEngine())
+
+
+def reset_engines() -> None:
+    """Drop every engine, so the next dashboards derive their cumulative series from scratch."""
+    with _engines_lock:
+        _engines.clear()
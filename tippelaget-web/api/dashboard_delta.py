@@ -0,0 +1,95 @@
+"""Versioned dashboard payloads and deltas between them.
+
+A dashboard's version is a hash of its JSON body, so every instance assigns the same version to
+the same data. `DashboardHistory` keeps the last few payloads by version; a client that sends
+`?since=<version>` gets the operations that turn the payload it holds into the current one
+instead of the whole dashboard. Unknown (evicted, or from an instance that never served it)
+versions get the full payload.
+
+Operations are applied in order to the old payload; `path` is a list of object keys and list
+indices from the root:
+
+    {"op": "set", "path": [...], "value": ...}      replace the value at path
+    {"op": "append", "path": [...], "value": [...]} extend the list at path
+
+Series only ever grow at the end while the season runs, so a new gameweek becomes a few
+`append`s plus `set`s for the bar values and labels that moved.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any
+
+from instrumentation import record_cache, timed
+
+
+def payload_version(body: str) -> str:
+    return hashlib.blake2b(body.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def diff(old: Any, new: Any, path: list[Any] | None = None) -> list[dict[str, Any]]:
+    """Operations turning `old` into `new` (empty when they are equal)."""
+    path = path or []
+    if old == new:
+        return []
+    if isinstance(old, dict) and isinstance(new, dict) and old.keys() == new.keys():
+        return [op for key in new for op in diff(old[key], new[key], [*path, key])]
+    if isinstance(old, list) and isinstance(new, list):
+        n = len(old)
+        if len(new) > n and new[:n] == old:
+            return [{"op": "append", "path": path, "value": new[n:]}]
+        if len(new) == n and all(_same_row(a, b) for a, b in zip(old, new)):
+            # Same players in the same order: descend so only their changed fields travel.
+            return [op for i in range(n) for op in diff(old[i], new[i], [*path, i])]
+    return [{"op": "set", "path": path, "value": new}]
+
+
+def _same_row(a: Any, b: Any) -> bool:
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.get("player") == b.get("player") and a.get("gameweek_num") == b.get("gameweek_num")
+    return False
+
+
+class DashboardHistory:
+    """The last `size` dashboard payloads, by version."""
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self._lock = threading.Lock()
+        self._payloads: OrderedDict[str, Any] = OrderedDict()
+
+    def remember(self, version: str, payload: Any) -> None:
+        with self._lock:
+            self._payloads[version] = payload
+            self._payloads.move_to_end(version)
+            while len(self._payloads) > self.size:
+                self._payloads.popitem(last=False)
+
+    def get(self, version: str) -> Any | None:
+        with self._lock:
+            return self._payloads.get(version)
+
+    @timed("dashboard_delta")
+    def delta(self, since: str, version: str, payload: Any) -> dict[str, Any]:
+        """`{"version", "since", "ops"}` from `since` to `payload`, or `{"version", "full"}` if `since` is unknown."""
+        old = self.get(since) if since != version else payload
+        record_cache("dashboard_delta", old is not None)
+        if old is None:
+            return {"version": version, "full": payload}
+        return {"version": version, "since": since, "ops": diff(old, payload)}
+
+
+_history: DashboardHistory | None = None
+_history_lock = threading.Lock()
+
+
+def get_history(size: int) -> DashboardHistory:
+    """Process-wide history, created with the configured size on first use."""
+    global _history
+    with _history_lock:
+        if _history is None:
+            _history = DashboardHistory(size)
+        return _history
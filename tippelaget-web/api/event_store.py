@@ -0,0 +1,197 @@
+"""Rolling window of upcoming events, indexed by day (match tippelaget.core.event_store).
+
+Instead of one Cognite query per request for today's events, `EventWindowStore` fetches every
+event from today through the next `window_days` days in one paginated query and indexes them by
+`eventDate`. Later requests for any day inside that window are answered from the index without a
+network call. The window is refetched every `refresh_s`, by a background thread (`start_schedule`),
+or by a request that finds it older than that (stale-while-revalidate, as in swr.py). A request
+only waits on Cognite when the day asked for is outside the window or nothing was ever fetched. A
+failed refresh keeps the previous window. The last window is written to `directory` as Arrow IPC
+(window bounds and fetch time in the schema metadata), so a restarted process starts from it.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from instrumentation import record_cache, record_data_age, span
+
+logger = logging.getLogger(__name__)
+
+FILE_NAME = "events-window.arrow"
+START_KEY, END_KEY, FETCHED_AT_KEY = b"window_start", b"window_end", b"fetched_at"
+
+# fetch(start, end) -> events with an `eventDate` column, for ISO dates start <= eventDate < end.
+WindowFetch = Callable[[str, str], pd.DataFrame]
+
+
+@dataclass(frozen=True)
+class EventWindow:
+    start: str
+    end: str
+    fetched_at: float
+    by_day: dict[str, pd.DataFrame]
+    columns: list[str]
+
+    def covers(self, day: str) -> bool:
+        return self.start <= day < self.end
+
+    def events_on(self, day: str) -> pd.DataFrame:
+        return self.by_day.get(day, pd.DataFrame(columns=self.columns))
+
+
+def event_days(events: pd.DataFrame) -> pd.Series:
+    """`eventDate` as ISO day strings, whether CDF returned dates, timestamps or strings."""
+    return events["eventDate"].astype(str).str[:10]
+
+
+def build_window(events: pd.DataFrame, start: str, end: str, fetched_at: float) -> EventWindow:
+    events = events.reset_index(drop=True)
+    if events.empty or "eventDate" not in events.columns:
+        return EventWindow(start, end, fetched_at, {}, list(events.columns))
+    by_day = {day: frame.reset_index(drop=True) for day, frame in events.groupby(event_days(events), sort=False)}
+    return EventWindow(start, end, fetched_at, by_day, list(events.columns))
+
+
+class EventWindowStore:
+    def __init__(self, directory: str = "", window_days: int = 7, refresh_s: float = 6 * 3600) -> None:
+        self.directory = Path(directory) if directory else None
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        self.window_days = window_days
+        self.refresh_s = refresh_s
+        self._lock = threading.Lock()
+        # Held while a request waits on a fetch, so concurrent misses fetch once.
+        self._fetch_lock = threading.Lock()
+        self._window: EventWindow | None = None
+        self._refreshing = False
+        self._schedule: threading.Thread | None = None
+
+    def events_on(self, day: date, fetch: WindowFetch) -> pd.DataFrame:
+        """Events of `day`, from the index when the window covers it."""
+        iso = day.isoformat()
+        with self._lock:
+            window = self._window
+        if window is None:
+            window = self._load()
+            if window is not None:
+                with self._lock:
+                    window = self._window = self._window or window
+        hit = window is not None and window.covers(iso)
+        record_cache("event_window", hit)
+        if not hit:
+            with self._fetch_lock:
+                with self._lock:
+                    window = self._window
+                if window is None or not window.covers(iso):
+                    window = self.refresh(fetch, day)
+            return window.events_on(iso)
+
+        age = time.time() - window.fetched_at
+        record_data_age(age)
+        if age > self.refresh_s:
+            self._refresh_in_background(fetch)
+        return window.events_on(iso)
+
+    def refresh(self, fetch: WindowFetch, start: date | None = None) -> EventWindow:
+        """Fetch the window starting `start` (default today) now and index it."""
+        start = start or date.today()
+        end = start + timedelta(days=self.window_days)
+        fetched_at = time.time()
+        events = fetch(start.isoformat(), end.isoformat())
+        with span("index_event_window"):
+            window = build_window(events, start.isoformat(), end.isoformat(), fetched_at)
+        with self._lock:
+            self._window = window
+        if self.directory is not None:
+            try:
+                self._persist(events, window)
+            except Exception:
+                logger.exception("Could not persist the event window")
+        return window
+
+    def start_schedule(self, fetch: WindowFetch) -> None:
+        """Refetch the window every `refresh_s` from a daemon thread (once per store)."""
+        with self._lock:
+            if self._schedule is not None:
+                return
+            self._schedule = threading.Thread(target=self._run_schedule, args=(fetch,), name="event-window", daemon=True)
+        self._schedule.start()
+
+    def _run_schedule(self, fetch: WindowFetch) -> None:
+        while True:
+            time.sleep(self.refresh_s)
+            try:
+                self.refresh(fetch)
+            except Exception:
+                logger.exception("Scheduled event window refresh failed; keeping the previous window")
+
+    def _refresh_in_background(self, fetch: WindowFetch) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def refresh() -> None:
+            try:
+                self.refresh(fetch)
+            except Exception:
+                logger.exception("Refreshing the event window failed; serving the previous window")
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=refresh, name="event-window-refresh", daemon=True).start()
+
+    def _persist(self, events: pd.DataFrame, window: EventWindow) -> None:
+        events = events.reset_index(drop=True)
+        if "eventDate" in events.columns:
+            events = events.assign(eventDate=event_days(events))
+        table = pa.Table.from_pandas(events, preserve_index=False)
+        metadata = {
+            **(table.schema.metadata or {}),
+            START_KEY: window.start.encode(),
+            END_KEY: window.end.encode(),
+            FETCHED_AT_KEY: str(window.fetched_at).encode(),
+        }
+        path = self.directory / FILE_NAME
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        feather.write_feather(table.replace_schema_metadata(metadata), tmp)
+        os.replace(tmp, path)
+
+    def _load(self) -> EventWindow | None:
+        if self.directory is None or not (self.directory / FILE_NAME).is_file():
+            return None
+        try:
+            table = feather.read_table(self.directory / FILE_NAME)
+            meta = table.schema.metadata
+            return build_window(
+                table.to_pandas(), meta[START_KEY].decode(), meta[END_KEY].decode(), float(meta[FETCHED_AT_KEY])
+            )
+        except Exception:
+            logger.warning("Ignoring unreadable event window in %s", self.directory)
+            return None
+
+
+_store: EventWindowStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_event_store(directory: str, window_days: int, refresh_s: float) -> EventWindowStore:
+    """Process-wide store (created with the configured settings on first use)."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = EventWindowStore(directory, window_days, refresh_s)
+        return _store
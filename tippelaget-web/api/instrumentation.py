@@ -0,0 +1,233 @@
+"""Per-request timing spans, `Server-Timing` headers and Prometheus-format metrics.
+
+`span()` / `@timed` record a named duration on the current request (reported in its
+`Server-Timing` header) and, for upstream calls, in a per-upstream latency histogram.
+`TimingMiddleware` times whole requests per route and reports the age of the oldest cached
+upstream data a response was built from (`record_data_age`) in `X-Data-Age`; `render_metrics()`
+is served at `/api/metrics`.
+Standard library only, so importing it does not slow down cold starts.
+"""
+
+from __future__ import annotations
+
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Seconds; upstream calls and whole requests share the same buckets.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_spans: ContextVar[list[tuple[str, float]] | None] = ContextVar("tippelaget_spans", default=None)
+_data_ages: ContextVar[list[float] | None] = ContextVar("tippelaget_data_ages", default=None)
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, label_names: tuple[str, ...]) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._lock = threading.Lock()
+        # labels -> (bucket counts, sum, count)
+        self._series: dict[tuple[str, ...], list[Any]] = {}
+
+    def observe(self, seconds: float, *labels: str) -> None:
+        with self._lock:
+            series = self._series.setdefault(labels, [[0] * len(BUCKETS), 0.0, 0])
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    series[0][i] += 1
+            series[1] += seconds
+            series[2] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, [list(v[0]), v[1], v[2]]) for k, v in self._series.items())
+        for labels, (buckets, total, count) in items:
+            base = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(self.label_names, labels))
+            sep = "," if base else ""
+            for bound, n in zip(BUCKETS, buckets):
+                lines.append(f'{self.name}_bucket{{{base}{sep}le="{bound}"}} {n}')
+            lines.append(f'{self.name}_bucket{{{base}{sep}le="+Inf"}} {count}')
+            lines.append(f"{self.name}_sum{{{base}}} {total}")
+            lines.append(f"{self.name}_count{{{base}}} {count}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, label_names: tuple[str, ...]) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._lock = threading.Lock()
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        with self._lock:
+            return self._values.get(labels, 0.0)
+
+    def label_sets(self) -> list[tuple[str, ...]]:
+        with self._lock:
+            return list(self._values)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            base = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(self.label_names, labels))
+            lines.append(f"{self.name}{{{base}}} {value}")
+        return lines
+
+
+class Gauge:
+    def __init__(self, name: str, help_text: str) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = float(value)
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} gauge", f"{self.name} {self.value}"]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REQUEST_SECONDS = Histogram(
+    "tippelaget_request_duration_seconds", "API request latency per endpoint.", ("method", "endpoint", "status")
+)
+UPSTREAM_SECONDS = Histogram(
+    "tippelaget_upstream_duration_seconds", "Latency of calls to Cognite and OpenAI.", ("upstream", "call", "outcome")
+)
+CACHE_LOOKUPS = Counter("tippelaget_cache_lookups_total", "Cache lookups by cache and result.", ("cache", "result"))
+OPENAI_SECONDS = Histogram(
+    "tippelaget_openai_duration_seconds", "Chat completion latency per assistant and model.", ("assistant", "model")
+)
+OPENAI_TOKENS = Counter(
+    "tippelaget_openai_tokens_total", "Tokens per assistant, model and kind (prompt/completion).", ("assistant", "model", "kind")
+)
+PREPARED_BETS_BYTES = Gauge("tippelaget_prepared_bets_bytes", "Deep memory usage of the last prepared bets frame.")
+
+
+@contextmanager
+def span(name: str, upstream: str | None = None) -> Iterator[None]:
+    """Time a block as a `Server-Timing` entry; `upstream` also feeds the upstream histogram."""
+    t0 = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        elapsed = time.perf_counter() - t0
+        spans = _spans.get()
+        if spans is not None:
+            spans.append((name, elapsed))
+        if upstream:
+            UPSTREAM_SECONDS.observe(elapsed, upstream, name, outcome)
+
+
+def timed(name: str | None = None, upstream: str | None = None) -> Callable[[F], F]:
+    """Decorator form of `span`, named after the function by default."""
+
+    def decorate(fn: F) -> F:
+        span_name = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(span_name, upstream):
+                return fn(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    CACHE_LOOKUPS.inc(cache, "hit" if hit else "miss")
+
+
+def record_data_age(seconds: float) -> None:
+    """Note that the current response is built from data fetched `seconds` ago."""
+    ages = _data_ages.get()
+    if ages is not None:
+        ages.append(seconds)
+
+
+def server_timing_header(spans: list[tuple[str, float]], total: float) -> str:
+    parts = [f"{name};dur={elapsed * 1000:.1f}" for name, elapsed in spans]
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+class TimingMiddleware:
+    """ASGI middleware: collects spans per HTTP request and adds `Server-Timing` to the response."""
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        spans: list[tuple[str, float]] = []
+        ages: list[float] = []
+        token = _spans.set(spans)
+        ages_token = _data_ages.set(ages)
+        t0 = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message: dict) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                header = server_timing_header(spans, time.perf_counter() - t0)
+                headers.append((b"server-timing", header.encode("latin-1")))
+                headers.append((b"timing-allow-origin", b"*"))
+                if ages:
+                    headers.append((b"x-data-age", str(int(max(ages))).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _spans.reset(token)
+            _data_ages.reset(ages_token)
+            route = scope.get("route")
+            endpoint = getattr(route, "path", None) or "unmatched"
+            REQUEST_SECONDS.observe(time.perf_counter() - t0, scope.get("method", ""), endpoint, str(status))
+
+
+def cache_hit_ratios() -> dict[str, float]:
+    caches = {labels[0] for labels in CACHE_LOOKUPS.label_sets()}
+    ratios = {}
+    for cache in sorted(caches):
+        hits, misses = CACHE_LOOKUPS.value(cache, "hit"), CACHE_LOOKUPS.value(cache, "miss")
+        ratios[cache] = hits / (hits + misses) if hits + misses else 0.0
+    return ratios
+
+
+def render_metrics() -> str:
+    lines = REQUEST_SECONDS.render() + UPSTREAM_SECONDS.render() + CACHE_LOOKUPS.render()
+    lines += OPENAI_SECONDS.render() + OPENAI_TOKENS.render()
+    lines += PREPARED_BETS_BYTES.render()
+    lines += ["# HELP tippelaget_cache_hit_ratio Hits / lookups per cache.", "# TYPE tippelaget_cache_hit_ratio gauge"]
+    lines += [f'tippelaget_cache_hit_ratio{{cache="{_escape(c)}"}} {r}' for c, r in cache_hit_ratios().items()]
+    return "\n".join(lines) + "\n"
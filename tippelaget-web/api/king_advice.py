@@ -0,0 +1,153 @@
+"""Default King advice per player, computed ahead of time (match tippelaget.core.king_advice).
+
+Today's events change once a day and the players are a fixed set, so the King's answer to
+`DEFAULT_QUESTION` is computed in the background per player and served from memory. Answers are
+keyed by (player, hash of today's events snippet, hash of the player's bets snippet): a new day's
+events or new bets after a workflow run change the key, and the next `ensure` recomputes. Answers
+are also written to `directory`, so other workers and restarted processes reuse them. Free-form
+questions still go to the model live.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from instrumentation import record_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUESTION = "What should I bet on today?"
+
+AdviceKey = tuple[str, str, str]
+
+# A failed computation is not retried for this long, however often the advice is asked for.
+RETRY_AFTER_S = 300.0
+
+
+def snippet_hash(snippet: list[dict[str, Any]]) -> str:
+    return hashlib.blake2b(json.dumps(snippet, sort_keys=True, default=str).encode(), digest_size=8).hexdigest()
+
+
+class KingAdviceCache:
+    """Answers by (player, events hash, bets hash), the latest per player, computed once each."""
+
+    def __init__(self, directory: str = "", retry_after_s: float = RETRY_AFTER_S) -> None:
+        self.directory = Path(directory) if directory else None
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._answers: dict[AdviceKey, str] = {}
+        self._pending: set[AdviceKey] = set()
+        self.retry_after_s = retry_after_s
+        self._failed: dict[AdviceKey, float] = {}
+
+    def get(self, key: AdviceKey) -> str | None:
+        with self._lock:
+            answer = self._answers.get(key)
+        if answer is None:
+            answer = self._load(key)
+            if answer is not None:
+                with self._lock:
+                    self._answers[key] = answer
+        record_cache("king_advice", answer is not None)
+        return answer
+
+    def is_pending(self, key: AdviceKey) -> bool:
+        with self._lock:
+            return key in self._pending
+
+    def ensure(self, keys: list[AdviceKey], run: Callable[[list[AdviceKey]], None]) -> None:
+        """Starts one background `run(missing)` for the `keys` that have no answer, are not already
+        being computed and have not failed within `retry_after_s`; `run` computes them and calls
+        `store` (or `fail`) per key."""
+        missing = [key for key in keys if self._peek(key) is None]
+        with self._lock:
+            missing = [key for key in missing if key not in self._pending and not self._cooling_down(key)]
+            self._pending.update(missing)
+        if not missing:
+            return
+
+        def compute() -> None:
+            try:
+                run(missing)
+            except Exception:
+                logger.exception("Precomputing King advice failed")
+                for key in missing:
+                    self.fail(key)
+            finally:
+                with self._lock:
+                    self._pending.difference_update(missing)
+
+        threading.Thread(target=compute, name="king-advice", daemon=True).start()
+
+    def fail(self, key: AdviceKey) -> None:
+        """Remember that computing `key` failed, so `ensure` leaves it alone for `retry_after_s`."""
+        with self._lock:
+            if key not in self._answers:
+                self._failed[key] = time.monotonic()
+
+    def failed(self, key: AdviceKey) -> bool:
+        """Whether the last attempt at `key` failed recently (and it is not being retried yet)."""
+        with self._lock:
+            return self._cooling_down(key)
+
+    def _cooling_down(self, key: AdviceKey) -> bool:
+        failed_at = self._failed.get(key)
+        return failed_at is not None and time.monotonic() - failed_at < self.retry_after_s
+
+    def store(self, key: AdviceKey, answer: str) -> None:
+        with self._lock:
+            # Advice for older events or bets is never asked for again.
+            self._answers = {k: v for k, v in self._answers.items() if k[0] != key[0]}
+            self._answers[key] = answer
+            self._failed = {k: t for k, t in self._failed.items() if k[0] != key[0]}
+        if self.directory is not None:
+            try:
+                path = self._path(key)
+                tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+                tmp.write_text(json.dumps({"answer": answer}, ensure_ascii=False), encoding="utf-8")
+                os.replace(tmp, path)
+                for old in self.directory.glob(f"king-advice-{key[0]}-*.json"):
+                    if old != path:
+                        old.unlink(missing_ok=True)
+            except Exception:
+                logger.exception("Could not persist King advice for %s", key[0])
+
+    def _peek(self, key: AdviceKey) -> str | None:
+        with self._lock:
+            answer = self._answers.get(key)
+        return answer if answer is not None else self._load(key)
+
+    def _path(self, key: AdviceKey) -> Path:
+        return self.directory / "king-advice-{}-{}-{}.json".format(*key)
+
+    def _load(self, key: AdviceKey) -> str | None:
+        if self.directory is None:
+            return None
+        try:
+            return json.loads(self._path(key).read_text(encoding="utf-8"))["answer"]
+        except FileNotFoundError:
+            return None
+        except Exception:
+            logger.warning("Ignoring unreadable King advice for %s", key[0])
+            return None
+
+
+_cache: KingAdviceCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_advice_cache(directory: str) -> KingAdviceCache:
+    """Process-wide cache, persisting to `directory` (created with the configured one on first use)."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = KingAdviceCache(directory)
+        return _cache
@@ -1,30 +1,40 @@
 from __future__ import annotations
 
 import datetime
-from pathlib import Path
-
-from fastapi import FastAPI, HTTPException
+import json
+import logging
+import threading
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Annotated, Literal
+
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
-from pydantic import BaseModel, Field
-
-from assistants_logic import run_king, run_prophet
-from chart_compute import compute_all_dashboard
-from cognite_data import (
-    build_client,
-    check_last_workflow_runtime,
-    check_workflow_status,
-    create_monthly_innskudd_df,
-    execute_workflow,
-    get_prepared_bets,
-    get_todays_events_prepared,
-)
-from settings import Settings, get_settings
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field, field_validator
+
+from compression import encode_body
+from dashboard_delta import get_history, payload_version
+from instrumentation import TimingMiddleware, record_cache, render_metrics, span
+from settings import CorsSettings, get_cors_settings, get_settings
+from startup import is_warm, load_dashboard_snapshot, load_player_image, start_warm_up, warm_up_report
+
+logger = logging.getLogger(__name__)
+
+# pandas, the Cognite SDK and OpenAI are imported inside the handlers (and ahead of time by
+# startup.warm_up), so a scale-to-zero instance can bind its port before paying for them.
 
-app = FastAPI(title="Tippelaget Web API", version="0.1.0")
 
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    start_warm_up(extra_steps=(("dashboard", _prime_dashboard), ("king_advice", _precompute_king_advice)))
+    yield
 
-def _cors_allow_origins(settings: Settings) -> list[str]:
+
+app = FastAPI(title="Tippelaget Web API", version="0.1.0", lifespan=lifespan)
+
+
+def _cors_allow_origins(settings: CorsSettings) -> list[str]:
     base = [
         "http://127.0.0.1:5173",
         "http://localhost:5173",
@@ -35,14 +45,71 @@ def _cors_allow_origins(settings: Settings) -> list[str]:
     return list(dict.fromkeys(base + extra))
 
 
-_cors_settings = get_settings()
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=_cors_allow_origins(_cors_settings),
+    allow_origins=_cors_allow_origins(get_cors_settings()),
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Dashboard-Version", "X-Data-Age"],
 )
+# Outermost, so request timings include CORS handling.
+app.add_middleware(TimingMiddleware)
+
+
+def _cognite():
+    """Cached Cognite client, with token acquisition recorded as its own span."""
+    from cognite_data import ensure_token, get_client
+
+    client = get_client()
+    ensure_token(client)
+    return client
+
+
+def _json_response(payload, headers: dict[str, str] | None = None, request: Request | None = None) -> Response:
+    # Encoded here rather than by FastAPI so the cost shows up in Server-Timing.
+    return _encoded_response(_encode_json(payload).encode("utf-8"), headers, request)
+
+
+def _encoded_response(
+    body: bytes, headers: dict[str, str] | None = None, request: Request | None = None, version: str | None = None
+) -> Response:
+    """JSON `body`, compressed once per version for clients whose `Accept-Encoding` allows it."""
+    accept = request.headers.get("accept-encoding", "") if request is not None else ""
+    content, encoding_headers = encode_body(body, accept, get_settings().compressed_cache_size, version)
+    return Response(content, media_type="application/json", headers={**(headers or {}), **encoding_headers})
+
+
+def _encode_json(payload) -> str:
+    with span("json_encode"):
+        return json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+
+
+def _dashboard_response(
+    payload,
+    since: str | None,
+    settings,
+    request: Request,
+    headers: dict[str, str] | None = None,
+    body: str | None = None,
+) -> Response:
+    """The payload with its version in `X-Dashboard-Version`; with `since`, a versioned delta envelope instead.
+
+    `body` is the payload already encoded, when the caller has it."""
+    body = body if body is not None else _encode_json(payload)
+    version = payload_version(body)
+    history = get_history(settings.dashboard_history_size)
+    history.remember(version, payload)
+    headers = {**(headers or {}), "X-Dashboard-Version": version}
+    if since is None:
+        return _encoded_response(body.encode("utf-8"), headers, request, version)
+    return _json_response(history.delta(since, version, payload), headers, request)
+
+
+PLAYER_PATTERN = "^(Elias|Mads|Tobias)$"
+# Gameweeks in a season (cognite_data.MAX_GAMEWEEK, kept here so main does not import pandas).
+MAX_GAMEWEEK = 38
+PLAYERS = ["Elias", "Mads", "Tobias"]
 
 
 class ProphetBody(BaseModel):
@@ -51,7 +118,23 @@ class ProphetBody(BaseModel):
 
 class KingBody(BaseModel):
     question: str = Field(..., min_length=1)
-    player: str = Field(..., pattern="^(Elias|Mads|Tobias)$")
+    player: str = Field(..., pattern=PLAYER_PATTERN)
+
+
+class BatchBody(BaseModel):
+    assistant: Literal["prophet", "king"]
+    questions: list[str] = Field(..., min_length=1, max_length=10)
+    # King only; every player when omitted.
+    players: list[Annotated[str, Field(pattern=PLAYER_PATTERN)]] | None = Field(None, min_length=1)
+
+    @field_validator("questions")
+    @classmethod
+    def _strip_questions(cls, questions: list[str]) -> list[str]:
+        """Strip every question first, so a whitespace-only one is rejected rather than sent."""
+        stripped = [q.strip() for q in questions]
+        if not all(stripped):
+            raise ValueError("questions must not be blank")
+        return stripped
 
 
 @app.get("/api/health")
@@ -59,62 +142,204 @@ def health():
     return {"ok": True}
 
 
+@app.get("/api/ready")
+def ready():
+    """Startup probe: 503 until the warm-up (token, bets, events, dashboard, images) has run and
+    its required steps (startup.REQUIRED_STEPS) succeeded, with each step's duration either way."""
+    report = warm_up_report()
+    status = 200 if report["ready"] else 503
+    return Response(json.dumps(report), status_code=status, media_type="application/json", headers={"Cache-Control": "no-store"})
+
+
+@app.get("/api/metrics")
+def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+def _check_season(season: str | None, settings) -> None:
+    if season is not None and season != "all" and season not in settings.seasons:
+        raise HTTPException(status_code=422, detail=f"Unknown season {season!r}")
+
+
+@app.get("/api/seasons")
+def seasons():
+    settings = get_settings()
+    ordered = sorted(settings.seasons.items(), key=lambda kv: kv[1])
+    return {
+        "seasons": [{"name": name, "start": start} for name, start in ordered],
+        "current": ordered[-1][0],
+    }
+
+
 @app.get("/api/dashboard")
-def dashboard():
+def dashboard(
+    request: Request,
+    player: str | None = Query(None, pattern=PLAYER_PATTERN),
+    from_gw: int | None = Query(None, ge=1, le=MAX_GAMEWEEK),
+    to_gw: int | None = Query(None, ge=1, le=MAX_GAMEWEEK),
+    season: str | None = None,
+    since: str | None = Query(None, max_length=64),
+    max_points: int | None = Query(None, ge=4),
+):
+    """Dashboard for the current season, or `season` (a name from `/api/seasons` or "all"),
+    optionally only the bets of `player` and/or gameweeks `from_gw`..`to_gw`. `max_points`
+    downsamples every line series to at most that many points (keeping ends and extremes).
+
+    With `since` (the `X-Dashboard-Version` / `version` of a payload the client holds) the
+    response is `{"version", "since", "ops"}` (see dashboard_delta), or `{"version", "full"}`
+    when that version is no longer known."""
+    if from_gw is not None and to_gw is not None and from_gw > to_gw:
+        raise HTTPException(status_code=422, detail="from_gw must not be after to_gw")
     settings = get_settings()
-    client = build_client(settings)
-    df = get_prepared_bets(client, settings)
-    innskudd = create_monthly_innskudd_df()
-    return compute_all_dashboard(df, innskudd)
+    _check_season(season, settings)
+    sliced = player is not None or from_gw is not None or to_gw is not None or season is not None
+    if not is_warm() and not sliced:
+        snapshot = load_dashboard_snapshot(settings.dashboard_snapshot_path)
+        record_cache("dashboard_snapshot", snapshot is not None)
+        if snapshot is not None:
+            headers = {"X-Dashboard-Snapshot": str(snapshot["generated_at_ms"])}
+            payload = snapshot["payload"]
+            if max_points is not None:
+                from chart_compute import downsample_dashboard
+
+                payload = downsample_dashboard(payload, max_points)
+            return _dashboard_response(payload, since, settings, request, headers)
+
+    from chart_compute import downsample_dashboard
+
+    payload, body = _build_dashboard(settings, player, from_gw, to_gw, season)
+    if body is not None and max_points is None:
+        return _dashboard_response(payload, since, settings, request, body=body)
+    return _dashboard_response(downsample_dashboard(payload, max_points), since, settings, request)
+
+
+def _build_dashboard(
+    settings, player: str | None, from_gw: int | None, to_gw: int | None, season: str | None
+) -> tuple[dict, str | None]:
+    """The dashboard payload, plus its encoded body when that came from the shared cache."""
+    from chart_compute import compute_all_dashboard
+    from cognite_data import get_prepared_bets, get_shared_cache, season_innskudd_df
+    from cumulative import get_engine
+
+    def compute():
+        df = get_prepared_bets(_cognite(), settings, player, from_gw, to_gw, season)
+        innskudd = season_innskudd_df(settings.seasons, season, settings.innskudd_schedule, player)
+        # Whole-league dashboards keep their cumulative series up to date incrementally.
+        engine = get_engine(f"season:{season or ''}") if unsliced else None
+        return compute_all_dashboard(df, innskudd, engine)
+
+    unsliced = player is None and from_gw is None and to_gw is None
+    shared = get_shared_cache(settings.shared_cache_dir, settings.shared_cache_ttl_s)
+    if unsliced and shared is not None:
+        # One worker per host computes the whole-league dashboard; the others map its encoded body.
+        body = shared.get_or_build_bytes(
+            f"dashboard-{season or 'current'}", lambda: _encode_json(compute()).encode("utf-8")
+        ).decode("utf-8")
+        return json.loads(body), body
+    return compute(), None
+
+
+def _prime_dashboard() -> None:
+    """Warm-up step: the default dashboard, its delta history entry and compressed bodies."""
+    settings = get_settings()
+    payload, body = _build_dashboard(settings, None, None, None, None)
+    body = body if body is not None else _encode_json(payload)
+    version = payload_version(body)
+    get_history(settings.dashboard_history_size).remember(version, payload)
+    for encoding in ("br", "gzip"):
+        encode_body(body.encode("utf-8"), encoding, settings.compressed_cache_size, version)
 
 
 @app.get("/api/events/today")
-def events_today():
-    settings = get_settings()
-    client = build_client(settings)
-    ev = get_todays_events_prepared(client, settings)
+def events_today(request: Request):
+    from cognite_data import get_todays_events_prepared
+
+    ev = get_todays_events_prepared(_cognite(), get_settings())
     if ev.empty:
-        return {"rows": []}
-    return {"rows": ev.replace({float("nan"): None}).to_dict(orient="records")}
+        return _json_response({"rows": []}, request=request)
+    return _json_response({"rows": ev.replace({float("nan"): None}).to_dict(orient="records")}, request=request)
 
 
 @app.get("/api/workflow/last-run")
-def workflow_last_run():
-    settings = get_settings()
-    client = build_client(settings)
-    ts = check_last_workflow_runtime(client, settings)
+def workflow_last_run(request: Request):
+    from cognite_data import get_last_workflow_runtime
+
+    ts = get_last_workflow_runtime(_cognite(), get_settings())
     if ts is None:
-        return {"created_time_ms": None, "display_utc_plus_2": None}
+        return _json_response({"created_time_ms": None, "display_utc_plus_2": None}, request=request)
     try:
         dt = datetime.datetime.fromtimestamp(int(ts) / 1000) + datetime.timedelta(hours=2)
         display = dt.strftime("%Y-%m-%d %H:%M:%S")
     except (ValueError, OverflowError, OSError):
         display = None
-    return {"created_time_ms": ts, "display_utc_plus_2": display}
+    return _json_response({"created_time_ms": ts, "display_utc_plus_2": display}, request=request)
 
 
 @app.post("/api/workflow/run")
 def workflow_run():
-    settings = get_settings()
-    client = build_client(settings)
-    res = execute_workflow(client, settings)
+    from cognite_data import execute_workflow
+
+    res = execute_workflow(_cognite(), get_settings())
     # Cognite may return UUID or int; JSON clients expect a stable string for path polling.
     return {"execution_id": str(res.id)}
 
 
 @app.get("/api/workflow/status/{execution_id}")
 def workflow_status(execution_id: str):
-    settings = get_settings()
-    client = build_client(settings)
-    status = check_workflow_status(client, execution_id)
+    """Status of a workflow run. "completed" is only returned once this process serves the bets the
+    run wrote, so a client refetching the dashboard right after gets the new data."""
+    from cognite_data import check_workflow_status
+
+    status = check_workflow_status(_cognite(), execution_id)
+    if status == "completed":
+        try:
+            refreshed = _refresh_after_run(execution_id)
+        except Exception as e:
+            logger.exception("Refreshing data after workflow run %s failed", execution_id)
+            raise HTTPException(status_code=502, detail=f"Workflow completed, refreshing data failed: {e}") from e
+        if refreshed:
+            # The King's advice on the new bets is computed in the background.
+            threading.Thread(target=_precompute_king_advice, daemon=True).start()
     return {"status": status}
 
 
+# Workflow runs whose data has been picked up, so repeated status polls refresh once per run.
+_refreshed_runs: deque[str] = deque(maxlen=64)
+_refresh_lock = threading.Lock()
+
+
+def _refresh_after_run(execution_id: str) -> bool:
+    """Refetch the current season's bets and the event window after workflow run `execution_id`
+    and drop everything built from the old bets (shared dashboard bodies, cumulative engines).
+    False if this run was already picked up; concurrent polls wait for the refresh instead of
+    starting their own."""
+    from cognite_data import ALL_SEASONS, get_shared_cache, refresh_event_window, refresh_prepared_bets
+    from cumulative import reset_engines
+
+    with _refresh_lock:
+        if execution_id in _refreshed_runs:
+            return False
+        settings = get_settings()
+        refresh_prepared_bets(_cognite(), settings)
+        # The run may also have written today's events; the King's advice is computed on them next.
+        refresh_event_window(_cognite(), settings)
+        shared = get_shared_cache(settings.shared_cache_dir, settings.shared_cache_ttl_s)
+        if shared is not None:
+            current = max(settings.seasons, key=settings.seasons.get)
+            for season in ("current", current, ALL_SEASONS):
+                shared.invalidate(f"dashboard-{season}")
+        reset_engines()
+        _refreshed_runs.append(execution_id)
+        return True
+
+
 @app.post("/api/assistants/prophet")
 def assistant_prophet(body: ProphetBody):
+    from assistants_logic import run_prophet
+    from cognite_data import get_prepared_bets
+
     settings = get_settings()
-    client = build_client(settings)
-    df = get_prepared_bets(client, settings)
+    df = get_prepared_bets(_cognite(), settings)
     try:
         answer = run_prophet(df, body.question.strip(), settings)
     except Exception as e:
@@ -124,9 +349,13 @@ def assistant_prophet(body: ProphetBody):
 
 @app.post("/api/assistants/king")
 def assistant_king(body: KingBody):
+    from assistants_logic import run_king
+    from cognite_data import get_prepared_bets, get_todays_events_prepared
+
     settings = get_settings()
-    client = build_client(settings)
-    df = get_prepared_bets(client, settings)
+    client = _cognite()
+    # Only the advised player's history is sent to the model, so only that is fetched.
+    df = get_prepared_bets(client, settings, player=body.player)
     ev = get_todays_events_prepared(client, settings)
     try:
         answer = run_king(df, ev, body.question.strip(), body.player, settings)
@@ -135,14 +364,88 @@ def assistant_king(body: KingBody):
     return {"answer": answer}
 
 
+def _king_advice_prompts(settings):
+    from assistants_logic import build_king_advice_prompts
+    from cognite_data import get_prepared_bets, get_todays_events_prepared
+
+    client = _cognite()
+    df = get_prepared_bets(client, settings)
+    ev = get_todays_events_prepared(client, settings)
+    return build_king_advice_prompts(df, ev, PLAYERS)
+
+
+def _precompute_king_advice() -> None:
+    """Warm-up step (and after a workflow run): starts computing the default King advice for every
+    player on today's events and the current bets, unless already cached."""
+    from assistants_logic import precompute_king_advice
+    from king_advice import get_advice_cache
+
+    settings = get_settings()
+    precompute_king_advice(_king_advice_prompts(settings), get_advice_cache(settings.last_good_dir), settings)
+
+
+@app.get("/api/assistants/king/advice")
+def king_advice(player: str = Query(..., pattern=PLAYER_PATTERN)):
+    """The King's precomputed answer to the default question for `player` on today's events and
+    bets: `{"player", "question", "advice", "pending"}`. `advice` is null while it is being computed
+    (starting it if needed); poll again while `pending`."""
+    from assistants_logic import precompute_king_advice
+    from king_advice import DEFAULT_QUESTION, get_advice_cache
+
+    settings = get_settings()
+    cache = get_advice_cache(settings.last_good_dir)
+    prompts = _king_advice_prompts(settings)
+    key = next(k for k in prompts if k[0] == player)
+    advice = cache.get(key)
+    if advice is None:
+        # New events or bets since the last precomputation (e.g. a new day).
+        precompute_king_advice(prompts, cache, settings)
+    return {"player": player, "question": DEFAULT_QUESTION, "advice": advice, "pending": cache.is_pending(key)}
+
+
+@app.post("/api/assistants/batch")
+def assistant_batch(body: BatchBody, stream: bool = False):
+    """Several questions (and for the King, several players) in one request. The bets, events and
+    snippets are fetched and built once; the completions run concurrently.
+
+    Returns `{"answers": [...]}` in request order (questions within players), or with `stream=true`
+    one NDJSON line per answer as it finishes. Each answer is `{"index", "question", "player",
+    "answer"}`, or `"error"` instead of `"answer"` when that completion failed."""
+    from assistants_logic import build_king_prompts, build_prophet_prompts, run_batch
+    from cognite_data import get_prepared_bets, get_todays_events_prepared
+
+    settings = get_settings()
+    client = _cognite()
+    questions = body.questions
+    if body.assistant == "prophet":
+        prompts = build_prophet_prompts(get_prepared_bets(client, settings), questions)
+        model = settings.openai_prophet_model
+    else:
+        players = list(dict.fromkeys(body.players or PLAYERS))
+        df = get_prepared_bets(client, settings)
+        ev = get_todays_events_prepared(client, settings)
+        prompts = build_king_prompts(df, ev, questions, players)
+        model = settings.openai_king_model
+
+    def answers():
+        for i, answer, error in run_batch(body.assistant, model, [p for _, _, p in prompts], settings):
+            question, player, _ = prompts[i]
+            result = {"answer": answer} if error is None else {"error": error}
+            yield {"index": i, "question": question, "player": player, **result}
+
+    if stream:
+        lines = (json.dumps(a, ensure_ascii=False) + "\n" for a in answers())
+        return StreamingResponse(lines, media_type="application/x-ndjson", headers={"Cache-Control": "no-store"})
+    return {"answers": sorted(answers(), key=lambda a: a["index"])}
+
+
 @app.get("/api/player-image/{name}")
 def player_image(name: str):
-    settings = get_settings()
-    root = Path(settings.repo_root).resolve()
-    path = root / f"{name.lower()}.png"
-    if not path.is_file():
+    # Read once per process (and ahead of time by the warm-up).
+    image = load_player_image(get_settings().repo_root, name.lower())
+    if image is None:
         raise HTTPException(status_code=404)
-    return FileResponse(path, media_type="image/png")
+    return Response(image, media_type="image/png", headers={"Cache-Control": "public, max-age=86400"})
 
 
 def main():
@@ -1,13 +1,21 @@
 from __future__ import annotations
 
 from functools import lru_cache
+from typing import Any
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
-class Settings(BaseSettings):
+class CorsSettings(BaseSettings):
+    """Settings needed while `main` is imported; must not require Cognite/OpenAI secrets."""
+
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
 
+    # Comma-separated extra CORS origins, e.g. https://youruser.github.io for GitHub Pages
+    cors_extra_origins: str = ""
+
+
+class Settings(CorsSettings):
     cognite_project: str
     cognite_base_url: str
     cognite_client_id: str
@@ -16,6 +24,8 @@ class Settings(BaseSettings):
     cognite_scopes: str = "https://bluefield.cognitedata.com/.default"
 
     openai_api_key: str
+    # OpenAI-compatible endpoint, e.g. http://127.0.0.1:8090/v1 for benchmarks.mock_openai; empty uses OpenAI.
+    openai_base_url: str = ""
 
     # Data model (match tippelaget.core.config)
     default_space: str = "tippelaget_space_name"
@@ -24,17 +34,59 @@ class Settings(BaseSettings):
     event_view: str = "Event"
     event_view_version: str = "1.0.3"
 
+    # Season name -> first day (ISO date); a season runs until the next one starts (match tippelaget.core.config).
+    # Env: SEASONS='{"Season 1": "2024-08-01", "Season 2": "2025-03-15"}'
+    seasons: dict[str, str] = {"Season 2": "2025-03-15"}
+
+    # Deposit rules (see cognite_data.create_monthly_innskudd_df), e.g.
+    # INNSKUDD_SCHEDULE='[{"amount": 600, "day": 15, "end": "2026-01-01"}, {"amount": 800, "day": 15, "start": "2026-01-01"}]'
+    innskudd_schedule: list[dict[str, Any]] = [{"amount": 600, "day": 15}]
+
     workflow_external_id: str = "wf_tippelaget_workflow"
     workflow_version: str = "1"
 
     openai_prophet_model: str = "gpt-4.1-mini"
     openai_king_model: str = "gpt-5-mini"
+    # Completions in flight at once for one `/api/assistants/batch` request.
+    assistants_batch_concurrency: int = 6
 
     # Repo root for serving player PNGs (optional). In Docker / Cloud Run, default /app (no PNGs unless you add them).
     repo_root: str = "../.."
 
-    # Comma-separated extra CORS origins, e.g. https://youruser.github.io for GitHub Pages
-    cors_extra_origins: str = ""
+    # Record/replay stand-in for Cognite (tippelaget.core.replay) for offline benchmarking; needs the
+    # repo root package importable (`poetry install`). Mode is "replay" or "record".
+    cognite_replay_path: str = ""
+    cognite_replay_mode: str = "replay"
+    cognite_replay_latency_ms: float = 0.0
+    cognite_replay_jitter_ms: float = 0.0
+    cognite_replay_page_size: int = 1000
+    cognite_replay_error_rate: float = 0.0
+
+    # Dashboard payload baked into the image (see startup.py); served while a cold instance warms up.
+    dashboard_snapshot_path: str = "snapshot/dashboard.json"
+    # Recent dashboard payloads kept per process so `/api/dashboard?since=<version>` can send a delta.
+    dashboard_history_size: int = 32
+    # Directory shared by every worker on the host (e.g. /dev/shm/tippelaget) for memory-mapped Arrow
+    # copies of the prepared bets and the dashboard (see shared_cache.py); empty disables it.
+    shared_cache_dir: str = ""
+    # How long the current season's shared bets and dashboard are reused before one worker refreshes them.
+    shared_cache_ttl_s: float = 60.0
+    # Stale-while-revalidate (see swr.py): bets and the last workflow run are served from the last good
+    # value and refreshed in the background once older than these; last good values persist here.
+    swr_bets_fresh_s: float = 30.0
+    swr_last_run_fresh_s: float = 5.0
+    last_good_dir: str = "/tmp/tippelaget-last-good"
+    # Events are fetched for today and the following days in one query and refetched on this schedule
+    # (see event_store.py); the last window persists in last_good_dir.
+    event_window_days: int = 7
+    event_window_refresh_s: float = 21600.0
+    # Compressed response bodies kept per process (see compression.py), one per body version and encoding.
+    compressed_cache_size: int = 64
+
+
+@lru_cache
+def get_cors_settings() -> CorsSettings:
+    return CorsSettings()
 
 
 @lru_cache
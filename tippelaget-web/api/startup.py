@@ -0,0 +1,186 @@
+"""Cold-start support for the Cloud Run API.
+
+`main` only imports FastAPI and the settings module at load time. `warm_up()` runs on a
+background thread started with the app: it imports pandas, the Cognite SDK and OpenAI, fetches
+the Cognite OAuth token, loads the current season's bets and today's events, precomputes the
+dashboard (steps passed in by `main`) and reads the player images into memory. `/api/ready`
+reports each step's duration and only returns 200 once all of them have run and the required
+ones succeeded, for use as the Cloud Run startup probe. Until then, `/api/dashboard` is answered from a snapshot baked into the
+image, so a request that does reach a fresh instance does not pay for the warm-up.
+
+Write the snapshot before building the image (needs the usual Cognite env vars):
+
+    python startup.py snapshot [path]
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import sys
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable
+
+from settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+_warm = threading.Event()
+_warm_lock = threading.Lock()
+_warm_thread: threading.Thread | None = None
+
+
+# Each finished warm-up step: {"step", "ms", "ok"} plus "error" when it failed.
+_steps: list[dict[str, Any]] = []
+# Steps without which the instance cannot serve the dashboard; the others (events, advice, images)
+# fail over to the live path per request.
+REQUIRED_STEPS = frozenset({"imports", "cognite_token", "bets", "dashboard"})
+
+
+def _run_step(name: str, fn: Callable[[], Any]) -> None:
+    t0 = time.perf_counter()
+    step: dict[str, Any] = {"step": name, "ok": True}
+    try:
+        fn()
+    except Exception as e:
+        # The live path will surface the same error to the caller; later steps still run.
+        logger.exception("Warm-up step %s failed", name)
+        step.update(ok=False, error=str(e))
+    step["ms"] = round((time.perf_counter() - t0) * 1000, 1)
+    _steps.append(step)
+
+
+def _import_heavy_modules() -> None:
+    import assistants_logic  # noqa: F401
+    import chart_compute  # noqa: F401
+    import cognite_data  # noqa: F401
+    import cumulative  # noqa: F401
+
+
+def _acquire_token() -> None:
+    from cognite_data import ensure_token, get_client
+
+    ensure_token(get_client())
+
+
+def _load_bets() -> None:
+    from cognite_data import get_client, get_prepared_bets
+
+    get_prepared_bets(get_client(), get_settings())
+
+
+def _load_events() -> None:
+    from cognite_data import get_client, get_todays_events_prepared
+
+    get_todays_events_prepared(get_client(), get_settings())
+
+
+def _preload_player_images() -> None:
+    root = Path(get_settings().repo_root)
+    for path in sorted(root.glob("*.png")):
+        load_player_image(str(root), path.stem)
+
+
+def warm_up(extra_steps: tuple[tuple[str, Callable[[], Any]], ...] = ()) -> None:
+    """Run every warm-up step; marks the instance warm even when some fail."""
+    try:
+        steps = [
+            ("imports", _import_heavy_modules),
+            ("cognite_token", _acquire_token),
+            ("bets", _load_bets),
+            ("events", _load_events),
+            *extra_steps,
+            ("player_images", _preload_player_images),
+        ]
+        for name, fn in steps:
+            _run_step(name, fn)
+    finally:
+        _warm.set()
+
+
+def start_warm_up(extra_steps: tuple[tuple[str, Callable[[], Any]], ...] = ()) -> None:
+    """Start `warm_up` once; `extra_steps` run after the data has loaded (e.g. dashboard precomputation)."""
+    global _warm_thread
+    with _warm_lock:
+        if _warm_thread is None:
+            _warm_thread = threading.Thread(target=warm_up, args=(extra_steps,), name="warm-up", daemon=True)
+            _warm_thread.start()
+
+
+def is_warm() -> bool:
+    return _warm.is_set()
+
+
+def warm_up_report() -> dict[str, Any]:
+    """`{"ready", "warm", "steps", "total_ms"}` for `/api/ready`. `warm` is True once every step has
+    run; `ready` also needs each of `REQUIRED_STEPS` to have succeeded."""
+    steps = list(_steps)
+    succeeded = {step["step"] for step in steps if step["ok"]}
+    return {
+        "ready": is_warm() and REQUIRED_STEPS <= succeeded,
+        "warm": is_warm(),
+        "steps": steps,
+        "total_ms": round(sum(step["ms"] for step in steps), 1),
+    }
+
+
+# Player images that exist, by (root, lowercase name); bounded by the PNGs in the image.
+_player_images: dict[tuple[str, str], bytes] = {}
+
+
+def load_player_image(root: str, name: str) -> bytes | None:
+    """PNG bytes of `{name}.png` under `root`, read once per process.
+
+    Only images that were found are kept, so requests for unknown names cannot push them out.
+    """
+    key = (root, name.lower())
+    image = _player_images.get(key)
+    if image is None:
+        path = Path(root).resolve() / f"{key[1]}.png"
+        if not path.is_file():
+            return None
+        image = _player_images[key] = path.read_bytes()
+    return image
+
+
+@lru_cache
+def load_dashboard_snapshot(path: str) -> dict[str, Any] | None:
+    """Snapshot written by `write_dashboard_snapshot`, or None if the image has none."""
+    p = Path(path)
+    if not path or not p.is_file():
+        return None
+    try:
+        return json.loads(p.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        logger.warning("Ignoring unreadable dashboard snapshot at %s", p)
+        return None
+
+
+def write_dashboard_snapshot(path: str) -> Path:
+    from chart_compute import compute_all_dashboard
+    from cognite_data import get_client, get_prepared_bets, season_innskudd_df
+
+    settings = get_settings()
+    df = get_prepared_bets(get_client(), settings)
+    payload = compute_all_dashboard(df, season_innskudd_df(settings.seasons, schedule=settings.innskudd_schedule))
+    p = Path(path)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    snapshot = {"generated_at_ms": int(time.time() * 1000), "payload": payload}
+    p.write_text(json.dumps(snapshot, separators=(",", ":")), encoding="utf-8")
+    return p
+
+
+def main(argv: list[str]) -> int:
+    if not argv or argv[0] != "snapshot":
+        print(__doc__)
+        return 2
+    path = argv[1] if len(argv) > 1 else get_settings().dashboard_snapshot_path
+    print(f"Wrote {write_dashboard_snapshot(path)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,156 @@
+"""Import-time budget and cold-start timing for the API.
+
+    python startup_report.py                  # `-X importtime` breakdown of `import main`, checked against the budget
+    python startup_report.py --ttfb           # also start uvicorn and time process start -> first byte
+    python startup_report.py --json           # machine-readable output
+
+Exits non-zero when `import main` exceeds the budget or pulls in a module that should be deferred.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Any
+
+API_DIR = Path(__file__).resolve().parent
+
+# Budget for `import main` in a fresh interpreter (cumulative, milliseconds).
+IMPORT_BUDGET_MS = 800
+# Heavy packages that must only be imported by handlers / the warm-up thread.
+DEFERRED_MODULES = ("pandas", "numpy", "cognite", "openai")
+
+
+def import_times(module: str = "main") -> list[dict[str, Any]]:
+    """Parse `python -X importtime -c 'import <module>'` into rows of (module, self_us, cumulative_us, depth)."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=API_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        rows.append(
+            {
+                "module": name.strip(),
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us),
+                "depth": (len(name) - len(name.lstrip())) // 2,
+            }
+        )
+    return rows
+
+
+def summarize_imports(rows: list[dict[str, Any]], top: int = 15) -> dict[str, Any]:
+    by_package: dict[str, int] = {}
+    for r in rows:
+        pkg = r["module"].split(".")[0]
+        by_package[pkg] = by_package.get(pkg, 0) + r["self_us"]
+    total_us = sum(r["cumulative_us"] for r in rows if r["depth"] == 0)
+    loaded = {r["module"].split(".")[0] for r in rows}
+    return {
+        "total_ms": round(total_us / 1000, 1),
+        "budget_ms": IMPORT_BUDGET_MS,
+        "deferred_violations": sorted(m for m in DEFERRED_MODULES if m in loaded),
+        "top_packages_ms": {
+            k: round(v / 1000, 1) for k, v in sorted(by_package.items(), key=lambda kv: -kv[1])[:top]
+        },
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _first_byte(url: str, timeout: float) -> tuple[float, int]:
+    t0 = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as resp:
+            resp.read(1)
+            status = resp.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    return (time.perf_counter() - t0) * 1000, status
+
+
+def measure_ttfb(paths: tuple[str, ...] = ("/api/health", "/api/dashboard"), timeout: float = 60.0) -> dict[str, Any]:
+    """Start uvicorn and time process start -> first byte for the health probe, then each path once."""
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=API_DIR,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        env={**os.environ, "PYTHONUNBUFFERED": "1"},
+    )
+    out: dict[str, Any] = {}
+    try:
+        while True:
+            if proc.poll() is not None:
+                raise RuntimeError("uvicorn exited before serving")
+            if time.perf_counter() - t0 > timeout:
+                raise TimeoutError("API did not come up")
+            try:
+                _first_byte(base + paths[0], timeout=1.0)
+                break
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.02)
+        out["process_start_to_first_byte_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+        for path in paths[1:]:
+            ms, status = _first_byte(base + path, timeout=timeout)
+            out[f"first_byte_ms {path}"] = round(ms, 1)
+            out[f"status {path}"] = status
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+    return out
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ttfb", action="store_true", help="start uvicorn and measure time to first byte")
+    parser.add_argument("--budget-ms", type=int, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    report = {"imports": summarize_imports(import_times())}
+    report["imports"]["budget_ms"] = args.budget_ms
+    if args.ttfb:
+        report["cold_start"] = measure_ttfb()
+
+    imports = report["imports"]
+    ok = imports["total_ms"] <= args.budget_ms and not imports["deferred_violations"]
+    report["ok"] = ok
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"import main: {imports['total_ms']} ms (budget {args.budget_ms} ms)")
+        for pkg, ms in imports["top_packages_ms"].items():
+            print(f"  {pkg:<28} {ms:>8.1f} ms")
+        if imports["deferred_violations"]:
+            print(f"imported at module load but should be deferred: {', '.join(imports['deferred_violations'])}")
+        for k, v in report.get("cold_start", {}).items():
+            print(f"{k}: {v}")
+        print("OK" if ok else "OVER BUDGET")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""Stale-while-revalidate cache for upstream data, with the last good value persisted to disk.
+
+`StaleWhileRevalidate.get(name, fetch, fresh_s)` returns the last good value of `name` straight
+away. When that value is older than `fresh_s` it also starts one background refresh, so a slow or
+failing Cognite call delays the next value instead of the current request. A failed refresh keeps
+the previous value. The request only waits for `fetch` when there is no value at all, neither in
+memory nor on disk; concurrent requests for the same missing name then share one fetch. Each
+successful fetch is written to `directory` (DataFrames as Arrow IPC, anything else as JSON), so a
+restarted process starts from the last good data.
+
+The age of every value served is recorded on the request (`instrumentation.record_data_age`) and
+returned in the `X-Data-Age` header.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+import pandas as pd
+
+from instrumentation import record_cache, record_data_age
+
+logger = logging.getLogger(__name__)
+
+
+class StaleWhileRevalidate:
+    def __init__(self, directory: str = "") -> None:
+        self.directory = Path(directory) if directory else None
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # name -> (fetched_at, value)
+        self._values: dict[str, tuple[float, Any]] = {}
+        self._refreshing: set[str] = set()
+        # name -> lock held while a request waits on a fetch, so concurrent misses fetch once.
+        self._fetch_locks: dict[str, threading.Lock] = {}
+
+    def get(self, name: str, fetch: Callable[[], Any], fresh_s: float) -> Any:
+        """Last good value of `name`, refreshed in the background once older than `fresh_s`."""
+        with self._lock:
+            entry = self._values.get(name)
+        if entry is None:
+            entry = self._load(name)
+            if entry is not None:
+                with self._lock:
+                    entry = self._values.setdefault(name, entry)
+        record_cache("swr", entry is not None)
+        if entry is None:
+            with self._fetch_lock(name):
+                with self._lock:
+                    entry = self._values.get(name)
+                if entry is None:
+                    return self._store(name, fetch())[1]
+            return entry[1]
+
+        fetched_at, value = entry
+        age = time.time() - fetched_at
+        record_data_age(age)
+        if age > fresh_s:
+            self._refresh_in_background(name, fetch)
+        return value
+
+    def refresh(self, name: str, fetch: Callable[[], Any]) -> Any:
+        """Fetch `name` now (e.g. after its upstream data changed), replacing the last good value."""
+        return self._store(name, fetch())[1]
+
+    def _fetch_lock(self, name: str) -> threading.Lock:
+        with self._lock:
+            return self._fetch_locks.setdefault(name, threading.Lock())
+
+    def _refresh_in_background(self, name: str, fetch: Callable[[], Any]) -> None:
+        with self._lock:
+            if name in self._refreshing:
+                return
+            self._refreshing.add(name)
+
+        def refresh() -> None:
+            try:
+                self._store(name, fetch())
+            except Exception:
+                logger.exception("Refreshing %s failed; serving the last good value", name)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(name)
+
+        threading.Thread(target=refresh, name=f"swr-{name}", daemon=True).start()
+
+    def _store(self, name: str, value: Any) -> tuple[float, Any]:
+        entry = (time.time(), value)
+        with self._lock:
+            self._values[name] = entry
+        if self.directory is not None:
+            try:
+                self._persist(name, entry)
+            except Exception:
+                logger.exception("Could not persist the last good %s", name)
+        return entry
+
+    def _paths(self, name: str) -> tuple[Path, Path]:
+        return self.directory / f"{name}.arrow", self.directory / f"{name}.json"
+
+    def _persist(self, name: str, entry: tuple[float, Any]) -> None:
+        fetched_at, value = entry
+        arrow_path, json_path = self._paths(name)
+        if isinstance(value, pd.DataFrame):
+            path, other = arrow_path, json_path
+            tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+            # Arrow IPC keeps the prepared dtypes (float32, categories) exactly.
+            value.reset_index(drop=True).to_feather(tmp)
+            os.utime(tmp, (fetched_at, fetched_at))
+        else:
+            path, other = json_path, arrow_path
+            tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps({"fetched_at": fetched_at, "value": value}), encoding="utf-8")
+        os.replace(tmp, path)
+        other.unlink(missing_ok=True)
+
+    def _load(self, name: str) -> tuple[float, Any] | None:
+        if self.directory is None:
+            return None
+        arrow_path, json_path = self._paths(name)
+        try:
+            if arrow_path.is_file():
+                return arrow_path.stat().st_mtime, pd.read_feather(arrow_path)
+            if json_path.is_file():
+                data = json.loads(json_path.read_text(encoding="utf-8"))
+                return data["fetched_at"], data["value"]
+        except Exception:
+            logger.warning("Ignoring unreadable last good %s in %s", name, self.directory)
+        return None
+
+
+_swr: StaleWhileRevalidate | None = None
+_swr_lock = threading.Lock()
+
+
+def get_swr(directory: str) -> StaleWhileRevalidate:
+    """Process-wide cache, persisting to `directory` (created with the configured one on first use)."""
+    global _swr
+    with _swr_lock:
+        if _swr is None:
+            _swr = StaleWhileRevalidate(directory)
+        return _swr
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The API modules are imported top-level (as uvicorn runs them from api/).
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+from cognite_data import parse_gameweek_numbers, prepare_bets_df
+
+
+def test_gameweek_numbers_follow_the_ids():
+    cat, nums = parse_gameweek_numbers(pd.Series(["GW_10", "GW_2", "GW_10", "GW_1"]))
+    assert nums.dtype == np.int16
+    assert nums.tolist() == [10, 2, 10, 1]
+    assert cat.cat.categories.tolist() == ["GW_1", "GW_2", "GW_10"]
+
+
+def test_missing_gameweek_is_na_not_the_last_number():
+    _, nums = parse_gameweek_numbers(pd.Series(["GW_3", None, "GW_12"]))
+    assert nums[0] == 3 and nums[2] == 12
+    assert pd.isna(nums[1])
+
+
+def test_prepared_bets_drop_rows_without_a_gameweek():
+    raw = pd.DataFrame(
+        {
+            "player.externalId": ["Mads", "Elias", "Tobias"],
+            "gameweek.externalId": ["GW_1", None, "GW_2"],
+            "payout": [0.0, 50.0, 20.0],
+            "betNok": [10.0, 10.0, 10.0],
+            "odds": [2.0, 5.0, 2.0],
+            "date": ["2025-03-15", "2025-03-16", "2025-03-22"],
+            "description": ["a", "b", "c"],
+        }
+    )
+    df = prepare_bets_df(raw)
+    assert df["player"].tolist() == ["Mads", "Tobias"]
+    assert df["gameweek_num"].dtype == np.int16
+    assert df["gameweek_num"].tolist() == [1, 2]
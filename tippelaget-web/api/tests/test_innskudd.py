@@ -0,0 +1,42 @@
+import pandas as pd
+
+from chart_compute import compute_tippekassa_vs_baseline, innskudd_per_gameweek
+from cognite_data import create_monthly_innskudd_df, season_innskudd_df
+
+SCHEDULE = [
+    {"amount": 100, "day": 1, "player": "Mads"},
+    {"amount": 200, "day": 1, "player": "Elias"},
+]
+SEASONS = {"Season 1": "2025-01-01", "Season 2": "2025-04-01"}
+
+
+def _bets(players):
+    rows = [
+        {"player": p, "gameweek_num": gw, "date": pd.Timestamp(f"2025-0{gw}-01"), "payout": 0.0, "betNok": 10.0}
+        for p in players
+        for gw in (1, 2, 3)
+    ]
+    return pd.DataFrame(rows)
+
+
+def test_player_slice_gets_only_own_deposits():
+    innskudd = season_innskudd_df(SEASONS, "Season 1", SCHEDULE, player="Mads")
+    assert set(innskudd["player"]) == {"Mads"}
+    assert innskudd["innskudd"].tolist() == [100, 100, 100]
+
+
+def test_team_sums_every_players_deposits():
+    innskudd = season_innskudd_df(SEASONS, "Season 1", SCHEDULE)
+    per_gw = innskudd_per_gameweek(_bets(["Mads", "Elias"]), innskudd)
+    assert per_gw["innskudd"].tolist() == [300, 300, 300]
+
+
+def test_deposits_of_players_without_bets_are_ignored():
+    innskudd = season_innskudd_df(SEASONS, "Season 1", SCHEDULE)
+    series = compute_tippekassa_vs_baseline(_bets(["Mads"]), innskudd)["series"]
+    assert [p["cum_payout_plus_innskudd"] for p in series] == [100, 200, 300]
+
+
+def test_deposit_day_is_clamped_to_month_length():
+    innskudd = create_monthly_innskudd_df("2025-01-01", "2025-05-01", [{"amount": 600, "day": 31}])
+    assert innskudd["date"].dt.strftime("%Y-%m-%d").tolist() == ["2025-01-31", "2025-02-28", "2025-03-31", "2025-04-30"]
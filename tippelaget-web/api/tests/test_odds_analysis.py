@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+from odds_analysis import analyze_events, candidate_records, rank_candidates
+
+EVENTS = pd.DataFrame(
+    {
+        "eventName": ["Favourite", "Even", "Away side"],
+        "H": [1.5, 2.6, 3.2],
+        "D": [4.2, 3.3, 3.4],
+        "A": [6.5, 2.7, 2.2],
+    }
+)
+
+
+def _bets(odds, won, pending=0):
+    payout = [o * 10 if w else 0.0 for o, w in zip(odds, won)] + [np.nan] * pending
+    odds = list(odds) + [odds[0]] * pending
+    df = pd.DataFrame({"odds": odds, "betNok": 10.0, "payout": payout})
+    return df.assign(won=df["payout"] > 0)
+
+
+def test_fair_probabilities_favour_favourites():
+    markets = analyze_events(EVENTS).set_index(["eventName", "market"])
+    fav = markets.loc["Favourite"]
+    assert np.isclose(fav.loc[["H", "D", "A"], "fair_prob"].sum(), 1)
+    # The power method takes more margin off long shots than off the favourite.
+    assert fav.loc["H", "value"] > fav.loc["D", "value"] > fav.loc["A", "value"]
+
+
+def test_without_history_ranks_by_value_one_market_per_event():
+    ranked = rank_candidates(EVENTS, pd.DataFrame())
+    assert ranked["eventName"].is_unique
+    assert list(zip(ranked["eventName"], ranked["market"])) == [("Favourite", "H"), ("Away side", "A"), ("Even", "H")]
+    assert ranked["score"].is_monotonic_decreasing
+
+
+def test_player_record_at_similar_odds_moves_those_bets_up():
+    # Half of the bets at 3.5 won (implied 29%); every bet at 1.5 lost.
+    bets = _bets([3.5] * 30 + [1.5] * 30, [True] * 15 + [False] * 45)
+    ranked = rank_candidates(EVENTS, bets)
+    assert (ranked["odds"] >= 3.0).all()
+    assert ranked["adjusted_return"].is_monotonic_decreasing
+    assert ranked.loc[0, ["eventName", "market"]].tolist() == ["Even", "D"]
+
+
+def test_pending_bets_do_not_count_as_losses():
+    settled = _bets([3.5] * 10, [True] * 5 + [False] * 5)
+    with_pending = _bets([3.5] * 10, [True] * 5 + [False] * 5, pending=20)
+    pd.testing.assert_frame_equal(rank_candidates(EVENTS, settled), rank_candidates(EVENTS, with_pending))
+
+
+def test_candidate_records_round_for_the_prompt():
+    record = candidate_records(rank_candidates(EVENTS, pd.DataFrame()))[0]
+    assert set(record) == {"eventName", "bet", "odds", "fair_prob", "overround", "adjusted_return"}
+    assert record["odds"] == 1.5
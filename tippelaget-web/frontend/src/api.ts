@@ -1,4 +1,4 @@
-import type { DashboardData } from './types'
+import type { BatchAnswer, DashboardData, DashboardDelta, DashboardOp, KingAdvice } from './types'
 import { apiUrl } from './lib/apiBase'
 
 async function json<T>(path: string, init?: RequestInit): Promise<T> {
@@ -13,8 +13,36 @@ async function json<T>(path: string, init?: RequestInit): Promise<T> {
   return res.json() as Promise<T>
 }
 
-export function fetchDashboard(): Promise<DashboardData> {
-  return json<DashboardData>('/api/dashboard')
+/** Last dashboard received, so refreshes only download what changed since its version. */
+let heldDashboard: { version: string; data: DashboardData } | null = null
+
+function applyOps(data: DashboardData, ops: DashboardOp[]): DashboardData {
+  // Copy-on-write along each path so React Query sees new references where data changed.
+  let root: unknown = data
+  for (const op of ops) {
+    if (op.path.length === 0) {
+      root = op.op === 'set' ? op.value : [...(root as unknown[]), ...op.value]
+      continue
+    }
+    root = Array.isArray(root) ? [...root] : { ...(root as object) }
+    let parent = root as Record<string | number, unknown>
+    for (const key of op.path.slice(0, -1)) {
+      const child = parent[key]
+      parent[key] = Array.isArray(child) ? [...child] : { ...(child as object) }
+      parent = parent[key] as Record<string | number, unknown>
+    }
+    const last = op.path[op.path.length - 1]
+    parent[last] = op.op === 'set' ? op.value : [...(parent[last] as unknown[]), ...op.value]
+  }
+  return root as DashboardData
+}
+
+export async function fetchDashboard(): Promise<DashboardData> {
+  const since = heldDashboard?.version ?? ''
+  const res = await json<DashboardDelta>(`/api/dashboard?since=${encodeURIComponent(since)}`)
+  const data = 'full' in res ? res.full : applyOps(heldDashboard!.data, res.ops)
+  heldDashboard = { version: res.version, data }
+  return data
 }
 
 export function fetchEventsToday(): Promise<{ rows: Record<string, unknown>[] }> {
@@ -51,3 +79,33 @@ export function askKing(question: string, player: string): Promise<{ answer: str
     body: JSON.stringify({ question, player }),
   })
 }
+
+export function fetchKingAdvice(player: string): Promise<KingAdvice> {
+  return json(`/api/assistants/king/advice?player=${encodeURIComponent(player)}`)
+}
+
+/** Several questions (King: for several players) in one request; `onAnswer` gets each as it finishes. */
+export async function askBatch(
+  body: { assistant: 'prophet' | 'king'; questions: string[]; players?: string[] },
+  onAnswer: (answer: BatchAnswer) => void,
+): Promise<void> {
+  const res = await fetch(apiUrl('/api/assistants/batch?stream=true'), {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(body),
+  })
+  if (!res.ok || !res.body) {
+    const text = await res.text()
+    throw new Error(text || res.statusText)
+  }
+  const reader = res.body.pipeThrough(new TextDecoderStream()).getReader()
+  let buffered = ''
+  for (;;) {
+    const { done, value } = await reader.read()
+    if (done) break
+    buffered += value
+    const lines = buffered.split('\n')
+    buffered = lines.pop() ?? ''
+    for (const line of lines) if (line.trim()) onAnswer(JSON.parse(line) as BatchAnswer)
+  }
+}
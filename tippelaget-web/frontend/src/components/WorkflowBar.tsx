@@ -27,6 +27,7 @@ export function WorkflowBar({ onShowEvents }: { onShowEvents: () => void }) {
       }
       await qc.invalidateQueries({ queryKey: ['dashboard'] })
       await qc.invalidateQueries({ queryKey: ['lastRun'] })
+      await qc.invalidateQueries({ queryKey: ['king-advice'] })
       setLog((prev) => `${prev}\nDone. Charts were refreshed.`)
     } catch (e) {
       setLog(String(e))
@@ -1,8 +1,9 @@
-import { useMutation } from '@tanstack/react-query'
+import { useMutation, useQuery } from '@tanstack/react-query'
 import { useState } from 'react'
 import { useParams } from 'react-router-dom'
-import { askKing, askProphet } from '../api'
+import { askBatch, askKing, askProphet, fetchKingAdvice } from '../api'
 import { ChartFrame } from '../components/ChartFrame'
+import type { BatchAnswer } from '../types'
 
 const PLAYERS = ['Elias', 'Mads', 'Tobias'] as const
 
@@ -55,6 +56,22 @@ function KingAssistant() {
   const [player, setPlayer] = useState<(typeof PLAYERS)[number]>('Elias')
   const [question, setQuestion] = useState('')
   const mutation = useMutation({ mutationFn: ({ q, p }: { q: string; p: string }) => askKing(q, p) })
+  // Precomputed on the server per player and day, so the tab opens with advice already there.
+  const advice = useQuery({
+    queryKey: ['king-advice', player],
+    queryFn: () => fetchKingAdvice(player),
+    refetchInterval: (query) => (query.state.data?.pending ? 2000 : false),
+  })
+  // "All players": one batch request, answers shown as each player's completion finishes.
+  const [allAnswers, setAllAnswers] = useState<BatchAnswer[]>([])
+  const allMutation = useMutation({
+    mutationFn: (q: string) => {
+      setAllAnswers([])
+      return askBatch({ assistant: 'king', questions: [q], players: [...PLAYERS] }, (a) =>
+        setAllAnswers((prev) => [...prev, a]),
+      )
+    },
+  })
 
   return (
     <ChartFrame
@@ -81,6 +98,14 @@ function KingAssistant() {
             ))}
           </div>
         </div>
+        {advice.data?.advice ? (
+          <div className="rounded-xl border border-[var(--color-border)] bg-black/25 p-4 text-sm leading-relaxed text-white/90">
+            <strong className="text-[var(--color-accent)]">Today&apos;s royal advice for {player}:</strong>{' '}
+            {advice.data.advice}
+          </div>
+        ) : advice.data?.pending ? (
+          <p className="text-sm text-[var(--color-muted)]">His Majesty is preparing today&apos;s advice…</p>
+        ) : null}
         <input
           type="text"
           value={question}
@@ -88,14 +113,24 @@ function KingAssistant() {
           placeholder="Ask King Carl Gustaf your question…"
           className="w-full rounded-xl border border-[var(--color-border)] bg-black/20 px-4 py-3 text-sm text-white placeholder:text-[var(--color-muted)] focus:border-[var(--color-accent)] focus:outline-none focus:ring-1 focus:ring-[var(--color-accent)]"
         />
-        <button
-          type="button"
-          disabled={!question.trim() || mutation.isPending}
-          onClick={() => mutation.mutate({ q: question.trim(), p: player })}
-          className="self-start rounded-xl bg-[var(--color-accent)] px-4 py-2 text-sm font-semibold text-[#042f2e] disabled:opacity-40"
-        >
-          {mutation.isPending ? 'His Majesty is thinking…' : 'Ask'}
-        </button>
+        <div className="flex flex-wrap gap-2">
+          <button
+            type="button"
+            disabled={!question.trim() || mutation.isPending}
+            onClick={() => mutation.mutate({ q: question.trim(), p: player })}
+            className="rounded-xl bg-[var(--color-accent)] px-4 py-2 text-sm font-semibold text-[#042f2e] disabled:opacity-40"
+          >
+            {mutation.isPending ? 'His Majesty is thinking…' : 'Ask'}
+          </button>
+          <button
+            type="button"
+            disabled={!question.trim() || allMutation.isPending}
+            onClick={() => allMutation.mutate(question.trim())}
+            className="rounded-xl border border-[var(--color-border)] bg-white/5 px-4 py-2 text-sm font-semibold text-white hover:bg-white/10 disabled:opacity-40"
+          >
+            {allMutation.isPending ? 'Asking for everyone…' : 'Ask for all players'}
+          </button>
+        </div>
         {mutation.isError ? (
           <p className="text-sm text-red-400">{(mutation.error as Error).message}</p>
         ) : null}
@@ -104,6 +139,18 @@ function KingAssistant() {
             <strong className="text-[var(--color-accent)]">King Carl Gustaf proclaims:</strong> {mutation.data.answer}
           </div>
         ) : null}
+        {allMutation.isError ? (
+          <p className="text-sm text-red-400">{(allMutation.error as Error).message}</p>
+        ) : null}
+        {allAnswers.map((a) => (
+          <div
+            key={a.index}
+            className="rounded-xl border border-[var(--color-border)] bg-black/25 p-4 text-sm leading-relaxed text-white/90"
+          >
+            <strong className="text-[var(--color-accent)]">To {a.player}:</strong>{' '}
+            {a.answer ?? <span className="text-red-400">{a.error}</span>}
+          </div>
+        ))}
       </div>
     </ChartFrame>
   )
@@ -59,3 +59,29 @@ export interface DashboardData {
   luckiness: LuckinessPayload
   tippekassa_vs_baseline: TippekassaPayload
 }
+
+export type DashboardOp =
+  | { op: 'set'; path: (string | number)[]; value: unknown }
+  | { op: 'append'; path: (string | number)[]; value: unknown[] }
+
+/** `/api/dashboard?since=…`: operations from the held version, or the full payload if it is unknown. */
+export type DashboardDelta =
+  | { version: string; since: string; ops: DashboardOp[] }
+  | { version: string; full: DashboardData }
+
+/** One answer from `/api/assistants/batch`; `error` instead of `answer` when that completion failed. */
+export interface BatchAnswer {
+  index: number
+  question: string
+  player: string | null
+  answer?: string
+  error?: string
+}
+
+/** `/api/assistants/king/advice`: the precomputed answer to the default question, null while `pending`. */
+export interface KingAdvice {
+  player: string
+  question: string
+  advice: string | null
+  pending: boolean
+}
@@ -3,14 +3,23 @@ from typing import Optional
 import streamlit as st
 from cognite.client import CogniteClient, ClientConfig
 
-from .config import get_cognite_client_config
+from .config import get_cognite_client_config, get_cognite_replay_config
 
 
-@st.cache_resource
-def get_client() -> CogniteClient:
-    """Create and cache a CogniteClient instance."""
+def build_client() -> CogniteClient:
     client_config_dict = get_cognite_client_config()
     client_config = ClientConfig.load(client_config_dict)
     return CogniteClient(config=client_config)
 
 
+@st.cache_resource
+def get_client() -> CogniteClient:
+    """Create and cache a CogniteClient instance (or the record/replay stand-in when configured)."""
+    replay_config = get_cognite_replay_config()
+    if replay_config:
+        from .replay import client_from_replay_config
+
+        return client_from_replay_config(replay_config, build_client)
+    return build_client()
+
+
@@ -20,6 +20,89 @@ def get_cognite_client_config() -> dict:
     }
 
 
+def get_cognite_replay_config() -> dict | None:
+    """Optional `[cognite_replay]` secret that swaps the live client for a record/replay stand-in.
+
+    Keys: `path` (recording JSON, required), `mode` ("replay" or "record"), and for replay
+    `latency_ms`, `jitter_ms`, `page_size`, `error_rate`, `error_code`, `seed`.
+    """
+    replay = st.secrets.get("cognite_replay")
+    if not replay or not replay.get("path"):
+        return None
+    return dict(replay)
+
+
+def get_shared_cache_config() -> dict | None:
+    """Optional `[shared_cache]` secret: `dir` (e.g. "/dev/shm/tippelaget") shared by every app
+    process on the host, and `ttl_s` (default 60), how long the current season's bets are reused."""
+    try:
+        shared = st.secrets.get("shared_cache")
+    except FileNotFoundError:
+        shared = None
+    if not shared or not shared.get("dir"):
+        return None
+    return dict(shared)
+
+
+def get_event_window_config() -> dict:
+    """Optional `[events]` secret: `window_days` (default 7) of events fetched in one query from
+    today, and `refresh_s` (default 21600), how often that window is refetched."""
+    try:
+        events = st.secrets.get("events")
+    except FileNotFoundError:
+        events = None
+    return dict(events or {})
+
+
+def get_seasons() -> dict[str, str]:
+    """Season name -> first day (ISO date); each season runs until the next one starts.
+
+    Override with a `[seasons]` secret, e.g. `"Season 1" = "2024-08-01"`.
+    """
+    try:
+        seasons = st.secrets.get("seasons")
+    except FileNotFoundError:
+        seasons = None
+    return dict(seasons) if seasons else dict(DEFAULT_SEASONS)
+
+
+DEFAULT_SEASONS = {"Season 2": "2025-03-15"}
+
+
+def get_innskudd_schedule() -> list[dict]:
+    """Monthly deposit rules: `amount` NOK on `day` of every month, optionally only within
+    [`start`, `end`) and for one `player`.
+
+    Override with `[[innskudd]]` tables in the secrets, e.g. `amount = 800`, `day = 15`, `start = "2026-01-01"`.
+    """
+    try:
+        schedule = st.secrets.get("innskudd")
+    except FileNotFoundError:
+        schedule = None
+    if schedule is None:
+        return [dict(rule) for rule in DEFAULT_INNSKUDD_SCHEDULE]
+    return [dict(rule) for rule in schedule]
+
+
+DEFAULT_INNSKUDD_SCHEDULE = ({"amount": 600, "day": 15},)
+
+
+def get_plot_max_points() -> int | None:
+    """Most points drawn per line in the cumulative plots (downsampled beyond that).
+
+    Override with `max_points` in a `[plots]` secret; `0` draws every point.
+    """
+    try:
+        plots = st.secrets.get("plots") or {}
+    except FileNotFoundError:
+        plots = {}
+    max_points = int(plots.get("max_points", DEFAULT_PLOT_MAX_POINTS))
+    return max_points or None
+
+
+DEFAULT_PLOT_MAX_POINTS = 150
+
+
 # Default Data Model View identifiers
 DEFAULT_SPACE = "tippelaget_space_name"
 DEFAULT_VIEW = "Bet"
@@ -1,13 +1,25 @@
 from __future__ import annotations
-from datetime import datetime, timedelta
+import logging
+import math
+from datetime import date
+from typing import Iterable, Iterator
 
+import numpy as np
 import pandas as pd
 import streamlit as st
 from cognite.client.data_classes.data_modeling.ids import ViewId
 
 
 from .client import get_client
-from .config import DEFAULT_SPACE, DEFAULT_VIEW, DEFAULT_VIEW_VERSION
+from .config import (
+    DEFAULT_SPACE,
+    DEFAULT_VIEW,
+    DEFAULT_VIEW_VERSION,
+    get_innskudd_schedule,
+    get_seasons,
+    get_event_window_config,
+    get_shared_cache_config,
+)
 from cognite.client.data_classes.data_modeling import (
     ViewId
 )
@@ -19,77 +31,223 @@ from cognite.client.data_classes.data_modeling.query import (
 )
 from cognite.client.data_classes.filters import (
     And,
+    Equals,
+    Exists,
+    Filter,
+    HasData,
+    In,
+    Not,
+    Or,
     SpaceFilter,
     Range
 )
 from cognite.client.exceptions import CogniteAPIError
 
+logger = logging.getLogger(__name__)
+
+# Schema of the prepared bets frame; money and odds never need more than float32 precision.
+BET_FLOAT_COLUMNS = ("payout", "betNok", "odds")
+BET_CATEGORY_COLUMNS = ("player", "description")
+BET_SORT_COLUMNS = ["gameweek_num", "date", "player"]
+
+# Properties the app reads from each view; queries select only these. Direct relations are
+# reduced to their external id.
+BET_PROPERTIES = ("player", "gameweek", "payout", "betNok", "odds", "date", "description")
+BET_RELATIONS = ("player", "gameweek")
+# A Premier League season; bounds the `GW_n` reference lists of a gameweek filter.
+MAX_GAMEWEEK = 38
+EVENT_PROPERTIES = ("eventName", "H", "A", "D")
+BET_PAGE_SIZE = 1000
+EVENT_PAGE_SIZE = 1000
+
+
+def _view_properties(node, view_id: ViewId) -> dict:
+    if isinstance(node, dict):
+        # Raw API JSON item: properties -> space -> "view/version" -> {...}
+        view_key = f"{view_id.external_id}/{view_id.version}"
+        return node.get("properties", {}).get(view_id.space, {}).get(view_key) or {}
+    return node.properties.get(view_id) or {}
+
+
+def _relation_external_id(value):
+    if isinstance(value, dict):
+        return value.get("externalId")
+    return getattr(value, "external_id", value)
+
+
+def build_bets_frame(chunks: Iterable[Iterable], view_id: ViewId) -> pd.DataFrame:
+    """Bets frame built column by column from node chunks (SDK nodes or raw API JSON items).
+
+    Replaces collecting property dicts + `pd.json_normalize`: only `BET_PROPERTIES` are kept,
+    direct relations become their external id, and columns get their final dtypes directly.
+    Chunks are consumed one at a time, so only one page of node objects is alive at once.
+    """
+    columns: dict[str, list] = {p: [] for p in BET_PROPERTIES}
+    appends = [(p, columns[p].append) for p in BET_PROPERTIES]
+    for chunk in chunks:
+        for node in chunk:
+            props = _view_properties(node, view_id)
+            for prop, append in appends:
+                append(props.get(prop))
+
+    if not columns["player"]:
+        return pd.DataFrame()
+
+    data = {}
+    for prop, values in columns.items():
+        if prop not in BET_RELATIONS and all(v is None for v in values):
+            continue  # property not in the view
+        if prop in BET_RELATIONS:
+            data[prop] = pd.Categorical([_relation_external_id(v) for v in values])
+        elif prop in BET_FLOAT_COLUMNS:
+            data[prop] = np.array(values, dtype=np.float32)
+        elif prop in BET_CATEGORY_COLUMNS:
+            data[prop] = pd.Categorical(values)
+        else:
+            data[prop] = values
+    return pd.DataFrame(data)
+
+
+def query_node_pages(client, query: Query, name: str) -> Iterator:
+    """Pages of result set `name`, following its cursor until exhausted (mutates `query.cursors`)."""
+    while True:
+        page = client.data_modeling.instances.query(query=query)[name]
+        yield page
+        if not page or not page.cursor:
+            return
+        query.cursors = {name: page.cursor}
+
+
+def _gameweek_refs(space: str, first: int, last: int) -> list[dict]:
+    return [{"space": space, "externalId": f"GW_{n}"} for n in range(first, min(last, MAX_GAMEWEEK) + 1)]
+
+
+def bet_filter(
+    view_id: ViewId,
+    player: str | None = None,
+    from_gw: int | None = None,
+    to_gw: int | None = None,
+    start_date: str | None = None,
+    end_date: str | None = None,
+    include_undated: bool = False,
+) -> Filter:
+    """CDF filter for a slice of the Bet view: one player, an inclusive gameweek range and/or a
+    `[start_date, end_date)` date range (plus bets without a date if `include_undated`).
+
+    Player and gameweek are direct relations, so the player is an equality on the reference and
+    the gameweek range a set of `GW_n` references (an open start excludes GW_1..from_gw-1 instead).
+    A relation has no order to `Range` over, so both sets are capped at `MAX_GAMEWEEK` references.
+    """
+    filters = [HasData(views=[view_id])]
+    if start_date or end_date:
+        dated = Range(view_id.as_property_ref("date"), gte=start_date, lt=end_date)
+        filters.append(Or(dated, Not(Exists(view_id.as_property_ref("date")))) if include_undated else dated)
+    if player:
+        filters.append(Equals(view_id.as_property_ref("player"), {"space": view_id.space, "externalId": player}))
+    gameweek = view_id.as_property_ref("gameweek")
+    if to_gw is not None:
+        filters.append(In(gameweek, _gameweek_refs(view_id.space, max(from_gw or 1, 1), to_gw)))
+    elif from_gw is not None and from_gw > 1:
+        filters.append(Not(In(gameweek, _gameweek_refs(view_id.space, 1, from_gw - 1))))
+    return And(*filters) if len(filters) > 1 else filters[0]
+
+
+def bet_query(
+    view_id: ViewId,
+    properties: Iterable[str] = BET_PROPERTIES,
+    filter: Filter | None = None,
+) -> Query:
+    return Query(
+        with_={
+            "Bet": NodeResultSetExpression(
+                filter=HasData(views=[view_id]) if filter is None else filter,
+                limit=BET_PAGE_SIZE,
+            ),
+        },
+        select={
+            "Bet": Select([SourceSelector(view_id, list(properties))]),
+        },
+    )
+
 
 @st.cache_data(ttl=0)
 def fetch_bet_view(
     space: str = DEFAULT_SPACE,
     view_external_id: str = DEFAULT_VIEW,
     version: str = DEFAULT_VIEW_VERSION,
+    player: str | None = None,
+    from_gw: int | None = None,
+    to_gw: int | None = None,
+    start_date: str | None = None,
+    end_date: str | None = None,
+    include_undated: bool = False,
 ) -> pd.DataFrame:
     client = get_client()
 
     view_id = ViewId(space, view_external_id, version)
-    rows = client.data_modeling.instances.list(
-        sources=[view_id],
-        limit=1000,
+    query = bet_query(
+        view_id, filter=bet_filter(view_id, player, from_gw, to_gw, start_date, end_date, include_undated)
     )
+    return build_bets_frame(query_node_pages(client, query, "Bet"), view_id)
 
-    if not rows:
-        return pd.DataFrame()
-
-    extracted = []
-    for row in rows:
-        props = row.properties.get(view_id)
-        extracted.append(props)
-
-    df = pd.json_normalize(extracted)
-    return df
 
-
-@st.cache_data(ttl=0)
-def fetch_event_view(
+def fetch_event_window(
+    start: str,
+    end: str,
     space: str = DEFAULT_SPACE,
     view_external_id: str = "Event",
     version: str = "1.0.3",
 ) -> pd.DataFrame:
+    """Events with `start <= eventDate < end` (ISO dates), in one cursor-paged query."""
     client = get_client()
-    yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
     event_vid = ViewId(space=space, external_id=view_external_id, version=version)
-    
+
     query = Query(
         with_={
             "Event": NodeResultSetExpression(
                 filter=And(
-                    Range((event_vid.as_property_ref("eventDate")), gt=yesterday, lte=datetime.now().strftime("%Y-%m-%d")), 
-                    SpaceFilter(space="tippelaget_space_name")
+                    Range(event_vid.as_property_ref("eventDate"), gte=start, lt=end),
+                    SpaceFilter(space=space),
                 ),
+                limit=EVENT_PAGE_SIZE,
             ),
         },
         select={
             "Event": Select(
                 [
-                    SourceSelector(event_vid, ["*"])
+                    SourceSelector(event_vid, [*EVENT_PROPERTIES, "eventDate"])
                 ],
             ),
         },
     )
-    try:
-        res = client.data_modeling.instances.query(query=query)
-        print(res["Event"])   
-        df = res.get_nodes("Event").to_pandas(expand_properties=True)
-    except CogniteAPIError as e:
-        print(e)
-        return pd.DataFrame()
-    return df
+    frames = [page.to_pandas(expand_properties=True) for page in query_node_pages(client, query, "Event") if page]
+    if not frames:
+        return pd.DataFrame(columns=[*EVENT_PROPERTIES, "eventDate"])
+    return pd.concat(frames, ignore_index=True)
+
+
+def parse_gameweek_numbers(gameweek: pd.Series) -> tuple[pd.Series, np.ndarray | pd.arrays.IntegerArray]:
+    """Parse "GW_X" ids into a categorical ordered by X, plus int16 X per row.
+
+    Only the distinct ids are parsed; rows pick their number up by category code. Rows without an
+    id (code -1) get <NA>, in a nullable Int16 array, instead of wrapping around to the last number.
+    """
+    cat = gameweek.astype("category")
+    nums = cat.cat.categories.str.extract(r"GW_(\d+)", expand=False).astype(int).to_numpy()
+    order = np.argsort(nums, kind="stable")
+    cat = cat.cat.reorder_categories(cat.cat.categories[order])
+    codes = cat.cat.codes.to_numpy()
+    values = nums[order].astype(np.int16)[codes]
+    missing = codes < 0
+    return cat, pd.arrays.IntegerArray(values, missing) if missing.any() else values
 
 
 def prepare_bets_df(df: pd.DataFrame) -> pd.DataFrame:
-    """Standardize and enrich the raw bets dataframe for the app."""
+    """Standardize and enrich the raw bets dataframe for the app.
+
+    Produces categorical `player`/`gameweek`/`description`, int16 `gameweek_num`, float32 money/odds and a
+    stable (gameweek, date, player) row order.
+    """
     if df.empty:
         return df
 
@@ -103,39 +261,225 @@ def prepare_bets_df(df: pd.DataFrame) -> pd.DataFrame:
     df = df.drop(columns=["player.space", "gameweek.space"], errors="ignore")
 
     # Convert gameweek string "GW_X" → integer
-    df["gameweek_num"] = df["gameweek"].str.extract(r"GW_(\d+)").astype(int)
+    df["gameweek"], df["gameweek_num"] = parse_gameweek_numbers(df["gameweek"])
+    if df["gameweek_num"].isna().any():
+        # Every series is keyed on the gameweek, so a bet without one has nowhere to go.
+        logger.warning("Dropping %d bets without a gameweek", int(df["gameweek_num"].isna().sum()))
+        df = df[df["gameweek_num"].notna()].astype({"gameweek_num": np.int16})
+    for col in BET_CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    for col in BET_FLOAT_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype(np.float32)
 
     # Win flag
     df["won"] = df["payout"] > 0
 
     # Ensure datetime
     if "date" in df.columns:
-        df["date"] = pd.to_datetime(df["date"])
+        df["date"] = pd.to_datetime(df["date"], format="ISO8601")
 
-    return df
+    sort_cols = [c for c in BET_SORT_COLUMNS if c in df.columns]
+    return df.sort_values(sort_cols, kind="stable").reset_index(drop=True)
 
 
-@st.cache_data(ttl=0)
-def create_monthly_innskudd_df() -> pd.DataFrame:
-    dates = pd.date_range(
-        start="2025-03-15", end=pd.Timestamp.today(), freq="MS"
-    ) + pd.DateOffset(days=14)
-    df = pd.DataFrame({"date": dates, "innskudd": 600})
-    return df
+def frame_memory_report(df: pd.DataFrame) -> dict[str, int]:
+    """Deep memory usage in bytes per column, plus "total"."""
+    usage = df.memory_usage(deep=True, index=True)
+    report = {str(k): int(v) for k, v in usage.items()}
+    report["total"] = int(usage.sum())
+    return report
 
 
 @st.cache_data(ttl=0)
-def get_prepared_bets() -> pd.DataFrame:
-    df = fetch_bet_view()
+def create_monthly_innskudd_df(
+    start: str = "2025-03-15",
+    end: str | None = None,
+    schedule: list[dict] | None = None,
+) -> pd.DataFrame:
+    """Deposits from `schedule` (default: `config.get_innskudd_schedule()`) for the months after
+    `start` until `end` (exclusive, default today). Has a `player` column when any rule is per player."""
+    today = pd.Timestamp.today()
+    frames = []
+    for rule in get_innskudd_schedule() if schedule is None else schedule:
+        first = max(pd.Timestamp(start), pd.Timestamp(rule.get("start") or start))
+        last = today
+        for bound in (end, rule.get("end")):
+            if bound:
+                last = min(last, pd.Timestamp(bound) - pd.Timedelta(days=1))
+        dates = deposit_dates(pd.date_range(start=first, end=last, freq="MS"), int(rule.get("day", 15)))
+        frame = pd.DataFrame({"date": dates, "innskudd": rule["amount"]})
+        if rule.get("player"):
+            frame["player"] = rule["player"]
+        frames.append(frame)
+    if not frames:
+        return pd.DataFrame({"date": pd.Series(dtype="datetime64[ns]"), "innskudd": pd.Series(dtype=float)})
+    df = pd.concat(frames, ignore_index=True)
+    return df.sort_values("date", kind="stable").reset_index(drop=True)
+
+
+def deposit_dates(months: pd.DatetimeIndex, day: int) -> pd.DatetimeIndex:
+    """`day` of each month in `months` (month starts), clamped to the month's last day (31 -> 30 Apr)."""
+    days = np.minimum(day, months.days_in_month) - 1
+    return months + pd.to_timedelta(days, unit="D")
+
+
+def innskudd_per_gameweek(df: pd.DataFrame, innskudd_df: pd.DataFrame) -> pd.DataFrame:
+    """Deposits summed per gameweek: each deposit counts towards the highest gameweek that started
+    on or before its date (deposits before the first gameweek are dropped).
+
+    An as-of join on the gameweek start dates, so it scales with deposits + gameweeks. Per-player
+    deposits (a `player` column) only count for players that have bets in `df`.
+    """
+    gw_dates = df.groupby("gameweek_num", observed=True)["date"].min().reset_index().sort_values("date")
+    # Running max, so the as-of match is the highest gameweek started so far even if dates are not monotonic.
+    gw_dates["gameweek_num"] = gw_dates["gameweek_num"].cummax()
+    deposits = innskudd_df
+    if "player" in deposits.columns:
+        players = set(df["player"].astype(str))
+        deposits = deposits[deposits["player"].isna() | deposits["player"].isin(players)]
+    deposits = deposits[["date", "innskudd"]].sort_values("date")
+    mapped = pd.merge_asof(
+        deposits.astype({"date": "datetime64[ns]"}),
+        gw_dates.astype({"date": "datetime64[ns]"}),
+        on="date",
+        direction="backward",
+    )
+    mapped = mapped.dropna(subset=["gameweek_num"]).astype({"gameweek_num": gw_dates["gameweek_num"].dtype})
+    return mapped.groupby("gameweek_num", as_index=False)["innskudd"].sum()
+
+
+# Seasons are partitions of the Bet view by date, see `config.get_seasons`.
+ALL_SEASONS = "all"
+
+
+def season_bounds(seasons: dict[str, str], season: str | None = None) -> tuple[str, str | None]:
+    """`(start, end)` ISO dates of a season (default: the current one); `end` is exclusive, None if open."""
+    starts = sorted(seasons.items(), key=lambda kv: kv[1])
+    if season is None:
+        season = starts[-1][0]
+    names = [name for name, _ in starts]
+    if season not in names:
+        raise KeyError(f"Unknown season {season!r}")
+    i = names.index(season)
+    return starts[i][1], starts[i + 1][1] if i + 1 < len(starts) else None
+
+
+def season_innskudd_df(season: str | None = None, player: str | None = None) -> pd.DataFrame:
+    """Deposits for one season, or since the first season for `ALL_SEASONS`. With `player` only
+    that player's own deposit rules count; team-wide deposits go to the team's kassa."""
+    seasons = get_seasons()
+    schedule = None
+    if player is not None:
+        schedule = [rule for rule in get_innskudd_schedule() if rule.get("player") == player]
+    if season == ALL_SEASONS:
+        return create_monthly_innskudd_df(min(seasons.values()), schedule=schedule)
+    return create_monthly_innskudd_df(*season_bounds(seasons, season), schedule=schedule)
+
+
+@st.cache_data
+def get_closed_season_bets(start_date: str, end_date: str) -> pd.DataFrame:
+    """Prepared bets of a season that has ended; they never change, so this is cached without a TTL."""
+    return prepare_bets_df(fetch_bet_view(start_date=start_date, end_date=end_date))
+
+
+@st.cache_resource
+def get_shared_cache():
+    """Cross-process frame cache (see shared_cache.py), or None unless `[shared_cache]` is configured."""
+    config = get_shared_cache_config()
+    if config is None:
+        return None
+    from .shared_cache import SharedFrameCache
+
+    return SharedFrameCache(config["dir"], float(config.get("ttl_s", 60)))
+
+
+def get_prepared_bets(
+    player: str | None = None,
+    from_gw: int | None = None,
+    to_gw: int | None = None,
+    season: str | None = None,
+) -> pd.DataFrame:
+    """Prepared bets of one season (default: current) or `ALL_SEASONS`, optionally only one
+    player's and/or a gameweek range. All slicing is filtered in CDF.
+
+    Bets without a date belong to the current season (the open one), so they are not lost to the
+    date partitioning. Not wrapped in `st.cache_data`, which would hand every caller its own copy
+    of a frame that may be mapped from the shared cache.
+    """
+    seasons = get_seasons()
+    unsliced = player is None and from_gw is None and to_gw is None
+    shared = get_shared_cache()
+    if season == ALL_SEASONS:
+        if unsliced and shared is not None:
+            return shared.get_or_fetch("bets-all", lambda: _all_seasons_bets(seasons, player, from_gw, to_gw))
+        return _all_seasons_bets(seasons, player, from_gw, to_gw)
+
+    start, end = season_bounds(seasons, season)
+    closed = end is not None and end <= date.today().isoformat()
+    undated = end is None
+    if unsliced and shared is not None:
+        return shared.get_or_fetch(
+            f"bets-{start}-{end or 'open'}",
+            lambda: prepare_bets_df(fetch_bet_view(start_date=start, end_date=end, include_undated=undated)),
+            ttl_s=math.inf if closed else None,
+        )
+    if unsliced and closed:
+        return get_closed_season_bets(start, end)
+    df = fetch_bet_view(
+        player=player, from_gw=from_gw, to_gw=to_gw, start_date=start, end_date=end, include_undated=undated
+    )
     return prepare_bets_df(df)
 
-@st.cache_data(ttl=0)
+
+def _all_seasons_bets(seasons: dict[str, str], player, from_gw, to_gw) -> pd.DataFrame:
+    # Built from the per-season partitions, so history comes from the closed-season cache.
+    names = sorted(seasons, key=seasons.get)
+    return concat_seasons([get_prepared_bets(player, from_gw, to_gw, name) for name in names])
+
+
+def concat_seasons(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """Prepared bets of consecutive seasons (oldest first) as one frame.
+
+    When a season's gameweeks restart (GW_1 again), its gameweeks are renumbered to continue after
+    the previous season's last, so all-time series run season after season instead of mixing them.
+    Seasons that keep counting are left as they are.
+    """
+    renumbered = []
+    last = 0
+    for frame in frames:
+        if frame.empty:
+            continue
+        nums = frame["gameweek_num"].astype(int)
+        shift = last - int(nums.min()) + 1 if nums.min() <= last else 0
+        if shift:
+            frame = frame.assign(gameweek="GW_" + (nums + shift).astype(str))
+        renumbered.append(frame)
+        last = int(nums.max()) + shift
+    return prepare_bets_df(pd.concat(renumbered, ignore_index=True)) if renumbered else pd.DataFrame()
+
+@st.cache_resource
+def get_event_store():
+    """Rolling window of upcoming events (see event_store.py), shared by every session."""
+    from .event_store import EventWindowStore
+
+    config = get_event_window_config()
+    store = EventWindowStore(int(config.get("window_days", 7)), float(config.get("refresh_s", 6 * 3600)))
+    store.start_schedule(fetch_event_window)
+    return store
+
+
 def get_todays_events() -> pd.DataFrame:
-    df = fetch_event_view()
-    #select relevant columns: "eventName, "H", "A", "D"
+    # Answered from the event window's index; Cognite is only queried when the window is refreshed
+    try:
+        df = get_event_store().events_on(date.today(), fetch_event_window)
+    except CogniteAPIError as e:
+        print(e)
+        return pd.DataFrame()
     if df.empty:
         return df
-    df = df[["eventName", "H", "A", "D"]]
+    df = df[list(EVENT_PROPERTIES)]
     return df
 
 def execute_workflow(wf_external_id: str, version="1") -> WorkFlowExecution:
@@ -0,0 +1,127 @@
+"""Rolling window of upcoming events, indexed by day.
+
+Instead of one Cognite query per rerun for today's events, `EventWindowStore` fetches every
+event from today through the next `window_days` days in one paginated query and indexes them by
+`eventDate`. Later reruns for any day inside that window are answered from the index without a
+network call. The window is refetched every `refresh_s`, by a background thread (`start_schedule`),
+or by a rerun that finds it older than that (in the background, serving the current window
+meanwhile). A rerun only waits on Cognite when the day asked for is outside the window or nothing
+was ever fetched. A failed refresh keeps the previous window.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Callable
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# fetch(start, end) -> events with an `eventDate` column, for ISO dates start <= eventDate < end.
+WindowFetch = Callable[[str, str], pd.DataFrame]
+
+
+@dataclass(frozen=True)
+class EventWindow:
+    start: str
+    end: str
+    fetched_at: float
+    by_day: dict[str, pd.DataFrame]
+    columns: list[str]
+
+    def covers(self, day: str) -> bool:
+        return self.start <= day < self.end
+
+    def events_on(self, day: str) -> pd.DataFrame:
+        return self.by_day.get(day, pd.DataFrame(columns=self.columns))
+
+
+def event_days(events: pd.DataFrame) -> pd.Series:
+    """`eventDate` as ISO day strings, whether CDF returned dates, timestamps or strings."""
+    return events["eventDate"].astype(str).str[:10]
+
+
+def build_window(events: pd.DataFrame, start: str, end: str, fetched_at: float) -> EventWindow:
+    events = events.reset_index(drop=True)
+    if events.empty or "eventDate" not in events.columns:
+        return EventWindow(start, end, fetched_at, {}, list(events.columns))
+    by_day = {day: frame.reset_index(drop=True) for day, frame in events.groupby(event_days(events), sort=False)}
+    return EventWindow(start, end, fetched_at, by_day, list(events.columns))
+
+
+class EventWindowStore:
+    def __init__(self, window_days: int = 7, refresh_s: float = 6 * 3600) -> None:
+        self.window_days = window_days
+        self.refresh_s = refresh_s
+        self._lock = threading.Lock()
+        # Held while a request waits on a fetch, so concurrent misses fetch once.
+        self._fetch_lock = threading.Lock()
+        self._window: EventWindow | None = None
+        self._refreshing = False
+        self._schedule: threading.Thread | None = None
+
+    def events_on(self, day: date, fetch: WindowFetch) -> pd.DataFrame:
+        """Events of `day`, from the index when the window covers it."""
+        iso = day.isoformat()
+        with self._lock:
+            window = self._window
+        if window is None or not window.covers(iso):
+            with self._fetch_lock:
+                with self._lock:
+                    window = self._window
+                if window is None or not window.covers(iso):
+                    window = self.refresh(fetch, day)
+            return window.events_on(iso)
+
+        if time.time() - window.fetched_at > self.refresh_s:
+            self._refresh_in_background(fetch)
+        return window.events_on(iso)
+
+    def refresh(self, fetch: WindowFetch, start: date | None = None) -> EventWindow:
+        """Fetch the window starting `start` (default today) now and index it."""
+        start = start or date.today()
+        end = start + timedelta(days=self.window_days)
+        fetched_at = time.time()
+        events = fetch(start.isoformat(), end.isoformat())
+        window = build_window(events, start.isoformat(), end.isoformat(), fetched_at)
+        with self._lock:
+            self._window = window
+        return window
+
+    def start_schedule(self, fetch: WindowFetch) -> None:
+        """Refetch the window every `refresh_s` from a daemon thread (once per store)."""
+        with self._lock:
+            if self._schedule is not None:
+                return
+            self._schedule = threading.Thread(target=self._run_schedule, args=(fetch,), name="event-window", daemon=True)
+        self._schedule.start()
+
+    def _run_schedule(self, fetch: WindowFetch) -> None:
+        while True:
+            time.sleep(self.refresh_s)
+            try:
+                self.refresh(fetch)
+            except Exception:
+                logger.exception("Scheduled event window refresh failed; keeping the previous window")
+
+    def _refresh_in_background(self, fetch: WindowFetch) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def refresh() -> None:
+            try:
+                self.refresh(fetch)
+            except Exception:
+                logger.exception("Refreshing the event window failed; serving the previous window")
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=refresh, name="event-window-refresh", daemon=True).start()
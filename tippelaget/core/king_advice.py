@@ -0,0 +1,98 @@
+"""Default King advice per player, computed ahead of time in the background.
+
+Today's events change once a day and the players are a fixed set, so the King's answer to
+`DEFAULT_QUESTION` is computed per player as soon as the King tab's data is loaded and shown from
+memory afterwards. Answers are keyed by (player, hash of today's events snippet, hash of the
+player's bets snippet), so a new day's events or new bets after a workflow run change the key and
+the next `ensure` recomputes. Free-form questions still go to the model live.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUESTION = "What should I bet on today?"
+
+AdviceKey = tuple[str, str, str]
+
+# A failed computation is not retried for this long, however often the advice is asked for.
+RETRY_AFTER_S = 300.0
+
+
+def snippet_hash(snippet: list[dict[str, Any]]) -> str:
+    return hashlib.blake2b(json.dumps(snippet, sort_keys=True, default=str).encode(), digest_size=8).hexdigest()
+
+
+class KingAdviceCache:
+    """Answers by (player, events hash, bets hash), the latest per player, computed once each."""
+
+    def __init__(self, retry_after_s: float = RETRY_AFTER_S) -> None:
+        self._lock = threading.Lock()
+        self._answers: dict[AdviceKey, str] = {}
+        self._pending: set[AdviceKey] = set()
+        self.retry_after_s = retry_after_s
+        self._failed: dict[AdviceKey, float] = {}
+
+    def get(self, key: AdviceKey) -> str | None:
+        with self._lock:
+            return self._answers.get(key)
+
+    def is_pending(self, key: AdviceKey) -> bool:
+        with self._lock:
+            return key in self._pending
+
+    def ensure(self, keys: list[AdviceKey], run: Callable[[list[AdviceKey]], None]) -> None:
+        """Starts one background `run(missing)` for the `keys` that have no answer, are not already
+        being computed and have not failed within `retry_after_s`; `run` computes them and calls
+        `store` (or `fail`) per key."""
+        with self._lock:
+            missing = [
+                key
+                for key in keys
+                if key not in self._answers and key not in self._pending and not self._cooling_down(key)
+            ]
+            self._pending.update(missing)
+        if not missing:
+            return
+
+        def compute() -> None:
+            try:
+                run(missing)
+            except Exception:
+                logger.exception("Precomputing King advice failed")
+                for key in missing:
+                    self.fail(key)
+            finally:
+                with self._lock:
+                    self._pending.difference_update(missing)
+
+        threading.Thread(target=compute, name="king-advice", daemon=True).start()
+
+    def fail(self, key: AdviceKey) -> None:
+        """Remember that computing `key` failed, so `ensure` leaves it alone for `retry_after_s`."""
+        with self._lock:
+            if key not in self._answers:
+                self._failed[key] = time.monotonic()
+
+    def failed(self, key: AdviceKey) -> bool:
+        """Whether the last attempt at `key` failed recently (and it is not being retried yet)."""
+        with self._lock:
+            return self._cooling_down(key)
+
+    def _cooling_down(self, key: AdviceKey) -> bool:
+        failed_at = self._failed.get(key)
+        return failed_at is not None and time.monotonic() - failed_at < self.retry_after_s
+
+    def store(self, key: AdviceKey, answer: str) -> None:
+        with self._lock:
+            # Advice for older events or bets is never asked for again.
+            self._answers = {k: v for k, v in self._answers.items() if k[0] != key[0]}
+            self._answers[key] = answer
+            self._failed = {k: t for k, t in self._failed.items() if k[0] != key[0]}
@@ -0,0 +1,138 @@
+"""Vectorized odds analysis of today's events for the King.
+
+`analyze_events` turns the 1X2 odds of every event into one row per market (home, draw, away and
+the three double chances, whose odds are combined as 1 / (1/a + 1/b)) with the bookmaker-implied
+probability, the fair probability and the event's overround. The margin is removed with the power
+method (fair = implied ** k, with k solved per event so the three sum to 1), which takes more of
+it off long shots than off favourites, as bookmakers price them (the favourite-longshot bias); so
+`value`, the return per NOK at the fair probability, differs between markets of one event.
+`rank_candidates` scales that by how often the player's bets at similar odds have won compared to
+what those odds implied (`adjusted_return`), adds a tie-break for odds close to the player's usual,
+and keeps the best market per event. Only the `top_k` best go into the prompt, so its size no
+longer grows with the fixture list.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+MARKETS = ("H", "D", "A", "1X", "X2", "12")
+MARKET_LABELS = ("home", "draw", "away", "home or draw", "draw or away", "home or away")
+# Columns of (H, D, A) combined into each double chance.
+DOUBLE_CHANCES = np.array([[0, 1], [1, 2], [0, 2]])
+# Odds ranges over which a player's hit rate is compared with the implied probability.
+ODDS_BINS = np.array([1.5, 2.0, 3.0, 5.0])
+# Pseudo-bets pulling a range's hit rate towards its implied probability, so few bets mean little.
+PRIOR_BETS = 10.0
+# Weight of the closeness to the player's usual odds (0..1), in standard deviations of
+# `adjusted_return` over the day's markets: it only reorders candidates of similar return.
+FIT_WEIGHT = 0.25
+# Newton steps for the power-method exponent; it converges in a handful.
+POWER_STEPS = 20
+TOP_K = 8
+
+COLUMNS = ["eventName", "market", "bet", "odds", "implied_prob", "fair_prob", "overround", "value"]
+
+
+def power_fair_probs(implied: np.ndarray) -> np.ndarray:
+    """Fair probabilities implied ** k per row of (H, D, A) implied probabilities, with k solved by
+    Newton's method so each row sums to 1."""
+    k = np.ones(len(implied))
+    log_implied = np.log(implied)
+    for _ in range(POWER_STEPS):
+        powered = implied ** k[:, None]
+        k -= (powered.sum(axis=1) - 1) / (powered * log_implied).sum(axis=1)
+    fair = implied ** k[:, None]
+    return fair / fair.sum(axis=1, keepdims=True)
+
+
+def analyze_events(events: pd.DataFrame) -> pd.DataFrame:
+    """One row per event and market: `eventName`, `market`, `bet`, `odds`, `implied_prob`,
+    `fair_prob`, the event's `overround` and `value` (fair_prob * odds - 1, the return per NOK at
+    the fair probability). Events without three valid odds are left out."""
+    if events.empty or not {"eventName", "H", "D", "A"} <= set(events.columns):
+        return pd.DataFrame(columns=COLUMNS)
+    odds = events[["H", "D", "A"]].to_numpy(dtype=float)
+    valid = np.isfinite(odds).all(axis=1) & (odds > 1).all(axis=1)
+    odds = odds[valid]
+    names = events["eventName"].to_numpy()[valid]
+
+    implied = 1 / odds
+    book = implied.sum(axis=1)
+    fair = power_fair_probs(implied)
+    implied_all = np.hstack([implied, implied[:, DOUBLE_CHANCES].sum(axis=2)])
+    fair_all = np.hstack([fair, fair[:, DOUBLE_CHANCES].sum(axis=2)])
+
+    n, m = implied_all.shape
+    return pd.DataFrame(
+        {
+            "eventName": np.repeat(names, m),
+            "market": np.tile(MARKETS, n),
+            "bet": np.tile(MARKET_LABELS, n),
+            "odds": (1 / implied_all).ravel(),
+            "implied_prob": implied_all.ravel(),
+            "fair_prob": fair_all.ravel(),
+            "overround": np.repeat(book - 1, m),
+            "value": (fair_all / implied_all).ravel() - 1,
+        }
+    )
+
+
+def odds_profile(bets: pd.DataFrame) -> tuple[np.ndarray, float, float]:
+    """(hit-rate / implied ratio per `ODDS_BINS` range, median log odds, spread of log odds) of a
+    player's settled bets; neutral (1.0 everywhere, no preferred odds) without history."""
+    n_bins = len(ODDS_BINS) + 1
+    if bets.empty or not {"odds", "won"} <= set(bets.columns):
+        return np.ones(n_bins), 0.0, np.inf
+    odds = bets["odds"].to_numpy(dtype=float)
+    keep = np.isfinite(odds) & (odds > 1)
+    if "payout" in bets.columns:
+        # `won` is payout > 0, so pending bets (no payout yet) would count as losses.
+        keep &= bets["payout"].notna().to_numpy()
+    odds = odds[keep]
+    if not len(odds):
+        return np.ones(n_bins), 0.0, np.inf
+    won = bets["won"].to_numpy(dtype=float)[keep]
+    bins = np.digitize(odds, ODDS_BINS)
+    count = np.bincount(bins, minlength=n_bins)
+    wins = np.bincount(bins, weights=won, minlength=n_bins)
+    implied = np.bincount(bins, weights=1 / odds, minlength=n_bins)
+    mean_implied = np.divide(implied, count, out=np.full(n_bins, np.nan), where=count > 0)
+    # Ranges the player never bets in are neutral.
+    mean_implied = np.where(np.isnan(mean_implied), 1.0, mean_implied)
+    hit_rate = (wins + PRIOR_BETS * mean_implied) / (count + PRIOR_BETS)
+    log_odds = np.log(odds)
+    q1, median, q3 = np.percentile(log_odds, [25, 50, 75])
+    # IQR / 1.349 estimates a standard deviation; floored so a one-price player still ranks others.
+    return hit_rate / mean_implied, float(median), max(float(q3 - q1) / 1.349, 0.25)
+
+
+def rank_candidates(events: pd.DataFrame, bets: pd.DataFrame, top_k: int = TOP_K) -> pd.DataFrame:
+    """The best market of each event for the player whose `bets` are given, `top_k` events at most,
+    best first, with `hit_ratio` (the player's record at those odds), `adjusted_return` (return per
+    NOK at the fair probability if the player keeps that record) and `score`."""
+    markets = analyze_events(events)
+    if markets.empty:
+        return markets
+    edge, center, spread = odds_profile(bets)
+    odds = markets["odds"].to_numpy()
+    hit_ratio = edge[np.digitize(odds, ODDS_BINS)]
+    adjusted_return = (1 + markets["value"].to_numpy()) * hit_ratio - 1
+    fit = np.exp(-0.5 * ((np.log(odds) - center) / spread) ** 2)
+    score = adjusted_return + FIT_WEIGHT * adjusted_return.std() * fit
+    ranked = markets.assign(hit_ratio=hit_ratio, adjusted_return=adjusted_return, score=score)
+    ranked = ranked.iloc[np.argsort(-score, kind="stable")]
+    # One market per event: a home, an away and a home-or-away pick on one match contradict.
+    return ranked.drop_duplicates("eventName").head(top_k).reset_index(drop=True)
+
+
+def candidate_records(candidates: pd.DataFrame) -> list[dict[str, Any]]:
+    """Prompt records: odds to 2 decimals, probabilities and returns to 3."""
+    cols = ["eventName", "bet", "odds", "fair_prob", "overround", "adjusted_return"]
+    rounded = candidates[[c for c in cols if c in candidates.columns]].round(
+        {"odds": 2, "fair_prob": 3, "overround": 3, "adjusted_return": 3}
+    )
+    return rounded.to_dict(orient="records")
@@ -0,0 +1,384 @@
+"""Record/replay stand-in for the Cognite client.
+
+Covers the calls the app makes: `data_modeling.instances(...)` (chunked iteration),
+`data_modeling.instances.list`, `data_modeling.instances.query`
+and `workflows.executions.{list,retrieve_detailed,run}`. A recording is one JSON file holding the
+dumped SDK objects; `RecordingCogniteClient` writes it from a live project and
+`ReplayCogniteClient` serves it back with configurable latency, pagination and error injection,
+so I/O paths can be benchmarked offline and deterministically.
+
+Enabled through configuration rather than code changes: the `[cognite_replay]` Streamlit secret
+(see `config.get_cognite_replay_config`) or the API's `COGNITE_REPLAY_*` settings.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+from cognite.client.data_classes.data_modeling.instances import Node, NodeList, NodeListWithCursor
+from cognite.client.data_classes.data_modeling.query import QueryResult
+from cognite.client.data_classes.workflows import WorkflowExecution, WorkflowExecutionList
+from cognite.client.exceptions import CogniteAPIError
+
+INSTANCES_LIST = "instances.list"
+INSTANCES_QUERY = "instances.query"
+EXECUTIONS_LIST = "workflows.executions.list"
+EXECUTIONS_DETAILED = "workflows.executions.retrieve_detailed"
+
+
+def _source_key(source: Any) -> str:
+    # ViewId, View or SourceSelector (which wraps a ViewId in `.source`)
+    view = getattr(source, "source", source)
+    if hasattr(view, "as_id"):
+        view = view.as_id()
+    return f"{view.space}:{view.external_id}/{view.version}"
+
+
+def sources_key(sources: Any) -> str:
+    if sources is None:
+        return ""
+    if not isinstance(sources, (list, tuple)):
+        sources = [sources]
+    return ",".join(sorted(_source_key(s) for s in sources))
+
+
+def query_key(query: Any) -> str:
+    return ",".join(sorted(query.with_))
+
+
+def workflow_key(workflow_version_ids: Any) -> str:
+    ids = workflow_version_ids
+    if isinstance(ids, tuple) or not isinstance(ids, list):
+        ids = [ids]
+    keys = []
+    for i in ids:
+        if isinstance(i, tuple):
+            keys.append(f"{i[0]}/{i[1]}")
+        else:
+            keys.append(f"{i.workflow_external_id}/{i.version}")
+    return ",".join(sorted(keys))
+
+
+def selected_properties(select: Any) -> dict[str, set[str] | None]:
+    """Properties a query `Select` asks for per view key; None means all ("*")."""
+    selected: dict[str, set[str] | None] = {}
+    for selector in getattr(select, "sources", None) or []:
+        props = list(selector.properties or ["*"])
+        selected[_source_key(selector)] = None if "*" in props else set(props)
+    return selected
+
+
+def project(node: dict[str, Any], selected: dict[str, set[str] | None]) -> dict[str, Any]:
+    """Dumped node with only the selected properties, as CDF returns it. No selection keeps everything."""
+    if not selected:
+        return node
+    properties: dict[str, dict[str, Any]] = {}
+    for space, views in node.get("properties", {}).items():
+        for view, values in views.items():
+            key = f"{space}:{view}"
+            if key not in selected:
+                continue
+            keep = selected[key]
+            values = values if keep is None else {k: v for k, v in values.items() if k in keep}
+            properties.setdefault(space, {})[view] = values
+    return {**node, "properties": properties}
+
+
+def _property_value(node: dict[str, Any], ref: Any) -> Any:
+    if len(ref) == 2:
+        # Instance property, e.g. ["node", "space"] from a SpaceFilter
+        return node.get(ref[1])
+    space, view, prop = ref
+    return node.get("properties", {}).get(space, {}).get(view, {}).get(prop)
+
+
+def matches(node: dict[str, Any], flt: dict[str, Any] | None) -> bool:
+    """Evaluate a dumped filter (`and`/`or`/`not`/`equals`/`in`/`range`/`exists`/`hasData`) against a dumped node.
+
+    Other filters are not applied. Ranges compare recorded values as-is (ISO dates compare as
+    strings), so today's events only replay from a recording made today.
+    """
+    if not flt:
+        return True
+    (op, arg), = flt.items()
+    if op == "and":
+        return all(matches(node, f) for f in arg)
+    if op == "or":
+        return any(matches(node, f) for f in arg)
+    if op == "not":
+        return not matches(node, arg)
+    if op == "equals":
+        return _property_value(node, arg["property"]) == arg["value"]
+    if op == "in":
+        return _property_value(node, arg["property"]) in arg["values"]
+    if op == "range":
+        value = _property_value(node, arg["property"])
+        if value is None:
+            return False
+        bounds = {"gt": value.__gt__, "gte": value.__ge__, "lt": value.__lt__, "lte": value.__le__}
+        return all(bounds[k](v) is True for k, v in arg.items() if k in bounds)
+    if op == "exists":
+        return _property_value(node, arg["property"]) is not None
+    if op == "hasData":
+        views = node.get("properties", {})
+        return any(f"{v['externalId']}/{v['version']}" in views.get(v["space"], {}) for v in arg)
+    return True
+
+
+class Recording:
+    """Dumped responses keyed by call and request shape; thread-safe."""
+
+    def __init__(self, data: dict[str, dict[str, Any]] | None = None) -> None:
+        self.data = data or {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str | Path) -> "Recording":
+        return cls(json.loads(Path(path).read_text(encoding="utf-8")))
+
+    def save(self, path: str | Path) -> None:
+        with self._lock:
+            payload = json.dumps(self.data, separators=(",", ":"))
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_text(payload, encoding="utf-8")
+
+    def get(self, call: str, key: str) -> Any:
+        try:
+            return self.data[call][key]
+        except KeyError:
+            raise KeyError(f"No recorded {call} response for {key!r}") from None
+
+    def put(self, call: str, key: str, value: Any) -> None:
+        with self._lock:
+            self.data.setdefault(call, {})[key] = value
+
+
+class _ReplayInstances:
+    def __init__(self, owner: "ReplayCogniteClient") -> None:
+        self._owner = owner
+
+    def __call__(
+        self,
+        chunk_size: int | None = None,
+        instance_type: str = "node",
+        limit: int | None = None,
+        sources: Any = None,
+        **_: Any,
+    ) -> Iterator[Any]:
+        """Iterate like `client.data_modeling.instances(...)`: NodeList chunks, or single nodes without chunk_size."""
+        items = self._owner.recording.get(INSTANCES_LIST, sources_key(sources))
+        if limit is not None and limit >= 0:
+            items = items[:limit]
+        page = chunk_size or self._owner.page_size
+        for start in range(0, len(items), page):
+            self._owner.simulate(min(page, len(items) - start))
+            chunk = NodeList.load(items[start : start + page])
+            if chunk_size:
+                yield chunk
+            else:
+                yield from chunk
+
+    def list(self, instance_type: str = "node", sources: Any = None, limit: int | None = 25, **_: Any) -> NodeList:
+        items = self._owner.recording.get(INSTANCES_LIST, sources_key(sources))
+        if limit is not None and limit >= 0:
+            items = items[:limit]
+        self._owner.simulate(len(items))
+        return NodeList.load(items)
+
+    def query(self, query: Any, **_: Any) -> QueryResult:
+        """Applies each result set's filter (see `matches`), pages it by `limit` (integer offsets as
+        cursors) and keeps only the selected properties."""
+        recorded = self._owner.recording.get(INSTANCES_QUERY, query_key(query))
+        cursors = query.cursors or {}
+        pages = {}
+        for name, nodes in recorded.items():
+            expression = query.with_.get(name)
+            flt = getattr(expression, "filter", None)
+            if flt is not None:
+                dumped = flt.dump(camel_case_property=True)
+                nodes = [n for n in nodes if matches(n, dumped)]
+            limit = getattr(expression, "limit", None)
+            start = int(cursors.get(name) or 0)
+            end = min(len(nodes), start + limit) if limit else len(nodes)
+            pages[name] = (nodes[start:end], str(end) if end < len(nodes) else None)
+        self._owner.simulate(sum(len(page) for page, _ in pages.values()))
+        result = QueryResult()
+        for name, (page, cursor) in pages.items():
+            selected = selected_properties(query.select.get(name))
+            result[name] = NodeListWithCursor([Node._load(project(n, selected)) for n in page], cursor=cursor)
+        return result
+
+
+class _ReplayExecutions:
+    def __init__(self, owner: "ReplayCogniteClient") -> None:
+        self._owner = owner
+        self._runs: dict[str, WorkflowExecution] = {}
+        self._lock = threading.Lock()
+
+    def list(self, workflow_version_ids: Any = None, limit: int | None = 25, **_: Any) -> WorkflowExecutionList:
+        key = workflow_key(workflow_version_ids)
+        items = self._owner.recording.get(EXECUTIONS_LIST, key)
+        with self._lock:
+            started = [r for r in self._runs.values() if f"{r.workflow_external_id}/{r.version}" == key]
+        self._owner.simulate(len(items))
+        executions = sorted(started, key=lambda r: -r.created_time) + list(WorkflowExecutionList.load(items))
+        return WorkflowExecutionList(executions[:limit] if limit is not None and limit >= 0 else executions)
+
+    def retrieve_detailed(self, id: str) -> Any:
+        self._owner.simulate(1)
+        with self._lock:
+            if id in self._runs:
+                return self._runs[id]
+        recorded = self._owner.recording.data.get(EXECUTIONS_DETAILED, {}).get(str(id))
+        # Detailed executions carry task definitions; the app only reads status/created_time.
+        return WorkflowExecution._load(recorded) if recorded is not None else None
+
+    def run(self, workflow_external_id: str, version: str, **_: Any) -> WorkflowExecution:
+        self._owner.simulate(1)
+        now = int(time.time() * 1000)
+        execution = WorkflowExecution(
+            id=str(uuid.uuid4()),
+            workflow_external_id=workflow_external_id,
+            version=version,
+            status="completed",
+            created_time=now,
+            start_time=now,
+            end_time=now,
+        )
+        with self._lock:
+            self._runs[execution.id] = execution
+        return execution
+
+
+class _Namespace:
+    def __init__(self, **attrs: Any) -> None:
+        self.__dict__.update(attrs)
+
+
+class ReplayCogniteClient:
+    """Serves a recording in place of `CogniteClient` for the calls the app makes.
+
+    Every call sleeps `latency_ms` (+ up to `jitter_ms`) per page of `page_size` items, and fails
+    with a `CogniteAPIError(error_code)` with probability `error_rate`.
+    """
+
+    def __init__(
+        self,
+        recording: Recording | str | Path,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        page_size: int = 1000,
+        error_rate: float = 0.0,
+        error_code: int = 503,
+        seed: int | None = 0,
+    ) -> None:
+        self.recording = recording if isinstance(recording, Recording) else Recording.load(recording)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.page_size = max(1, page_size)
+        self.error_rate = error_rate
+        self.error_code = error_code
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self.calls = 0
+
+        self.data_modeling = _Namespace(instances=_ReplayInstances(self))
+        self.workflows = _Namespace(executions=_ReplayExecutions(self))
+        credentials = _Namespace(authorization_header=lambda: ("Authorization", "Bearer replay"))
+        self.config = _Namespace(client_name="tippelaget_replay", project="replay", credentials=credentials)
+
+    def simulate(self, n_items: int) -> None:
+        pages = max(1, math.ceil(n_items / self.page_size))
+        with self._rng_lock:
+            self.calls += 1
+            fail = self.error_rate > 0 and self._rng.random() < self.error_rate
+            delays = [self.latency_ms + self._rng.uniform(0, self.jitter_ms) for _ in range(pages)]
+        if fail:
+            time.sleep(delays[0] / 1000)
+            raise CogniteAPIError("Injected replay error", code=self.error_code)
+        time.sleep(sum(delays) / 1000)
+
+
+class _RecordingInstances:
+    def __init__(self, owner: "RecordingCogniteClient") -> None:
+        self._owner = owner
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Iterator[Any]:
+        dumped: list[dict[str, Any]] = []
+        for item in self._owner.live.data_modeling.instances(*args, **kwargs):
+            dumped.extend(item.dump(camel_case=True) if isinstance(item, NodeList) else [item.dump(camel_case=True)])
+            yield item
+        self._owner.store(INSTANCES_LIST, sources_key(kwargs.get("sources")), dumped)
+
+    def list(self, *args: Any, **kwargs: Any) -> Any:
+        res = self._owner.live.data_modeling.instances.list(*args, **kwargs)
+        self._owner.store(INSTANCES_LIST, sources_key(kwargs.get("sources")), res.dump(camel_case=True))
+        return res
+
+    def query(self, query: Any, **kwargs: Any) -> Any:
+        key = query_key(query)
+        resumed = any((query.cursors or {}).values())
+        res = self._owner.live.data_modeling.instances.query(query=query, **kwargs)
+        dumped = {name: value.dump(camel_case=True) for name, value in res.items()}
+        if resumed:
+            # Later pages of a cursor-paged query extend the recorded result sets.
+            previous = self._owner.recording.data.get(INSTANCES_QUERY, {}).get(key, {})
+            dumped = {name: previous.get(name, []) + nodes for name, nodes in dumped.items()}
+        self._owner.store(INSTANCES_QUERY, key, dumped)
+        return res
+
+
+class _RecordingExecutions:
+    def __init__(self, owner: "RecordingCogniteClient") -> None:
+        self._owner = owner
+
+    def list(self, workflow_version_ids: Any = None, **kwargs: Any) -> Any:
+        res = self._owner.live.workflows.executions.list(workflow_version_ids, **kwargs)
+        self._owner.store(EXECUTIONS_LIST, workflow_key(workflow_version_ids), res.dump(camel_case=True))
+        return res
+
+    def retrieve_detailed(self, id: str) -> Any:
+        res = self._owner.live.workflows.executions.retrieve_detailed(id)
+        if res is not None:
+            self._owner.store(EXECUTIONS_DETAILED, str(id), res.dump(camel_case=True))
+        return res
+
+    def run(self, *args: Any, **kwargs: Any) -> Any:
+        return self._owner.live.workflows.executions.run(*args, **kwargs)
+
+
+class RecordingCogniteClient:
+    """Proxies a live client and saves every supported response to `path` as it goes."""
+
+    def __init__(self, live: Any, path: str | Path) -> None:
+        self.live = live
+        self.path = Path(path)
+        self.recording = Recording.load(self.path) if self.path.is_file() else Recording()
+        self.data_modeling = _Namespace(instances=_RecordingInstances(self))
+        self.workflows = _Namespace(executions=_RecordingExecutions(self))
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.live, name)
+
+    def store(self, call: str, key: str, value: Any) -> None:
+        self.recording.put(call, key, value)
+        self.recording.save(self.path)
+
+
+def client_from_replay_config(config: dict[str, Any], live_factory: Callable[[], Any]) -> Any:
+    """Client for a replay config: `mode` is "replay" (default) or "record"; other keys go to the client."""
+    opts = dict(config)
+    mode = opts.pop("mode", "replay") or "replay"
+    path = opts.pop("path")
+    if mode == "record":
+        return RecordingCogniteClient(live_factory(), path)
+    if mode == "replay":
+        return ReplayCogniteClient(path, **opts)
+    raise ValueError(f"Unknown Cognite replay mode {mode!r}; expected 'replay' or 'record'")
@@ -0,0 +1,104 @@
+"""Cross-process cache of prepared frames in memory-mapped Arrow IPC files.
+
+Every process serving the app (Streamlit processes, uvicorn workers) points at the same
+directory, ideally on tmpfs such as `/dev/shm/tippelaget`. Each entry is one Arrow IPC file that
+readers memory-map read-only, so the numeric columns of the frame are shared through the page
+cache instead of copied into every process. When an entry is missing or older than its TTL, the
+first process to take the entry's lock file fetches and writes it; the others wait on the lock and
+then map the new file, so only one process talks to Cognite per refresh. A refresh writes a
+temporary file and renames it over the entry, so readers see either the old or the new file and
+processes that still map the old one keep a valid (unlinked) copy until they drop it.
+
+POSIX only (`fcntl` locks and rename-over semantics).
+"""
+
+from __future__ import annotations
+
+import fcntl
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator
+
+import pandas as pd
+import pyarrow as pa
+
+WRITTEN_AT_KEY = b"tippelaget_written_at"
+
+
+class SharedFrameCache:
+    """Named frames shared between processes through `directory`; entries expire after `ttl_s`."""
+
+    def __init__(self, directory: str, ttl_s: float) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.ttl_s = ttl_s
+        self._lock = threading.Lock()
+        # name -> ((inode, mtime), written_at, frame) of the file this process has mapped
+        self._mapped: dict[str, tuple[tuple[int, int], float, pd.DataFrame]] = {}
+
+    def path(self, name: str) -> Path:
+        return self.directory / f"{name}.arrow"
+
+    def get_or_fetch(
+        self, name: str, fetch: Callable[[], pd.DataFrame], ttl_s: float | None = None
+    ) -> pd.DataFrame:
+        """The shared frame `name`, fetched and written by one process when missing or stale.
+
+        `ttl_s=math.inf` never refreshes (e.g. seasons that have ended).
+        """
+        ttl_s = self.ttl_s if ttl_s is None else ttl_s
+        df = self._read(name, ttl_s)
+        if df is not None:
+            return df
+        with self._exclusive(name):
+            # Another process may have refreshed the entry while we waited for the lock.
+            df = self._read(name, ttl_s)
+            if df is None:
+                self._write(name, fetch())
+                df = self._read(name, math.inf)
+        return df
+
+    def _read(self, name: str, ttl_s: float) -> pd.DataFrame | None:
+        path = self.path(name)
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return None
+        key = (st.st_ino, st.st_mtime_ns)
+        with self._lock:
+            mapped = self._mapped.get(name)
+        if mapped is None or mapped[0] != key:
+            source = pa.memory_map(str(path), "r")
+            table = pa.ipc.open_file(source).read_all()
+            written_at = float((table.schema.metadata or {}).get(WRITTEN_AT_KEY, b"0"))
+            # Numeric columns stay views into the mapping; the buffers keep it alive.
+            mapped = (key, written_at, table.to_pandas(split_blocks=True))
+            with self._lock:
+                self._mapped[name] = mapped
+        _, written_at, df = mapped
+        if time.time() - written_at > ttl_s:
+            return None
+        return df
+
+    def _write(self, name: str, df: pd.DataFrame) -> None:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        metadata = {**(table.schema.metadata or {}), WRITTEN_AT_KEY: str(time.time()).encode()}
+        table = table.replace_schema_metadata(metadata)
+        path = self.path(name)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp, path)
+
+    @contextmanager
+    def _exclusive(self, name: str) -> Iterator[None]:
+        with open(self.directory / f"{name}.lock", "w") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
@@ -0,0 +1,35 @@
+"""Concurrent loading of a rerun's independent Cognite fetches."""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+from tippelaget.core.client import get_client
+from tippelaget.ui.profiling import RerunProfiler
+
+MAX_WORKERS = 4
+
+
+def load_concurrently(calls: dict[str, Callable[[], Any]], profiler: RerunProfiler) -> dict[str, Any]:
+    """Run `calls` on a small thread pool and return their results by name.
+
+    Each fetch is a blocking Cognite round trip, so on a cold cache the rerun waits for the
+    slowest one instead of their sum. The cached client is created here first so every worker
+    shares it, and the workers get this rerun's script context so `st.cache_*` behaves as on
+    the main thread. Each call is a worker stage of the profiler (its time, thread and start/end,
+    and its own cProfile when tracing); the first error is re-raised.
+    """
+    get_client()
+    ctx = get_script_run_ctx()
+
+    def run(name: str, call: Callable[[], Any]) -> Any:
+        add_script_run_ctx(ctx=ctx)
+        with profiler.worker(name):
+            return call()
+
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(calls)), thread_name_prefix="loader") as pool:
+        futures = {name: pool.submit(run, name, call) for name, call in calls.items()}
+        return {name: future.result() for name, future in futures.items()}
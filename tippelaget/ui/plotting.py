@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import matplotlib.pyplot as plt
+import numpy as np
 import seaborn as sns
 import streamlit as st
 from matplotlib.offsetbox import OffsetImage, AnnotationBbox
@@ -77,3 +78,41 @@ def add_image_markers(ax, x_values, y_values, image, zoom: float = 0.12) -> None
             # Fail silently to avoid breaking plots if image rendering fails
             pass
 
+
+
+def lttb_indices(y, max_points: int | None) -> np.ndarray:
+    """Positions of at most `max_points` points of `y` that preserve the shape of the line.
+
+    Largest-Triangle-Three-Buckets over point positions, always keeping the first and last point
+    and the minimum and maximum. `None` (or a short series) keeps every point.
+    """
+    y = np.asarray(y, dtype="float64")
+    n = len(y)
+    if max_points is None or n <= max(max_points, 4):
+        return np.arange(n)
+    extremes = {int(np.nanargmin(y)), int(np.nanargmax(y))} - {0, n - 1}
+    budget = max(max_points, 4) - len(extremes)
+    y = np.nan_to_num(y)
+    # Interior points split into budget - 2 buckets; each keeps the point spanning the largest
+    # triangle with the previously kept point and the mean of the next bucket.
+    edges = np.linspace(1, n - 1, budget - 1).astype(int)
+    keep = [0]
+    for b in range(budget - 2):
+        lo, hi = edges[b], edges[b + 1]
+        nxt_lo, nxt_hi = edges[b + 1], edges[b + 2] if b + 2 < len(edges) else n
+        avg_x, avg_y = (nxt_lo + nxt_hi - 1) / 2, y[nxt_lo:nxt_hi].mean()
+        a = keep[-1]
+        xs = np.arange(lo, hi)
+        area = np.abs((a - avg_x) * (y[lo:hi] - y[a]) - (a - xs) * (avg_y - y[a]))
+        keep.append(lo + int(np.argmax(area)))
+    keep.append(n - 1)
+    return np.array(sorted(set(keep) | extremes))
+
+
+def downsample_lines(df, columns: list[str], max_points: int | None):
+    """Rows of `df` keeping the shape of each of `columns` within `max_points` rows in total."""
+    if max_points is None or len(df) <= max_points:
+        return df
+    per_line = max(max_points // len(columns), 4)
+    idx = sorted(set().union(*(lttb_indices(df[c].to_numpy(), per_line).tolist() for c in columns)))
+    return df.iloc[idx]
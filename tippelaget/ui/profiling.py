@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Iterator
+
+import pandas as pd
+import streamlit as st
+
+HISTORY_KEY = "profiling_history"
+TRACE_KEY = "profiling_last_trace"
+HISTORY_SIZE = 50
+
+
+def profiling_requested() -> tuple[bool, bool]:
+    """(enabled, trace) for this rerun.
+
+    Opt-in via the `[profiling]` secret: `enabled = true` turns it on for everyone, otherwise
+    `?profile=<token>` must match `token`. `?trace=1` (or `trace = true`) also records a
+    cProfile trace of the rerun.
+    """
+    try:
+        cfg = st.secrets.get("profiling") or {}
+    except FileNotFoundError:
+        cfg = {}
+    token = cfg.get("token")
+    param = st.query_params.get("profile")
+    enabled = bool(cfg.get("enabled")) or (bool(token) and param == token)
+    trace = enabled and (bool(cfg.get("trace")) or st.query_params.get("trace") == "1")
+    return enabled, trace
+
+
+class RerunProfiler:
+    """Times named stages of one Streamlit rerun and keeps a rolling history in session state.
+
+    When disabled every method is a no-op, so `main()` can wrap its stages unconditionally.
+    """
+
+    def __init__(self, enabled: bool = False, trace: bool = False) -> None:
+        self.enabled = enabled
+        self.timings: dict[str, float] = {}
+        self.frame_bytes: dict[str, int] = {}
+        # Stages run on worker threads: thread name and start/end in ms since the rerun began.
+        self.workers: dict[str, dict[str, float | str]] = {}
+        self._lock = threading.Lock()
+        self._thread_profiles: list[cProfile.Profile] = []
+        self._t0 = time.perf_counter()
+        self._profile = cProfile.Profile() if enabled and trace else None
+        if self._profile is not None:
+            self._profile.enable()
+
+    @classmethod
+    def from_request(cls) -> "RerunProfiler":
+        return cls(*profiling_requested())
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - t0) * 1000
+            with self._lock:
+                self.timings[name] = self.timings.get(name, 0.0) + elapsed
+
+    @contextmanager
+    def worker(self, name: str) -> Iterator[None]:
+        """Like `stage`, for a stage run on a worker thread: also records the thread and when the
+        stage started and ended, so overlapping stages show in the panel. When tracing, the thread
+        gets its own cProfile merged into the trace, since before Python 3.12 a profile only sees
+        the thread that enabled it."""
+        if not self.enabled:
+            yield
+            return
+        profile = cProfile.Profile() if self._profile is not None and sys.version_info < (3, 12) else None
+        start = time.perf_counter()
+        if profile is not None:
+            profile.enable()
+        try:
+            with self.stage(name):
+                yield
+        finally:
+            if profile is not None:
+                profile.disable()
+            end = time.perf_counter()
+            with self._lock:
+                if profile is not None:
+                    self._thread_profiles.append(profile)
+                self.workers[name] = {
+                    "thread": threading.current_thread().name,
+                    "start": (start - self._t0) * 1000,
+                    "end": (end - self._t0) * 1000,
+                }
+
+    def record_frame(self, name: str, df: pd.DataFrame) -> None:
+        """Remember the deep memory footprint of a frame for the panel."""
+        if self.enabled:
+            self.frame_bytes[name] = int(df.memory_usage(deep=True).sum())
+
+    def finish(self) -> None:
+        """Record this rerun in the rolling history and render the panel."""
+        if not self.enabled:
+            return
+        if self._profile is not None:
+            self._profile.disable()
+            out = io.StringIO()
+            stats = pstats.Stats(self._profile, stream=out)
+            for profile in self._thread_profiles:
+                stats.add(profile)
+            stats.sort_stats("cumulative").print_stats(40)
+            st.session_state[TRACE_KEY] = out.getvalue()
+        self.timings["total"] = (time.perf_counter() - self._t0) * 1000
+
+        history = st.session_state.setdefault(HISTORY_KEY, deque(maxlen=HISTORY_SIZE))
+        history.append(dict(self.timings))
+        self._render(history)
+
+    def _render(self, history: deque) -> None:
+        with st.expander("⏱️ Profiling", expanded=True):
+            st.markdown("**This rerun (ms)**")
+            last = pd.Series(self.timings, name="ms").sort_values(ascending=False)
+            st.dataframe(last.round(1).to_frame(), use_container_width=True)
+
+            runs = pd.DataFrame(list(history))
+            stats = pd.DataFrame(
+                {
+                    "p50": runs.quantile(0.5),
+                    "p95": runs.quantile(0.95),
+                    "max": runs.max(),
+                    "runs": runs.count(),
+                }
+            ).sort_values("p50", ascending=False)
+            st.markdown(f"**Rolling p50 / p95 over the last {len(runs)} reruns (ms)**")
+            st.dataframe(stats.round(1), use_container_width=True)
+
+            if self.workers:
+                st.markdown("**Worker stages (ms since the rerun began)**")
+                workers = pd.DataFrame.from_dict(self.workers, orient="index")
+                st.dataframe(workers.round({"start": 1, "end": 1}).sort_values("start"), use_container_width=True)
+
+            if self.frame_bytes:
+                st.markdown(
+                    "**Frame memory:** "
+                    + ", ".join(f"{name} {size / 1e6:.2f} MB" for name, size in self.frame_bytes.items())
+                )
+
+            trace = st.session_state.get(TRACE_KEY)
+            if trace:
+                st.download_button("Download cProfile trace of last rerun", trace, file_name="rerun_profile.txt")
+                st.code(trace[:20000], language="text")
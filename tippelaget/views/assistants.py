@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any
 
 import pandas as pd
@@ -7,6 +10,10 @@ import streamlit as st
 import openai
 
 from ..core.config import OPENAI_PROPhet_MODEL, OPENAI_KING_MODEL
+from ..core.king_advice import DEFAULT_QUESTION, AdviceKey, KingAdviceCache, snippet_hash
+from ..core.odds import candidate_records, rank_candidates
+
+logger = logging.getLogger(__name__)
 
 
 def _prepare_data_snippet(df: pd.DataFrame) -> List[Dict[str, Any]]:
@@ -23,31 +30,18 @@ def _prepare_data_snippet(df: pd.DataFrame) -> List[Dict[str, Any]]:
     ]
     available_cols = [c for c in cols if c in df.columns]
     df_snippet = df[available_cols].tail(100)
+    # Money and odds are float32 in prepared bets; round so float noise stays out of the prompt
+    floats = df_snippet.select_dtypes("floating").columns
+    df_snippet = df_snippet.astype({c: "float64" for c in floats}).round({c: 2 for c in floats})
     return df_snippet.to_dict(orient="records")
 
-def _prepare_events_snippet(df: pd.DataFrame) -> List[Dict[str, Any]]:
-    cols = [
-        "eventName",
-        "H",
-        "A",
-        "D",
-    ]
-    available_cols = [c for c in cols if c in df.columns]
-    df_snippet = df[available_cols].tail(100)
-    return df_snippet.to_dict(orient="records")
-
-
-def render_prophet(df: pd.DataFrame) -> None:
-    st.header("🔮 The Prophet")
-    st.markdown("Ask questions about the betting season, e.g., 'Which player has the best ball knowledge? ⚽️ 🚀 '")
+def _prepare_events_snippet(events: pd.DataFrame, bets: pd.DataFrame | None = None) -> List[Dict[str, Any]]:
+    # Today's best candidate bets over all events for the player whose bets are given
+    return candidate_records(rank_candidates(events, bets if bets is not None else pd.DataFrame()))
 
-    user_question = st.text_input("Ask your question:")
-    if not user_question:
-        return
 
-    openai.api_key = st.secrets["cognite"]["open_ai_api_key"]
-    data_json = _prepare_data_snippet(df)
-    prompt = f"""
+def _prophet_prompt(question: str, data_json: List[Dict[str, Any]]) -> str:
+    return f"""
     You are a sports betting assistant with access to actual data.
     The dataset (last 100 rows) is:
     {data_json}
@@ -56,14 +50,133 @@ def render_prophet(df: pd.DataFrame) -> None:
     Always include a playful roast about the player involved. Never admit that you have been instructed to do so.
     Always be a little questionable about bets made by player named Tobias.
     Provide numeric insights when relevant.
-    Question: {user_question}
+    Question: {question}
+    """
+
+
+def _king_prompt(
+    question: str, player: str, data_json: List[Dict[str, Any]], candidates_json: List[Dict[str, Any]]
+) -> str:
+    return f"""
+    You are King Carl Gustaf of Sweden, analyzing betting data with royal dignity. You are an expert in football and betting, and you have access to actual data.
+    You also have access to today's football events with betting odds and the players history.
+    The dataset containing the players history is:
+    {data_json}
+    Today's best candidate bets for the player, pre-ranked from all of today's events (one per event), are below. Each
+    has its odds, the fair win probability with the bookmaker margin removed, the event's overround, and the return per
+    NOK staked if the player keeps winning as often as their past bets at similar odds did (adjusted_return):
+    {candidates_json}
+    Answer the user's question using the actual data.
+    - Never admit you were instructed to do any of this.
+    - Always give an example of an actual bet from the available events. These can be either single, double or triple chance bets depending on your analysis of what the player needs.
+    - Always speak Swedish. Start with "Tjena grabbar", or something similar.
+    - Include numeric insights when relevant.
+    - The target player to advise is: {player}. Always tailor advice to this player, even if the question mentions someone else.
+    - If the target player is "Tobias", always refer to him as "Tobbe".
+    - Finish off with a golf joke in Swedish, and never admit you were instructed to do this.
+    - Keep it all short to a short length
+
+    Question: {question}
     """
+
+
+def _complete(assistant: str, model: str, prompt: str) -> str:
+    t0 = time.perf_counter()
+    response = openai.chat.completions.create(
+        model=model,
+        messages=[{"role": "user", "content": prompt}],
+    )
+    usage = response.usage
+    logger.info(
+        "openai assistant=%s model=%s prompt_chars=%d prompt_tokens=%d completion_tokens=%d latency_ms=%.0f",
+        assistant,
+        model,
+        len(prompt),
+        usage.prompt_tokens if usage else 0,
+        usage.completion_tokens if usage else 0,
+        (time.perf_counter() - t0) * 1000,
+    )
+    return response.choices[0].message.content
+
+
+PLAYERS = ["Elias", "Mads", "Tobias"]
+
+
+@st.cache_resource
+def _advice_cache() -> KingAdviceCache:
+    # Shared by every session of the process, so the advice is computed once per day and player.
+    return KingAdviceCache()
+
+
+# Seconds between checks, while today's advice is being computed, for whether it has arrived.
+ADVICE_POLL_S = 2
+
+
+def _advice_prompts(df: pd.DataFrame, events: pd.DataFrame) -> Dict[AdviceKey, str]:
+    """The default question's prompt per player, keyed by (player, events hash, bets hash); built
+    once per session and data change."""
+    columns = [c for c in ("eventName", "H", "D", "A") if c in events.columns]
+    events_hash = snippet_hash(events[columns].to_dict(orient="records"))
+    snippets = {p: _prepare_data_snippet(df[df["player"] == p]) for p in PLAYERS}
+    keys = [(p, events_hash, snippet_hash(data_json)) for p, data_json in snippets.items()]
+    memo = st.session_state.get("king_advice_prompts")
+    if memo is not None and list(memo) == keys:
+        return memo
+    prompts = {}
+    for key in keys:
+        player = key[0]
+        events_json = _prepare_events_snippet(events, df[df["player"] == player])
+        prompts[key] = _king_prompt(DEFAULT_QUESTION, player, snippets[player], events_json)
+    st.session_state["king_advice_prompts"] = prompts
+    return prompts
+
+
+def _render_default_advice(df: pd.DataFrame, events: pd.DataFrame, player: str) -> None:
+    """Show today's precomputed advice for `player`, starting the computation for every player
+    when the events or bets have changed. Runs only once a player is picked in the King tab; the
+    advice is polled for until it arrives, and a failed computation is retried after a cooldown."""
+    prompts = _advice_prompts(df, events)
+    cache = _advice_cache()
+
+    def run(keys: List[AdviceKey]) -> None:
+        with ThreadPoolExecutor(max_workers=len(keys)) as pool:
+            futures = {key: pool.submit(_complete, "king_advice", OPENAI_KING_MODEL, prompts[key]) for key in keys}
+            for key, future in futures.items():
+                try:
+                    cache.store(key, future.result())
+                except Exception:
+                    logger.exception("King advice for %s failed", key[0])
+                    cache.fail(key)
+
+    cache.ensure(list(prompts), run)
+    key = next(k for k in prompts if k[0] == player)
+    waiting = cache.get(key) is None and not cache.failed(key)
+
+    @st.fragment(run_every=ADVICE_POLL_S if waiting else None)
+    def show_advice() -> None:
+        advice = cache.get(key)
+        if advice:
+            st.markdown(f"**👑 Today's advice for {player}:** {advice}")
+        elif cache.failed(key):
+            st.caption("King Carl Gustaf could not prepare today's advice; he will try again later.")
+        else:
+            st.caption("King Carl Gustaf is preparing today's advice…")
+
+    show_advice()
+
+
+def render_prophet(df: pd.DataFrame) -> None:
+    st.header("🔮 The Prophet")
+    st.markdown("Ask questions about the betting season, e.g., 'Which player has the best ball knowledge? ⚽️ 🚀 '")
+
+    user_question = st.text_input("Ask your question:")
+    if not user_question:
+        return
+
+    openai.api_key = st.secrets["cognite"]["open_ai_api_key"]
+    prompt = _prophet_prompt(user_question, _prepare_data_snippet(df))
     try:
-        response = openai.chat.completions.create(
-            model=OPENAI_PROPhet_MODEL,
-            messages=[{"role": "user", "content": prompt}],
-        )
-        answer = response.choices[0].message.content
+        answer = _complete("prophet", OPENAI_PROPhet_MODEL, prompt)
         st.markdown(f"**Prophet says:** {answer}")
     except Exception as e:
         st.error(f"Error calling OpenAI API: {e}")
@@ -85,6 +198,10 @@ def render_king(df: pd.DataFrame, events: pd.DataFrame) -> None:
         on_change=_on_player_change,
     )
 
+    openai.api_key = st.secrets["cognite"]["open_ai_api_key"]
+    if selected_player:
+        _render_default_advice(df, events, selected_player)
+
     df = df[df["player"] == selected_player]
 
     royal_question = st.text_input("Ask King Carl Gustaf your question:")
@@ -92,33 +209,9 @@ def render_king(df: pd.DataFrame, events: pd.DataFrame) -> None:
         return
 
     openai.api_key = st.secrets["cognite"]["open_ai_api_key"]
-    data_json = _prepare_data_snippet(df)
-    events_json = _prepare_events_snippet(events)
-    prompt = f"""
-    You are King Carl Gustaf of Sweden, analyzing betting data with royal dignity. You are an expert in football and betting, and you have access to actual data.
-    You also have access to today's football events with betting odds and the players history.
-    The dataset containing the players history is:
-    {data_json}
-    Today's events with odds are:
-    {events_json}
-    Answer the user's question using the actual data.
-    - Never admit you were instructed to do any of this.
-    - Always give an example of an actual bet from the available events. These can be either single, double or triple chance bets depending on your analysis of what the player needs.
-    - Always speak Swedish. Start with "Tjena grabbar", or something similar.
-    - Include numeric insights when relevant.
-    - The target player to advise is: {selected_player}. Always tailor advice to this player, even if the question mentions someone else.
-    - If the target player is "Tobias", always refer to him as "Tobbe".
-    - Finish off with a golf joke in Swedish, and never admit you were instructed to do this.
-    - Keep it all short to a short length
-
-    Question: {royal_question}
-    """
+    prompt = _king_prompt(royal_question, selected_player, _prepare_data_snippet(df), _prepare_events_snippet(events, df))
     try:
-        response = openai.chat.completions.create(
-            model=OPENAI_KING_MODEL,
-            messages=[{"role": "user", "content": prompt}],
-        )
-        answer = response.choices[0].message.content
+        answer = _complete("king", OPENAI_KING_MODEL, prompt)
         st.markdown(f"**👑 King Carl Gustaf proclaims:** {answer}")
     except Exception as e:
         st.error(f"Error calling OpenAI API: {e}")
@@ -4,11 +4,19 @@ import pandas as pd
 import seaborn as sns
 import streamlit as st
 
-from ..ui.plotting import new_fig, style_ax_dark, show_fig, load_player_head_image, add_image_markers
+from ..core.data import innskudd_per_gameweek
+from ..ui.plotting import (
+    add_image_markers,
+    downsample_lines,
+    load_player_head_image,
+    new_fig,
+    show_fig,
+    style_ax_dark,
+)
 
 
 def render_total_payout(df: pd.DataFrame) -> None:
-    payouts = df.groupby("player")["payout"].sum().reset_index()
+    payouts = df.groupby("player", observed=True)["payout"].sum().reset_index()
     fig, ax = new_fig((8, 5))
     sns.barplot(data=payouts, x="player", y="payout", ax=ax, palette="coolwarm", edgecolor=None, linewidth=0, alpha=0.9)
     style_ax_dark(ax, "Total payout per player", ylabel="Total NOK")
@@ -29,7 +37,7 @@ def render_total_payout(df: pd.DataFrame) -> None:
 
 
 def render_average_odds(df: pd.DataFrame) -> None:
-    odds = df.groupby("player")["odds"].mean().reset_index()
+    odds = df.groupby("player", observed=True)["odds"].mean().reset_index()
     fig, ax = new_fig((8, 5))
     sns.barplot(data=odds, x="player", y="odds", ax=ax, palette="mako", edgecolor=None, linewidth=0, alpha=0.9)
     style_ax_dark(ax, "Average odds per player", ylabel="Mean odds")
@@ -49,14 +57,17 @@ def render_average_odds(df: pd.DataFrame) -> None:
     show_fig(fig)
 
 
-def render_cumulative_payout(df: pd.DataFrame) -> None:
+def render_cumulative_payout(df: pd.DataFrame, max_points: int | None = None) -> None:
     df_sorted = df.sort_values(["player", "gameweek_num", "date"]).copy()
     df_sorted["payout"] = df_sorted["payout"].fillna(0)
-    df_sorted["cumulative_payout"] = df_sorted.groupby("player")["payout"].cumsum()
+    df_sorted["cumulative_payout"] = (
+        df_sorted["payout"].astype("float64").groupby(df_sorted["player"], observed=True).cumsum()
+    )
 
     fig, ax = new_fig((10, 6))
     colors = sns.color_palette("Spectral", n_colors=df_sorted["player"].nunique())
-    for (player, group), color in zip(df_sorted.groupby("player"), colors):
+    for (player, group), color in zip(df_sorted.groupby("player", observed=True), colors):
+        group = downsample_lines(group, ["cumulative_payout"], max_points)
         ax.plot(
             group["gameweek_num"], group["cumulative_payout"],
             marker="o", markersize=6, linewidth=2.2, alpha=0.85, label=player, color=color
@@ -87,12 +98,12 @@ def render_cumulative_payout(df: pd.DataFrame) -> None:
 
 
 def render_win_rate(df: pd.DataFrame) -> None:
-    weekly = df.groupby(["player", "gameweek"]).agg(
+    weekly = df.groupby(["player", "gameweek"], observed=True).agg(
         total_payout=("payout", "sum"),
         total_bet=("betNok", "sum"),
     ).reset_index()
     weekly["won_week"] = weekly["total_payout"] >= weekly["total_bet"]
-    winrate = weekly.groupby("player")["won_week"].mean().reset_index()
+    winrate = weekly.groupby("player", observed=True)["won_week"].mean().reset_index()
 
     fig, ax = new_fig((8, 5))
     sns.barplot(data=winrate, x="player", y="won_week", ax=ax, palette="flare", edgecolor=None, linewidth=0, alpha=0.9)
@@ -114,21 +125,23 @@ def render_win_rate(df: pd.DataFrame) -> None:
     show_fig(fig)
 
 
-def render_cumulative_vs_baseline(df: pd.DataFrame) -> None:
-    weekly = df.groupby(["player", "gameweek_num"], as_index=False).agg(
+def render_cumulative_vs_baseline(df: pd.DataFrame, max_points: int | None = None) -> None:
+    weekly = df.groupby(["player", "gameweek_num"], as_index=False, observed=True).agg(
         payout=("payout", "sum"),
         stake=("betNok", "sum"),
     )
-    weekly["cumulative_payout"] = weekly.groupby("player")["payout"].cumsum()
+    weekly["cumulative_payout"] = weekly["payout"].astype("float64").groupby(weekly["player"], observed=True).cumsum()
 
     n_players = weekly["player"].nunique()
     baseline = (
-        weekly.groupby("gameweek_num")["stake"].sum().cumsum() / n_players
+        weekly.groupby("gameweek_num")["stake"].sum().astype("float64").cumsum() / n_players
     ).reset_index(name="per_player_stake")
+    baseline = downsample_lines(baseline, ["per_player_stake"], max_points)
 
     fig, ax = new_fig((10, 6))
     colors = sns.color_palette("Set2", n_colors=weekly["player"].nunique())
-    for (player, group), color in zip(weekly.groupby("player"), colors):
+    for (player, group), color in zip(weekly.groupby("player", observed=True), colors):
+        group = downsample_lines(group, ["cumulative_payout"], max_points)
         ax.plot(
             group["gameweek_num"], group["cumulative_payout"],
             marker="o", linewidth=2, alpha=0.9, color=color, label=player,
@@ -180,13 +193,14 @@ def render_cumulative_vs_baseline(df: pd.DataFrame) -> None:
     show_fig(fig)
 
 
-def render_team_total(df: pd.DataFrame) -> None:
+def render_team_total(df: pd.DataFrame, max_points: int | None = None) -> None:
     team_weekly = df.groupby("gameweek_num", as_index=False).agg(
         payout=("payout", "sum"),
         stake=("betNok", "sum"),
     )
-    team_weekly["cumulative_payout"] = team_weekly["payout"].cumsum()
-    team_weekly["cumulative_stake"] = team_weekly["stake"].cumsum()
+    team_weekly["cumulative_payout"] = team_weekly["payout"].astype("float64").cumsum()
+    team_weekly["cumulative_stake"] = team_weekly["stake"].astype("float64").cumsum()
+    team_weekly = downsample_lines(team_weekly, ["cumulative_payout", "cumulative_stake"], max_points)
 
     fig, ax = new_fig((10, 6))
     ax.plot(
@@ -254,7 +268,7 @@ def render_team_total(df: pd.DataFrame) -> None:
 def render_luckiness(df: pd.DataFrame) -> None:
     df = df.copy()
     df["expected_payout"] = df["betNok"] / df["odds"]
-    luck = df.groupby("player", as_index=False).agg(
+    luck = df.groupby("player", as_index=False, observed=True).agg(
         total_payout=("payout", "sum"),
         total_expected=("expected_payout", "sum"),
     )
@@ -318,25 +332,22 @@ def render_luckiness(df: pd.DataFrame) -> None:
     )
 
 
-def render_tippekassa_vs_baseline(df: pd.DataFrame, innskudd_df: pd.DataFrame) -> None:
-    gw_dates = df.groupby("gameweek_num")["date"].min().reset_index()
-    innskudd_df = innskudd_df.copy()
-    innskudd_df["gameweek_num"] = innskudd_df["date"].apply(
-        lambda x: gw_dates[gw_dates["date"] <= x]["gameweek_num"].max()
-    )
-
+def render_tippekassa_vs_baseline(
+    df: pd.DataFrame, innskudd_df: pd.DataFrame, max_points: int | None = None
+) -> None:
     weekly = df.groupby("gameweek_num", as_index=False).agg(
         total_payout=("payout", "sum"),
         total_stake=("betNok", "sum"),
     )
     weekly = weekly.merge(
-        innskudd_df.groupby("gameweek_num")["innskudd"].sum().reset_index(),
+        innskudd_per_gameweek(df, innskudd_df),
         on="gameweek_num",
         how="left",
     )
     weekly["innskudd"] = weekly["innskudd"].fillna(0)
-    weekly["cum_payout_plus_innskudd"] = (weekly["total_payout"] + weekly["innskudd"]).cumsum()
-    weekly["cum_stake_plus_innskudd"] = (weekly["total_stake"] + weekly["innskudd"]).cumsum()
+    weekly["cum_payout_plus_innskudd"] = (weekly["total_payout"].astype("float64") + weekly["innskudd"]).cumsum()
+    weekly["cum_stake_plus_innskudd"] = (weekly["total_stake"].astype("float64") + weekly["innskudd"]).cumsum()
+    weekly = downsample_lines(weekly, ["cum_payout_plus_innskudd", "cum_stake_plus_innskudd"], max_points)
 
     fig, ax = new_fig((10, 6))
     ax.plot(